@@ -4,8 +4,11 @@ import os
 
 load_dotenv()
 
+from hrms.core.db.engine import resolve_db_url
+
 class Settings(BaseModel):
     app_name: str = os.getenv("APP_NAME", "HRMS")
-    db_url: str = os.getenv("DB_URL", "sqlite:///./hrms.sqlite3")
+    # 與 hrms.core.db.engine 相同的資料庫（DB_URL / config/settings.yaml，相對路徑以專案根目錄為準）
+    db_url: str = resolve_db_url()
 
 settings = Settings()
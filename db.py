@@ -1,25 +1,11 @@
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
-import os
-from dotenv import load_dotenv
-from pathlib import Path
+from hrms.core.db.engine import get_engine, resolve_db_url
 
-# 載入環境變數
-load_dotenv()
-
-# 資料庫設定
-DB_URL = os.getenv("DB_URL", "sqlite:///./hrms.db")
-if DB_URL.startswith("sqlite:///") and not DB_URL.startswith("sqlite:////"):
-    # 相對路徑轉換為絕對路徑
-    db_path = Path(DB_URL.replace("sqlite:///", ""))
-    if not db_path.is_absolute():
-        db_path = Path(__file__).parent / db_path
-    DB_URL = f"sqlite:///{db_path}"
-
-engine = create_engine(DB_URL, echo=False, future=True)
+# 資料庫設定（DB_URL / config/settings.yaml；與 UnitOfWork 共用同一引擎）
+DB_URL = resolve_db_url()
+engine = get_engine(DB_URL)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 
 def get_session() -> Session:
     """取得資料庫 Session"""
     return SessionLocal()
-
@@ -11,6 +11,10 @@ from .certification import (
     CertifyRecord, CertifyToolMap, MustTool, Software
 )
 from .authority import Authority, DelAuthority
+from .indexes import declared_indexes, create_indexes, drop_indexes
+from .types import IsoDate, normalize_date
+from .expiry import ensure_migrated, migrate_dates, recompute_expiry
+from .fulltext import FULLTEXT_INDEXES, create_fulltext, drop_fulltext, rebuild_fulltext
 
 # 所有模型列表
 __all__ = [
@@ -42,6 +46,24 @@ __all__ = [
     # 權限
     "Authority",
     "DelAuthority",
+    
+    # 索引管理
+    "declared_indexes",
+    "create_indexes",
+    "drop_indexes",
+    
+    # 日期欄位與到期日
+    "IsoDate",
+    "normalize_date",
+    "ensure_migrated",
+    "migrate_dates",
+    "recompute_expiry",
+    
+    # 全文檢索
+    "FULLTEXT_INDEXES",
+    "create_fulltext",
+    "drop_fulltext",
+    "rebuild_fulltext",
 ]
 
 def create_all_tables(engine):
@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy import String, Boolean, ForeignKey, Text, Integer
 from .base import Base
+from .types import IsoDate
 
 class Authority(Base):
     """
@@ -11,7 +12,7 @@ class Authority(Base):
     
     S_Account: Mapped[str] = mapped_column(String(50), primary_key=True, nullable=False)
     Active: Mapped[bool] = mapped_column(Boolean, default=True)
-    Update_Date: Mapped[str] = mapped_column(String(20), nullable=True)
+    Update_Date: Mapped[str] = mapped_column(IsoDate(), nullable=True)
     Auth_type: Mapped[str] = mapped_column(String(10), nullable=True)  # 01=Admin, 02=User, 等等
 
 class DelAuthority(Base):
@@ -25,4 +26,4 @@ class DelAuthority(Base):
     S_Account: Mapped[str] = mapped_column(String(50), ForeignKey("Authority.S_Account"), nullable=True)
     Del_Auth: Mapped[bool] = mapped_column(Boolean, default=False)
     Active: Mapped[bool] = mapped_column(Boolean, default=True)
-    Update_Date: Mapped[str] = mapped_column(String(20), nullable=True)
+    Update_Date: Mapped[str] = mapped_column(IsoDate(), nullable=True)
@@ -1,6 +1,8 @@
-from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String, Boolean, ForeignKey, Text, Integer, Float
+from typing import List, Optional
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import String, Boolean, ForeignKey, Text, Integer, Float, Index, text, FetchedValue
 from .base import Base
+from .types import IsoDate
 
 class Certify(Base):
     """
@@ -29,6 +31,10 @@ class CertifyItem(Base):
     所有可取得的證照項目
     """
     __tablename__ = "CERTIFY_ITEMS"
+    __table_args__ = (
+        # 主鍵為 (Dept, Certify_ID)，單獨以 Certify_ID 查詢需另建索引
+        Index("ix_certify_items_certify_id", "Certify_ID"),
+    )
     
     Dept: Mapped[str] = mapped_column(String(50), ForeignKey("L_Section.Dept_Code"), primary_key=True, nullable=False)
     Certify_ID: Mapped[str] = mapped_column(String(50), primary_key=True, nullable=False)
@@ -39,6 +45,15 @@ class CertifyItem(Base):
     Remark: Mapped[str] = mapped_column(Text, nullable=True)
     Active: Mapped[bool] = mapped_column(Boolean, default=True)
     Score: Mapped[float] = mapped_column(Float, nullable=True)
+    # 證照效期（天）；0 或 NULL 表示不會到期
+    Valid_Days: Mapped[int] = mapped_column(Integer, nullable=True, default=365)
+    
+    # 關聯（viewonly：僅供讀取與預先載入，寫入仍以外鍵欄位為準）
+    # Certify_ID 非唯一（各部門各一筆），同一 Certify_ID 的項目共用記錄與工具
+    section: Mapped[Optional["Section"]] = relationship(viewonly=True)
+    training_records: Mapped[List["TrainingRecord"]] = relationship(
+        viewonly=True, order_by="TrainingRecord.Certify_No")
+    tool_maps: Mapped[List["CertifyToolMap"]] = relationship(viewonly=True, order_by="CertifyToolMap.id")
 
 class TrainingRecord(Base):
     """
@@ -46,17 +61,33 @@ class TrainingRecord(Base):
     員工取得的證照記錄（主要記錄檔）
     """
     __tablename__ = "TRAINING_RECORD"
+    __table_args__ = (
+        # 員工的證照記錄（可附帶有效狀態）
+        Index("ix_training_record_emp_active", "EMP_ID", "Active"),
+        Index("ix_training_record_certify_id", "Certify_ID"),
+        Index("ix_training_record_certify_date", "Certify_date"),
+        # 有效證照依到期日範圍查詢（到期提醒；部分索引只含有效記錄）
+        Index("ix_training_record_active_expiry", "Expiry_Date", sqlite_where=text("Active = 1")),
+    )
     
     Certify_No: Mapped[int] = mapped_column(Integer, primary_key=True, nullable=False)
     EMP_ID: Mapped[str] = mapped_column(String(50), ForeignKey("BASIC.EMP_ID"), nullable=False)
     Certify_ID: Mapped[str] = mapped_column(String(50), ForeignKey("CERTIFY_ITEMS.Certify_ID"), nullable=False)
-    Certify_date: Mapped[str] = mapped_column(String(20), nullable=True)
+    Certify_date: Mapped[str] = mapped_column(IsoDate(), nullable=True)
     Certify_type: Mapped[str] = mapped_column(String(50), nullable=True)
-    update_date: Mapped[str] = mapped_column(String(20), nullable=True)
+    update_date: Mapped[str] = mapped_column(IsoDate(), nullable=True)
     Active: Mapped[bool] = mapped_column(Boolean, default=True)
     Remark: Mapped[str] = mapped_column(Text, nullable=True)
     updater: Mapped[str] = mapped_column(String(50), nullable=True)
     Cer_type: Mapped[str] = mapped_column(String(10), nullable=True)
+    # 到期日 = Certify_date + 證照項目效期，由資料庫觸發器維護（見 expiry.py）
+    Expiry_Date: Mapped[str] = mapped_column(
+        IsoDate(), nullable=True, server_default=FetchedValue(), server_onupdate=FetchedValue()
+    )
+    
+    employee: Mapped[Optional["Basic"]] = relationship(viewonly=True)
+    # 同一 Certify_ID 可能對應多個部門的證照項目
+    certify_items: Mapped[List["CertifyItem"]] = relationship(viewonly=True, uselist=True, order_by="CertifyItem.Dept")
 
 class CertifyRecord(Base):
     """
@@ -64,14 +95,19 @@ class CertifyRecord(Base):
     另一種格式的證照記錄
     """
     __tablename__ = "CERTIFY_RECORD"
+    __table_args__ = (
+        Index("ix_certify_record_emp_id", "EMP_ID"),
+    )
     
     識別碼: Mapped[str] = mapped_column(String(50), primary_key=True, nullable=False)
     EMP_ID: Mapped[str] = mapped_column(String(50), ForeignKey("BASIC.EMP_ID"), nullable=True)
     Certify_NO: Mapped[str] = mapped_column(String(50), nullable=True)
-    Update_date: Mapped[str] = mapped_column(String(20), nullable=True)
+    Update_date: Mapped[str] = mapped_column(IsoDate(), nullable=True)
     Active: Mapped[bool] = mapped_column(Boolean, default=True)
     Meno: Mapped[str] = mapped_column(Text, nullable=True)
     Type: Mapped[str] = mapped_column(String(50), nullable=True)
+    
+    employee: Mapped[Optional["Basic"]] = relationship(viewonly=True)
 
 class CertifyToolMap(Base):
     """
@@ -80,13 +116,19 @@ class CertifyToolMap(Base):
     注意：CSV 中有重複資料，所以不使用複合主鍵
     """
     __tablename__ = "CERTIFY_TOOL_MAP"
+    __table_args__ = (
+        Index("ix_certify_tool_map_certify_id", "Certify_ID"),
+        Index("ix_certify_tool_map_tool_id", "TOOL_ID"),
+    )
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     Certify_ID: Mapped[str] = mapped_column(String(50), ForeignKey("CERTIFY_ITEMS.Certify_ID"), nullable=False)
     TOOL_ID: Mapped[str] = mapped_column(String(50), nullable=False)
-    Update_date: Mapped[str] = mapped_column(String(20), nullable=True)
+    Update_date: Mapped[str] = mapped_column(IsoDate(), nullable=True)
     Remark: Mapped[str] = mapped_column(Text, nullable=True)
     Active: Mapped[bool] = mapped_column(Boolean, default=True)
+    
+    certify_items: Mapped[List["CertifyItem"]] = relationship(viewonly=True, uselist=True, order_by="CertifyItem.Dept")
 
 class MustTool(Base):
     """
@@ -107,5 +149,5 @@ class Software(Base):
     
     S_Ver: Mapped[str] = mapped_column(String(50), primary_key=True, nullable=False)
     Meno: Mapped[str] = mapped_column(Text, nullable=True)
-    Update_Date: Mapped[str] = mapped_column(String(20), nullable=True)
+    Update_Date: Mapped[str] = mapped_column(IsoDate(), nullable=True)
     Active: Mapped[bool] = mapped_column(Boolean, default=True)
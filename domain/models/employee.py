@@ -1,6 +1,8 @@
-from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String, Boolean, ForeignKey, Text, Integer
+from typing import List, Optional
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import String, Boolean, ForeignKey, Text, Integer, Index, text
 from .base import Base
+from .types import IsoDate
 
 class Basic(Base):
     """
@@ -8,6 +10,12 @@ class Basic(Base):
     主要員工主檔，包含基本人事資訊
     """
     __tablename__ = "BASIC"
+    __table_args__ = (
+        # 依部門查詢（可附帶在職狀態）
+        Index("ix_basic_dept_active", "Dept_Code", "Active"),
+        # 在職員工清單（部分索引，只含在職者）
+        Index("ix_basic_active_emp", "EMP_ID", sqlite_where=text("Active = 1")),
+    )
     
     # 主鍵
     EMP_ID: Mapped[str] = mapped_column(String(50), primary_key=True, nullable=False)
@@ -16,7 +24,7 @@ class Basic(Base):
     Dept_Code: Mapped[str] = mapped_column(String(50), ForeignKey("L_Section.Dept_Code"), nullable=True)
     C_Name: Mapped[str] = mapped_column(String(100), nullable=True)
     Title: Mapped[str] = mapped_column(String(100), nullable=True)
-    On_Board_Date: Mapped[str] = mapped_column(String(20), nullable=True)
+    On_Board_Date: Mapped[str] = mapped_column(IsoDate(), nullable=True)
     
     # 班別與工站
     SHIFT: Mapped[str] = mapped_column(String(50), ForeignKey("SHIFT.Shift"), nullable=True)
@@ -24,7 +32,7 @@ class Basic(Base):
     
     # 備註與更新
     Meno: Mapped[str] = mapped_column(Text, nullable=True)
-    Update_Date: Mapped[str] = mapped_column(String(20), nullable=True)
+    Update_Date: Mapped[str] = mapped_column(IsoDate(), nullable=True)
     
     # 狀態
     Active: Mapped[bool] = mapped_column(Boolean, default=True)
@@ -34,18 +42,25 @@ class Basic(Base):
     Area: Mapped[str] = mapped_column(String(50), ForeignKey("Area.Area"), nullable=True)
     
     # 調動資訊
-    Trans_out_date: Mapped[str] = mapped_column(String(20), nullable=True)
-    Area_date: Mapped[str] = mapped_column(String(20), nullable=True)
+    Trans_out_date: Mapped[str] = mapped_column(IsoDate(), nullable=True)
+    Area_date: Mapped[str] = mapped_column(IsoDate(), nullable=True)
     Certify_Area: Mapped[str] = mapped_column(String(50), ForeignKey("Area.Area"), nullable=True)
     
     # 假期資訊
-    Start_Date: Mapped[str] = mapped_column(String(20), nullable=True)
-    End_Date: Mapped[str] = mapped_column(String(20), nullable=True)
+    Start_Date: Mapped[str] = mapped_column(IsoDate(), nullable=True)
+    End_Date: Mapped[str] = mapped_column(IsoDate(), nullable=True)
     Vac_type: Mapped[str] = mapped_column(String(20), nullable=True)
     VAC_ID: Mapped[str] = mapped_column(String(10), ForeignKey("VAC_Type.VAC_ID"), nullable=True)
     
     # 工作階段
     Work_Stage: Mapped[str] = mapped_column(String(50), nullable=True)
+    
+    # 關聯（viewonly：僅供讀取與預先載入，寫入仍以外鍵欄位為準）
+    section: Mapped[Optional["Section"]] = relationship(viewonly=True)
+    person_info: Mapped[Optional["PersonInfo"]] = relationship(viewonly=True)
+    training_records: Mapped[List["TrainingRecord"]] = relationship(
+        viewonly=True, order_by="TrainingRecord.Certify_No")
+    certify_records: Mapped[List["CertifyRecord"]] = relationship(viewonly=True)
 
 class PersonInfo(Base):
     """
@@ -89,10 +104,12 @@ class PersonInfo(Base):
     ex_compy_type: Mapped[str] = mapped_column(String(100), nullable=True)
     
     # 異動資訊
-    Update_Date: Mapped[str] = mapped_column(String(20), nullable=True)
-    Updater_Date: Mapped[str] = mapped_column(String(20), nullable=True)
+    Update_Date: Mapped[str] = mapped_column(IsoDate(), nullable=True)
+    Updater_Date: Mapped[str] = mapped_column(IsoDate(), nullable=True)
     Updater: Mapped[str] = mapped_column(String(50), nullable=True)
     
     # 備註
     Meno: Mapped[str] = mapped_column(Text, nullable=True)
     Active: Mapped[bool] = mapped_column(Boolean, default=True)
+    
+    employee: Mapped["Basic"] = relationship(viewonly=True)
@@ -0,0 +1,154 @@
+"""
+證照到期日與日期欄位正規化
+TRAINING_RECORD.Expiry_Date = Certify_date + CERTIFY_ITEMS.Valid_Days，
+因跨資料表無法使用 generated column，改由 SQLite 觸發器維護：
+記錄新增/修改取得日期或證照項目、證照項目新增或修改效期時重新計算
+（同一 Certify_ID 在多個部門時取最短效期；效期為 0 或 NULL 表示不會到期）
+"""
+from typing import Dict, List
+from sqlalchemy import event, inspect
+from .base import Base
+from .types import IsoDate, normalize_date
+
+# 以 TRAINING_RECORD 目前列計算到期日
+_EXPIRY_EXPR = (
+    "date(TRAINING_RECORD.Certify_date, '+' || ("
+    "SELECT MIN(NULLIF(ci.Valid_Days, 0)) FROM CERTIFY_ITEMS ci WHERE ci.Certify_ID = TRAINING_RECORD.Certify_ID"
+    ") || ' days')"
+)
+
+_TRIGGERS = {
+    "trg_training_record_expiry_ai":
+        "AFTER INSERT ON TRAINING_RECORD BEGIN "
+        f"UPDATE TRAINING_RECORD SET Expiry_Date = {_EXPIRY_EXPR} WHERE Certify_No = NEW.Certify_No; END",
+    "trg_training_record_expiry_au":
+        "AFTER UPDATE OF Certify_date, Certify_ID ON TRAINING_RECORD BEGIN "
+        f"UPDATE TRAINING_RECORD SET Expiry_Date = {_EXPIRY_EXPR} WHERE Certify_No = NEW.Certify_No; END",
+    "trg_certify_items_expiry_ai":
+        "AFTER INSERT ON CERTIFY_ITEMS BEGIN "
+        f"UPDATE TRAINING_RECORD SET Expiry_Date = {_EXPIRY_EXPR} WHERE Certify_ID = NEW.Certify_ID; END",
+    "trg_certify_items_expiry_au":
+        "AFTER UPDATE OF Valid_Days, Certify_ID ON CERTIFY_ITEMS BEGIN "
+        f"UPDATE TRAINING_RECORD SET Expiry_Date = {_EXPIRY_EXPR} WHERE Certify_ID IN (OLD.Certify_ID, NEW.Certify_ID); END",
+    "trg_certify_items_expiry_ad":
+        "AFTER DELETE ON CERTIFY_ITEMS BEGIN "
+        f"UPDATE TRAINING_RECORD SET Expiry_Date = {_EXPIRY_EXPR} WHERE Certify_ID = OLD.Certify_ID; END",
+}
+
+# 已是標準格式者略過
+_ISO_GLOB = "[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]"
+
+
+def _create_triggers(conn) -> None:
+    tables = set(inspect(conn).get_table_names())
+    if {"TRAINING_RECORD", "CERTIFY_ITEMS"} <= tables:
+        for name, body in _TRIGGERS.items():
+            conn.exec_driver_sql(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+
+
+def recompute_expiry(conn) -> int:
+    """重新計算所有記錄的到期日，回傳筆數"""
+    return conn.exec_driver_sql(f"UPDATE TRAINING_RECORD SET Expiry_Date = {_EXPIRY_EXPR}").rowcount
+
+
+def _add_missing_columns(conn) -> List[str]:
+    """補上模型新增但資料庫尚無的欄位（ALTER TABLE ADD COLUMN；有預設值者既有資料一併填入）"""
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        have = {c["name"] for c in inspector.get_columns(table.name)}
+        for col in table.columns:
+            if col.name in have or col.primary_key:
+                continue
+            ddl = f'ALTER TABLE "{table.name}" ADD COLUMN "{col.name}" {col.type.compile(conn.dialect)}'
+            conn.exec_driver_sql(ddl)
+            if col.default is not None and col.default.is_scalar:
+                conn.exec_driver_sql(f'UPDATE "{table.name}" SET "{col.name}" = ?', (col.default.arg,))
+            added.append(f"{table.name}.{col.name}")
+    return added
+
+
+def _normalize_column(conn, table: str, column: str) -> Dict[str, int]:
+    rows = conn.exec_driver_sql(
+        f'SELECT rowid, "{column}" FROM "{table}" '
+        f'WHERE "{column}" IS NOT NULL AND "{column}" NOT GLOB \'{_ISO_GLOB}\''
+    ).fetchall()
+    updates, unparsed = [], 0
+    for rowid, value in rows:
+        new = normalize_date(value)
+        if new is not None and len(new) != 10:
+            unparsed += 1
+            continue
+        if new != value:
+            updates.append((new, rowid))
+    if updates:
+        conn.exec_driver_sql(f'UPDATE "{table}" SET "{column}" = ? WHERE rowid = ?', updates)
+    return {"normalized": len(updates), "unparsed": unparsed}
+
+
+def migrate_dates(engine) -> Dict[str, object]:
+    """
+    既有資料庫遷移（可重複執行）：
+    補上新欄位、將所有 IsoDate 欄位轉為 YYYY-MM-DD、建立到期日觸發器並重算到期日、補建索引
+
+    Returns:
+        {"added_columns": [...], "columns": {"表.欄位": {"normalized", "unparsed"}}, "expiry_rows": n,
+         "indexes": [...]}
+    """
+    from .indexes import create_indexes
+
+    result: Dict[str, object] = {"columns": {}}
+    with engine.begin() as conn:
+        result["added_columns"] = _add_missing_columns(conn)
+        tables = set(inspect(conn).get_table_names())
+        for table in Base.metadata.sorted_tables:
+            if table.name not in tables:
+                continue
+            for col in table.columns:
+                # 由資料庫計算的欄位（Expiry_Date）不需轉換
+                if isinstance(col.type, IsoDate) and col.server_default is None:
+                    result["columns"][f"{table.name}.{col.name}"] = _normalize_column(conn, table.name, col.name)
+        if engine.dialect.name == "sqlite":
+            _create_triggers(conn)
+            result["expiry_rows"] = recompute_expiry(conn) if {"TRAINING_RECORD", "CERTIFY_ITEMS"} <= tables else 0
+    result["indexes"] = create_indexes(engine)
+    return result
+
+
+def needs_migration(conn) -> bool:
+    """資料庫是否缺少模型欄位或到期日觸發器（空資料庫不需遷移）"""
+    inspector = inspect(conn)
+    tables = set(inspector.get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in tables:
+            continue
+        have = {c["name"] for c in inspector.get_columns(table.name)}
+        if any(col.name not in have for col in table.columns if not col.primary_key):
+            return True
+    if conn.dialect.name == "sqlite" and {"TRAINING_RECORD", "CERTIFY_ITEMS"} <= tables:
+        triggers = {row[0] for row in conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+        return not set(_TRIGGERS) <= triggers
+    return False
+
+
+def ensure_migrated(engine) -> bool:
+    """
+    尚未遷移的既有資料庫執行 migrate_dates（已遷移者只做檢查）；回傳是否執行了遷移
+    由 UnitOfWork / ReadSession 第一次使用每個資料庫時呼叫（engine.ensure_schema），
+    取出專案後不必手動執行 scripts/migrate_dates.py
+    """
+    with engine.connect() as conn:
+        if not needs_migration(conn):
+            return False
+    migrate_dates(engine)
+    return True
+
+
+# create_all 時一併建立觸發器
+@event.listens_for(Base.metadata, "after_create")
+def _after_create(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        _create_triggers(connection)
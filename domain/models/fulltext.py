@@ -0,0 +1,140 @@
+"""
+SQLite FTS5 全文檢索
+以 external content 虛擬表索引文字欄位，並由觸發器與原表同步；
+使用 trigram 分詞器，中文姓名、證照代碼等不需斷詞即可做子字串比對（關鍵字至少 3 個字元）
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+from sqlalchemy import event, text
+from .base import Base
+
+# trigram 需至少 3 個字元才能走全文索引
+MIN_TERM_LENGTH = 3
+
+
+@dataclass(frozen=True)
+class FullTextIndex:
+    """單一資料表的全文索引定義"""
+    name: str
+    table: str
+    columns: Tuple[str, ...]
+
+
+FULLTEXT_INDEXES: Dict[str, FullTextIndex] = {
+    spec.table: spec for spec in (
+        FullTextIndex("BASIC_FTS", "BASIC", ("EMP_ID", "C_Name", "Meno")),
+        FullTextIndex("CERTIFY_ITEMS_FTS", "CERTIFY_ITEMS", ("Certify_ID", "Certify_Name", "Remark")),
+        FullTextIndex("TRAINING_RECORD_FTS", "TRAINING_RECORD", ("Remark",)),
+    )
+}
+
+
+def _ddl(spec: FullTextIndex) -> List[str]:
+    cols = ", ".join(spec.columns)
+    new = ", ".join(f"new.{c}" for c in spec.columns)
+    old = ", ".join(f"old.{c}" for c in spec.columns)
+    delete = (f"INSERT INTO {spec.name}({spec.name}, rowid, {cols}) "
+              f"VALUES('delete', old.rowid, {old});")
+    insert = f"INSERT INTO {spec.name}(rowid, {cols}) VALUES (new.rowid, {new});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {spec.name} USING fts5("
+        f"{cols}, content='{spec.table}', content_rowid='rowid', tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {spec.name}_ai AFTER INSERT ON {spec.table} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {spec.name}_ad AFTER DELETE ON {spec.table} BEGIN {delete} END",
+        # 只有索引欄位變動才需同步（例如批次更新 Active 不會觸發）
+        f"CREATE TRIGGER IF NOT EXISTS {spec.name}_au AFTER UPDATE OF {cols} ON {spec.table} "
+        f"BEGIN {delete} {insert} END",
+    ]
+
+
+def _existing(conn) -> set:
+    rows = conn.execute(text("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')"))
+    return {row[0] for row in rows}
+
+
+def _create(conn) -> List[str]:
+    existing = _existing(conn)
+    created = []
+    for spec in FULLTEXT_INDEXES.values():
+        if spec.table not in existing:
+            continue
+        for ddl in _ddl(spec):
+            conn.exec_driver_sql(ddl)
+        if spec.name not in existing:
+            # 既有資料一次灌入
+            conn.exec_driver_sql(f"INSERT INTO {spec.name}({spec.name}) VALUES('rebuild')")
+            created.append(spec.name)
+    return created
+
+
+def _drop(conn) -> List[str]:
+    existing = _existing(conn)
+    dropped = []
+    for spec in FULLTEXT_INDEXES.values():
+        for suffix in ("_ai", "_ad", "_au"):
+            conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {spec.name}{suffix}")
+        if spec.name in existing:
+            conn.exec_driver_sql(f"DROP TABLE {spec.name}")
+            dropped.append(spec.name)
+    return dropped
+
+
+def create_fulltext(engine) -> List[str]:
+    """
+    建立全文索引與同步觸發器（已存在者略過，可重複執行）；僅支援 SQLite
+
+    Returns:
+        本次新建的全文索引名稱
+    """
+    if engine.dialect.name != "sqlite":
+        return []
+    with engine.begin() as conn:
+        return _create(conn)
+
+
+def drop_fulltext(engine) -> List[str]:
+    """移除全文索引與觸發器（可重複執行）"""
+    if engine.dialect.name != "sqlite":
+        return []
+    with engine.begin() as conn:
+        return _drop(conn)
+
+
+def rebuild_fulltext(engine) -> List[str]:
+    """
+    由原表重建全文索引內容
+    索引以 rowid 對應原表；非 INTEGER 主鍵的資料表在 VACUUM 後 rowid 可能改變，需重建
+    """
+    if engine.dialect.name != "sqlite":
+        return []
+    rebuilt = []
+    with engine.begin() as conn:
+        existing = _existing(conn)
+        for spec in FULLTEXT_INDEXES.values():
+            if spec.name in existing:
+                conn.exec_driver_sql(f"INSERT INTO {spec.name}({spec.name}) VALUES('rebuild')")
+                rebuilt.append(spec.name)
+    return rebuilt
+
+
+def has_fulltext(conn, table_name: str) -> bool:
+    """資料表的全文索引是否存在於此連線的資料庫"""
+    spec = FULLTEXT_INDEXES.get(table_name)
+    if spec is None or conn.dialect.name != "sqlite":
+        return False
+    row = conn.execute(text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :n"),
+                       {"n": spec.name}).first()
+    return row is not None
+
+
+# create_all / drop_all 時一併處理（新建資料庫即具備全文索引）
+@event.listens_for(Base.metadata, "after_create")
+def _after_create(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        _create(connection)
+
+
+@event.listens_for(Base.metadata, "before_drop")
+def _before_drop(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        _drop(connection)
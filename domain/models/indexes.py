@@ -0,0 +1,64 @@
+"""
+次要索引管理
+索引宣告於各模型的 __table_args__；既有資料庫（create_all 不會補建索引）以這裡的函式補建或移除
+"""
+from typing import List
+from sqlalchemy import Index, inspect, text
+from .base import Base
+
+
+def declared_indexes() -> List[Index]:
+    """所有模型宣告的索引（依資料表、名稱排序）"""
+    indexes = []
+    for table in Base.metadata.sorted_tables:
+        indexes.extend(sorted(table.indexes, key=lambda ix: ix.name))
+    return indexes
+
+
+def _existing_index_names(conn) -> set:
+    inspector = inspect(conn)
+    names = set()
+    for table_name in inspector.get_table_names():
+        names.update(ix["name"] for ix in inspector.get_indexes(table_name))
+    return names
+
+
+def create_indexes(engine, analyze: bool = True) -> List[str]:
+    """
+    建立尚不存在的宣告索引（可重複執行）
+
+    Args:
+        engine: SQLAlchemy 引擎
+        analyze: 建立後執行 ANALYZE，讓查詢規劃器取得統計資料
+
+    Returns:
+        本次新建的索引名稱
+    """
+    created = []
+    with engine.begin() as conn:
+        existing = _existing_index_names(conn)
+        tables = set(inspect(conn).get_table_names())
+        for ix in declared_indexes():
+            if ix.table.name in tables and ix.name not in existing:
+                ix.create(conn)
+                created.append(ix.name)
+        if analyze and created:
+            conn.execute(text("ANALYZE"))
+    return created
+
+
+def drop_indexes(engine) -> List[str]:
+    """
+    移除宣告的索引（只處理模型中宣告者，不影響主鍵/唯一鍵的自動索引；可重複執行）
+
+    Returns:
+        本次移除的索引名稱
+    """
+    dropped = []
+    with engine.begin() as conn:
+        existing = _existing_index_names(conn)
+        for ix in declared_indexes():
+            if ix.name in existing:
+                ix.drop(conn)
+                dropped.append(ix.name)
+    return dropped
@@ -1,7 +1,7 @@
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy import String, Boolean, ForeignKey, Text, DateTime, Integer
 from .base import Base
-from typing import List
+from typing import List, Optional
 
 class Section(Base):
     """部門資料表 (L_Section)"""
@@ -11,6 +11,11 @@ class Section(Base):
     Dept_Name: Mapped[str] = mapped_column(String(200), nullable=True)
     Dept_Desc: Mapped[str] = mapped_column(String(200), nullable=True)
     Supervisor: Mapped[str] = mapped_column(String(50), nullable=True)
+    
+    # 關聯（viewonly：僅供讀取與預先載入，寫入仍以外鍵欄位為準）
+    employees: Mapped[List["Basic"]] = relationship(viewonly=True, order_by="Basic.EMP_ID")
+    shifts: Mapped[List["Shift"]] = relationship(viewonly=True)
+    certify_items: Mapped[List["CertifyItem"]] = relationship(viewonly=True, order_by="CertifyItem.Certify_ID")
 
 class Area(Base):
     """區域資料表"""
@@ -44,6 +49,8 @@ class Shift(Base):
     Shift_Desc: Mapped[str] = mapped_column(String(200), nullable=True)
     Active: Mapped[bool] = mapped_column(Boolean, default=True)
     Supervisor: Mapped[str] = mapped_column(String(50), nullable=True)
+    
+    section: Mapped[Optional["Section"]] = relationship(viewonly=True)
 
 class Shop(Base):
     """工站資料表"""
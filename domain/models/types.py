@@ -0,0 +1,51 @@
+"""
+自訂欄位型別
+"""
+from datetime import date, datetime
+from typing import Any, Optional
+import re
+from sqlalchemy import String
+from sqlalchemy.types import TypeDecorator
+
+# 2011-08-01、2011/8/1、2011.08.01（可帶時間）；20110801
+_SEPARATED = re.compile(r"^(\d{4})([-/.])(\d{1,2})\2(\d{1,2})(?:[ T].*)?$")
+_COMPACT = re.compile(r"^(\d{4})(\d{2})(\d{2})$")
+
+
+def normalize_date(value: Any) -> Optional[str]:
+    """
+    將日期轉為標準格式 YYYY-MM-DD（字串排序即日期排序）
+    空值回傳 None；無法解析的字串原樣（去除前後空白）保留，不遺失資料
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    s = str(value).strip()
+    if not s:
+        return None
+    m = _SEPARATED.match(s)
+    parts = (m.group(1), m.group(3), m.group(4)) if m else None
+    if parts is None:
+        m = _COMPACT.match(s)
+        parts = m.groups() if m else None
+    if parts is None:
+        return s
+    try:
+        return date(*(int(p) for p in parts)).isoformat()
+    except ValueError:
+        return s
+
+
+class IsoDate(TypeDecorator):
+    """
+    以字串儲存的日期欄位，寫入與比較時一律轉為 YYYY-MM-DD
+    可傳入 date/datetime 或常見字串格式（20110801、2011/08/01 ...）
+    """
+    impl = String(20)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return normalize_date(value)
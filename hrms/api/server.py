@@ -1,8 +1,19 @@
-from fastapi import FastAPI
-from ..persons.service import list_employees
+from typing import Dict, Iterator, List, Optional
+import json
+from fastapi import FastAPI, Query
+from fastapi.responses import StreamingResponse
+from ..persons.service import iter_employees
 
 app = FastAPI(title="HRMS CSV API")
 
+def _json_array(rows: Iterator[Dict]) -> Iterator[str]:
+    # 逐筆輸出 JSON 陣列，不需先把整張表轉成 list
+    yield "["
+    for i, row in enumerate(rows):
+        yield ("," if i else "") + json.dumps(row, ensure_ascii=False)
+    yield "]"
+
 @app.get("/employees")
-def employees():
-    return list_employees(only_active=True, limit=200)
+def employees(limit: Optional[int] = 200, columns: Optional[List[str]] = Query(None)):
+    rows = iter_employees(only_active=True, limit=limit, columns=columns)
+    return StreamingResponse(_json_array(rows), media_type="application/json")
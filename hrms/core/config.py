@@ -1,15 +1,43 @@
 from pydantic import BaseModel
 from dotenv import load_dotenv
+from typing import Optional
 import os, yaml
 
 load_dotenv()
 
 class CSVSettings(BaseModel):
     data_dir: str = os.getenv("HRMS_CSV_DATA_DIR", "./data")
+    # 行程共用資料表快取上限（MB），0 表示停用快取
+    cache_max_mb: int = int(os.getenv("HRMS_CSV_CACHE_MAX_MB", "256"))
+    # 主鍵與索引宣告
+    schema_path: str = os.getenv("HRMS_CSV_SCHEMA", "config/csv_schema.yaml")
+    # 寫入模式：rewrite（整檔重寫）| journal（追加異動檔，背景壓實）
+    write_mode: str = os.getenv("HRMS_CSV_WRITE_MODE", "rewrite")
+    journal_max_kb: int = int(os.getenv("HRMS_CSV_JOURNAL_MAX_KB", "1024"))
+    journal_max_age_s: int = int(os.getenv("HRMS_CSV_JOURNAL_MAX_AGE_S", "600"))
+    # 欄式 sidecar 快取（需 pyarrow）；sidecar_dir 空白表示 <data_dir>/.cache
+    sidecar_cache: bool = os.getenv("HRMS_CSV_SIDECAR", "true").lower() in ("1", "true", "yes")
+    sidecar_dir: str = os.getenv("HRMS_CSV_SIDECAR_DIR", "")
+    # 主鍵位移索引：未載入的表以 mmap 隨機讀取單筆
+    offset_index: bool = os.getenv("HRMS_CSV_OFFSET_INDEX", "true").lower() in ("1", "true", "yes")
+    # 載入表示法：raw（原樣）或 compact（去除補空白、低基數欄位轉 category）
+    load_profile: str = os.getenv("HRMS_CSV_LOAD_PROFILE", "raw")
+
+class SQLiteSettings(BaseModel):
+    # 相對路徑以專案根目錄為準
+    url: str = os.getenv("DB_URL", "sqlite:///./hrms.db")
+    # 連線時套用的 PRAGMA；空字串/null 表示沿用 SQLite 預設
+    journal_mode: str = os.getenv("HRMS_SQLITE_JOURNAL_MODE", "wal")
+    synchronous: str = os.getenv("HRMS_SQLITE_SYNCHRONOUS", "normal")
+    cache_size_kb: Optional[int] = int(os.getenv("HRMS_SQLITE_CACHE_SIZE_KB", "65536"))
+    mmap_size_mb: Optional[int] = int(os.getenv("HRMS_SQLITE_MMAP_SIZE_MB", "256"))
+    temp_store: str = os.getenv("HRMS_SQLITE_TEMP_STORE", "memory")
+    busy_timeout_ms: Optional[int] = int(os.getenv("HRMS_SQLITE_BUSY_TIMEOUT_MS", "5000"))
 
 class DBSettings(BaseModel):
     backend: str = os.getenv("HRMS_DB_BACKEND", "csv")
     csv: CSVSettings = CSVSettings()
+    sqlite: SQLiteSettings = SQLiteSettings()
 
 class Settings(BaseModel):
     app_name: str = os.getenv("APP_NAME", "HRMS CSV")
@@ -22,7 +50,28 @@ def load_settings_from_yaml(path: str = "config/settings.yaml") -> Settings:
             data = yaml.safe_load(f) or {}
         # 混入 YAML 設定（以 .env 為優先）
         if "database" in data and "csv" in data["database"]:
-            base.database.csv.data_dir = data["database"]["csv"].get("data_dir", base.database.csv.data_dir)
+            csv_cfg = data["database"]["csv"] or {}
+            base.database.csv.data_dir = csv_cfg.get("data_dir", base.database.csv.data_dir)
+            base.database.csv.cache_max_mb = int(csv_cfg.get("cache_max_mb", base.database.csv.cache_max_mb))
+            base.database.csv.schema_path = csv_cfg.get("schema_path", base.database.csv.schema_path)
+            base.database.csv.write_mode = csv_cfg.get("write_mode", base.database.csv.write_mode)
+            base.database.csv.journal_max_kb = int(csv_cfg.get("journal_max_kb", base.database.csv.journal_max_kb))
+            base.database.csv.journal_max_age_s = int(csv_cfg.get("journal_max_age_s", base.database.csv.journal_max_age_s))
+            base.database.csv.sidecar_cache = bool(csv_cfg.get("sidecar_cache", base.database.csv.sidecar_cache))
+            base.database.csv.sidecar_dir = csv_cfg.get("sidecar_dir", base.database.csv.sidecar_dir) or ""
+            base.database.csv.offset_index = bool(csv_cfg.get("offset_index", base.database.csv.offset_index))
+            base.database.csv.load_profile = csv_cfg.get("load_profile", base.database.csv.load_profile)
+        if "database" in data and "sqlite" in data["database"]:
+            sqlite_cfg = data["database"]["sqlite"] or {}
+            sq = base.database.sqlite
+            # DB_URL 環境變數優先於 YAML
+            sq.url = os.getenv("DB_URL") or sqlite_cfg.get("url", sq.url)
+            for key in ("journal_mode", "synchronous", "temp_store"):
+                if key in sqlite_cfg:
+                    setattr(sq, key, sqlite_cfg[key] or "")
+            for key in ("cache_size_kb", "mmap_size_mb", "busy_timeout_ms"):
+                if key in sqlite_cfg:
+                    setattr(sq, key, None if sqlite_cfg[key] is None else int(sqlite_cfg[key]))
         if "app_name" in data:
             base.app_name = data["app_name"] or base.app_name
     return base
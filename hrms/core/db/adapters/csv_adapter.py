@@ -1,13 +1,86 @@
 from __future__ import annotations
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from contextlib import ExitStack
+from dataclasses import dataclass, field
 from pathlib import Path
 import pandas as pd
 from filelock import FileLock
 import os
+import tempfile
+import threading
+import time
+from .table_cache import SnapshotVersion, TableCache, file_version, shared_table_cache, snapshot_version
+from .csv_sidecar import SidecarStore
+from .csv_offsets import offset_index
+from .csv_profile import (LOAD_PROFILES, compact_frame, expand_categoricals, memory_bytes, recategorize,
+                          strip_frame, writable_for_row)
+from .csv_index import TableIndexes, TableSpec, build_table_indexes
+from .csv_journal import Journal, fold
+from ..database import DBAdapter
+from ..filters import Eq, Expr
 
-class CSVAdapter:
-    def __init__(self, data_dir: str):
+# 篩選條件：舊式 {欄位: 值} 等值條件，或 hrms.core.db.filters 的運算式
+Filters = Union[Dict[str, str], Expr]
+
+WRITE_MODES = ("rewrite", "journal")
+
+# 背景壓實中的 CSV 路徑（跨 adapter 實例共用，避免同一表重複啟動）
+_compacting: set = set()
+_compacting_lock = threading.Lock()
+
+class CSVConflictError(RuntimeError):
+    """交易提交時發現資料表已被其他程序修改"""
+
+
+@dataclass
+class _PendingTable:
+    """交易中尚未寫回的資料表"""
+    path: Path
+    df: pd.DataFrame
+    indexes: Optional[TableIndexes]
+    # 交易中第一次讀取該表時的檔案版本；提交時不一致即為衝突
+    version: Optional[SnapshotVersion]
+    # 交易開始修改前的快照（journal 模式提交時沿用其快取記憶體估計）
+    base: Optional[pd.DataFrame] = None
+    # journal 模式提交時追加的異動記錄
+    records: List[Dict] = field(default_factory=list)
+
+
+class CSVAdapter(DBAdapter):
+    def __init__(self, data_dir: str, cache: Optional[TableCache] = None,
+                 schema: Optional[Dict[str, TableSpec]] = None,
+                 write_mode: str = "rewrite",
+                 journal_max_bytes: int = 1024 * 1024,
+                 journal_max_age: float = 600.0,
+                 sidecar: bool = True,
+                 sidecar_dir: Optional[str] = None,
+                 offset_index: bool = True,
+                 load_profile: str = "raw"):
         self.data_dir = Path(data_dir)
+        # 預設使用行程共用快取；回傳的 DataFrame 為唯讀快照
+        self.cache = cache if cache is not None else shared_table_cache
+        # {CSV 檔名大寫: TableSpec}，決定載入時建立哪些索引
+        self.schema = schema or {}
+        # rewrite：每次寫入整檔重寫；journal：單筆異動追加到 <TABLE>.csv.journal，
+        # 超過大小/時間門檻後於背景壓實回 CSV
+        if write_mode not in WRITE_MODES:
+            raise ValueError(f"未知的 write_mode：{write_mode}")
+        self.write_mode = write_mode
+        self.journal_max_bytes = journal_max_bytes
+        self.journal_max_age = journal_max_age
+        # 欄式 sidecar（<data_dir>/.cache/<TABLE>.csv.arrow）：冷啟動時取代 CSV 文字解析
+        # raw：保留 CSV 原樣；compact：去除補空白、schema 宣告的 categorical 欄位轉為 category
+        if load_profile not in LOAD_PROFILES:
+            raise ValueError(f"未知的 load_profile：{load_profile}")
+        self.load_profile = load_profile
+        self.sidecar = SidecarStore(Path(sidecar_dir) if sidecar_dir else self.data_dir / ".cache",
+                                    enabled=sidecar, tag="" if load_profile == "raw" else load_profile)
+        # 主鍵 → 位移索引（存於 sidecar 目錄）：未載入的表以 mmap 直接讀取單筆，不必解析整檔
+        self.offset_index = offset_index
+        # begin() 之後的異動暫存在記憶體（CSV 路徑 → _PendingTable），commit() 時每表寫一次
+        self._tx: Optional[Dict[str, _PendingTable]] = None
+        # 交易中讀取過的表 → 讀取當時的檔案版本（CSV 路徑 → SnapshotVersion）
+        self._read_versions: Dict[str, Optional[SnapshotVersion]] = {}
 
     # ---------- helpers ----------
     def _csv_path(self, table: str) -> Path:
@@ -20,73 +93,589 @@ class CSVAdapter:
             # 建立空檔含表頭（暫時無欄位，等第一次 upsert 時再補）
             p.write_text("", encoding="utf-8")
 
+    def _lock(self, p: Path) -> FileLock:
+        return FileLock(str(p) + ".lock")
+
+    @property
+    def _compact(self) -> bool:
+        return self.load_profile == "compact"
+
+    def _categorical(self, p: Path) -> List[str]:
+        spec = self.schema.get(p.stem.upper())
+        return list(spec.categorical) if spec is not None else []
+
+    def _apply_profile(self, p: Path, df: pd.DataFrame, strip: bool = True) -> pd.DataFrame:
+        if not self._compact:
+            return df
+        return compact_frame(df, self._categorical(p), strip=strip)
+
+    def _clean(self, row: Dict) -> Dict:
+        # 寫入值一律為字串；compact 模式同時去除前後空白，與重新載入後的內容一致
+        row = {k: ("" if v is None else str(v)) for k, v in row.items()}
+        if self._compact:
+            row = {k: v.strip() for k, v in row.items()}
+        return row
+
+    def _parse_csv(self, p: Path) -> pd.DataFrame:
+        if not p.exists() or p.stat().st_size == 0:
+            return pd.DataFrame()
+        df = self.sidecar.load(p)
+        if df is not None:
+            return df
+        before = file_version(p)
+        # utf-8-sig：Access 匯出的檔案帶 BOM，否則第一個欄位名稱會多出 \ufeff
+        df = pd.read_csv(p, dtype=str, keep_default_na=False, encoding="utf-8-sig")
+        df = self._apply_profile(p, df)
+        # 解析期間檔案未變動才寫 sidecar，避免快取到不一致的內容
+        if before is not None and file_version(p) == before:
+            self.sidecar.save(p, df, *before)
+        return df
+
+    def _load_table(self, p: Path) -> pd.DataFrame:
+        # CSV 主檔 + 尚未壓實的 journal（呼叫端若需一致性須持有鎖）
+        df = self._parse_csv(p)
+        records = Journal(p).read()
+        if records:
+            df = self._apply_profile(p, self._replay(df, records))
+        return df
+
+    def _load_table_locked(self, p: Path) -> pd.DataFrame:
+        # 有 journal 時在鎖內讀取，避免與壓實交錯讀到一半的狀態
+        if not Journal(p).exists():
+            return self._load_table(p)
+        with self._lock(p):
+            return self._load_table(p)
+
     def _read_df(self, table: str) -> pd.DataFrame:
+        # 唯讀快照：需要修改時請先 copy()
         p = self._csv_path(table)
-        if not p.exists() or p.stat().st_size == 0:
+        if self._tx is not None and str(p) in self._tx:
+            return self._tx[str(p)].df
+        if not p.exists():
             return pd.DataFrame()
-        return pd.read_csv(p, dtype=str, keep_default_na=False, encoding="utf-8")
+        watch = (Journal(p).path,)
+        before = snapshot_version(p, watch) if self._tx is not None else None
+        df = self.cache.get(p, self._load_table_locked, watch=watch)
+        self._note_read(p, df, before)
+        return df
+
+    def _note_read(self, p: Path, df: Optional[pd.DataFrame], before: Optional[SnapshotVersion]):
+        """
+        交易中記下第一次讀到的檔案版本：快照仍在快取時取其版本，
+        否則取讀取前的版本（讀取期間若有變動，提交時會保守地視為衝突）
+        """
+        if self._tx is None or str(p) in self._read_versions:
+            return
+        version = self.cache.version_of(p, df) if df is not None else None
+        self._read_versions[str(p)] = version if version is not None else before
+
+    def _replay(self, df: pd.DataFrame, records: List[Dict]) -> pd.DataFrame:
+        """將 journal 合併進主檔：每個主鍵只套用最終狀態，刪除與追加各做一次"""
+        df = expand_categoricals(df)
+        indexes = TableIndexes()
+        drop_labels: List = []
+        appends: List[Dict] = []
+        for (pk, value), op in fold(records).items():
+            if pk not in df.columns:
+                df[pk] = ""
+            labels = indexes.ensure(df, pk, unique=True).lookup(value)
+            if op.deleted:
+                drop_labels.extend(labels)
+                labels = []
+            if op.row is None:
+                continue
+            for col in op.row:
+                if col not in df.columns:
+                    df[col] = ""
+            if labels:
+                df.loc[labels, list(op.row.keys())] = list(op.row.values())
+            else:
+                appends.append(op.row)
+        if drop_labels:
+            df = df.drop(index=drop_labels)
+        if appends:
+            start = int(df.index.max()) + 1 if len(df) else 0
+            rows = [{c: r.get(c, "") for c in df.columns} for r in appends]
+            df = pd.concat([df, pd.DataFrame(rows, index=range(start, start + len(rows)))])
+        return df
+
+    def _indexes(self, table: str, df: pd.DataFrame) -> TableIndexes:
+        # 交易中的暫存表自帶索引
+        p = self._csv_path(table)
+        pending = self._tx.get(str(p)) if self._tx is not None else None
+        if pending is not None and pending.df is df:
+            if pending.indexes is None:
+                pending.indexes = build_table_indexes(df, self.schema.get(table.upper()))
+            return pending.indexes
+        # 索引依附於快取中的快照；df 未被快取時建立一次性的索引
+        extras = self.cache.extras(p, df)
+        if extras is None:
+            extras = {}
+        indexes = extras.get("indexes")
+        if indexes is None:
+            indexes = build_table_indexes(df, self.schema.get(table.upper()))
+            extras["indexes"] = indexes
+        return indexes
 
-    def _write_df(self, table: str, df: pd.DataFrame):
+    def _write_df(self, table: str, df: pd.DataFrame, indexes: Optional[TableIndexes] = None):
         p = self._csv_path(table)
-        lock = FileLock(str(p) + ".lock")
+        lock = self._lock(p)
+        journal = Journal(p)
         with lock:
-            df.to_csv(p, index=False, encoding="utf-8")
+            self._atomic_to_csv(df, p)
+            # 整檔重寫已包含全部異動，舊 journal 作廢
+            journal.clear()
+            # 在鎖內取版本，確保快取內容與檔案一致；索引已就地更新則一併放入
+            self.cache.put(p, df, extras={"indexes": indexes} if indexes is not None else None,
+                           watch=(journal.path,))
 
-    # ---------- CRUD ----------
-    def list(self, table: str, filters: Optional[Dict[str, str]] = None, limit: Optional[int] = None) -> List[Dict]:
-        df = self._read_df(table)
+    @staticmethod
+    def _write_temp(df: pd.DataFrame, p: Path) -> str:
+        # 與目標同目錄的臨時檔，確保 os.replace 為同一檔案系統上的原子改名
+        p.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=p.name + ".", suffix=".tmp", dir=str(p.parent))
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+                df.to_csv(f, index=False)
+                f.flush()
+                os.fsync(f.fileno())
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        return tmp
+
+    @classmethod
+    def _atomic_to_csv(cls, df: pd.DataFrame, p: Path):
+        # 寫臨時檔 → 原子改名，讀取端不會看到寫到一半的檔案
+        os.replace(cls._write_temp(df, p), p)
+
+    def _save(self, table: str, base: pd.DataFrame, df: pd.DataFrame,
+              indexes: Optional[TableIndexes], records: List[Dict]):
+        """依目前模式落地一次異動：交易中暫存、journal 追加或整檔重寫"""
+        # 批次寫入路徑會把 category 還原為字串；快取前只把這些欄位轉回（值已清理，不必再 strip）
+        if self._compact:
+            df = recategorize(df, self._categorical(self._csv_path(table)))
+        if self._tx is not None:
+            self._stage(table, base, df, indexes, records)
+        elif self.write_mode == "journal" and not base.empty:
+            self._append_journal(table, base, df, indexes, records)
+        else:
+            self._write_df(table, df, indexes)
+
+    # ---------- transaction ----------
+    def begin(self):
+        """開始交易：之後的異動只留在記憶體，直到 commit()"""
+        if self._tx is not None:
+            raise RuntimeError("CSVAdapter 交易已開始")
+        self._tx = {}
+        self._read_versions = {}
+
+    def _stage(self, table: str, base: pd.DataFrame, df: pd.DataFrame, indexes: Optional[TableIndexes],
+               records: List[Dict]):
+        p = self._csv_path(table)
+        pending = self._tx.get(str(p))
+        if pending is None:
+            # 版本以交易中第一次讀取時為準；交易前就取得的快照則取其快取版本
+            if str(p) in self._read_versions:
+                version = self._read_versions[str(p)]
+            else:
+                version = self.cache.version_of(p, base)
+                if version is None:
+                    version = snapshot_version(p, (Journal(p).path,))
+            pending = self._tx[str(p)] = _PendingTable(p, df, indexes, version, base=base)
+        else:
+            pending.df = df
+            pending.indexes = indexes
+        pending.records.extend(records)
+
+    def commit(self):
+        """
+        每個有異動的表只寫一次：先取得全部鎖並檢查版本，
+        rewrite 模式全部寫成臨時檔後才逐一原子改名；journal 模式（表已有內容時）只追加異動記錄
+        """
+        pending, self._tx = self._tx, None
+        self._read_versions = {}
+        if not pending:
+            return
+        tables = [pending[k] for k in sorted(pending)]
+        # 交易開始時已有內容的表才能以 journal 重播
+        journaled = [t for t in tables
+                     if self.write_mode == "journal" and t.base is not None and not t.base.empty]
+        rewritten = [t for t in tables if t not in journaled]
+        temps: List[str] = []
+        with ExitStack() as stack:
+            for t in tables:
+                stack.enter_context(self._lock(t.path))
+            for t in tables:
+                if snapshot_version(t.path, (Journal(t.path).path,)) != t.version:
+                    raise CSVConflictError(f"{t.path.name} 已被其他程序修改，交易取消")
+            # 先寫完所有臨時檔（最可能失敗的一步），失敗時尚未改動任何既有檔案
+            try:
+                for t in rewritten:
+                    temps.append(self._write_temp(t.df, t.path))
+            except BaseException:
+                for tmp in temps:
+                    os.unlink(tmp)
+                raise
+            for t in journaled:
+                journal = Journal(t.path)
+                journal.append(t.records)
+                self.cache.put(t.path, t.df, extras={"indexes": t.indexes} if t.indexes is not None else None,
+                               watch=(journal.path,), based_on=t.base)
+            for t, tmp in zip(rewritten, temps):
+                os.replace(tmp, t.path)
+                journal = Journal(t.path)
+                journal.clear()
+                self.cache.put(t.path, t.df, extras={"indexes": t.indexes} if t.indexes is not None else None,
+                               watch=(journal.path,))
+        for t in journaled:
+            self._maybe_compact(t.path.stem, Journal(t.path))
+
+    def rollback(self):
+        """放棄交易中的所有異動"""
+        self._tx = None
+        self._read_versions = {}
+
+    def _append_journal(self, table: str, base: pd.DataFrame, df: pd.DataFrame,
+                        indexes: Optional[TableIndexes], records: List[Dict]):
+        """journal 模式寫入：只追加異動，快取直接換成記憶體中已套用的新快照"""
+        p = self._csv_path(table)
+        journal = Journal(p)
+        watch = (journal.path,)
+        with self._lock(p):
+            # 若 base 不是最新版本（其他行程已寫入），只追加異動、讓快取重新載入
+            fresh = self.cache.version_of(p, base) == snapshot_version(p, watch)
+            journal.append(records)
+            if fresh:
+                self.cache.put(p, df, extras={"indexes": indexes} if indexes is not None else None,
+                               watch=watch, based_on=base)
+            else:
+                self.cache.invalidate(p)
+        self._maybe_compact(table, journal)
+
+    def _maybe_compact(self, table: str, journal: Journal):
+        if journal.size() < self.journal_max_bytes:
+            first = journal.first_ts()
+            if first is None or time.time() - first < self.journal_max_age:
+                return
+        key = str(self._csv_path(table).resolve())
+        with _compacting_lock:
+            if key in _compacting:
+                return
+            _compacting.add(key)
+
+        def run():
+            try:
+                self.compact(table)
+            except Exception:
+                # 壓實失敗不影響資料：journal 仍保留，下次寫入會再嘗試
+                pass
+            finally:
+                with _compacting_lock:
+                    _compacting.discard(key)
+
+        threading.Thread(target=run, name=f"csv-compact-{table}", daemon=True).start()
+
+    def compact(self, table: str) -> bool:
+        """將 journal 併回 CSV 主檔（寫臨時檔 → 原子改名）；沒有 journal 時回傳 False"""
+        p = self._csv_path(table)
+        journal = Journal(p)
+        with self._lock(p):
+            if not journal.exists():
+                return False
+            df = self._load_table(p)
+            self._atomic_to_csv(df, p)
+            journal.clear()
+            self.cache.put(p, df, watch=(journal.path,))
+        return True
+
+    @staticmethod
+    def _row_values(df: pd.DataFrame, label, columns) -> Dict:
+        return {c: df.at[label, c] for c in columns if c in df.columns}
+
+    def _in_memory(self, table: str) -> Optional[pd.DataFrame]:
+        # 已在交易暫存或快取中的表直接使用；有 journal 的表需完整載入才能合併
+        p = self._csv_path(table)
+        if self._tx is not None and str(p) in self._tx:
+            return self._tx[str(p)].df
+        journal = Journal(p)
+        if journal.exists():
+            return self._read_df(table)
+        df = self.cache.peek(p, watch=(journal.path,))
+        if df is not None:
+            self._note_read(p, df, None)
+        return df
+
+    def _filter_df(self, table: str, df: pd.DataFrame, filters: Optional[Filters]) -> pd.DataFrame:
+        if isinstance(filters, Expr):
+            # 等值/集合條件先用索引取候選列，再對候選列套用完整遮罩（一次向量化）
+            labels = filters.labels(self._indexes(table, df))
+            if labels is not None:
+                df = df.loc[sorted(labels)]
+            return df[filters.mask(df)]
         if filters:
+            filters = {k: v for k, v in filters.items() if k in df.columns}
+            indexes = self._indexes(table, df)
+            # 先用第一個有索引的欄位縮小範圍，其餘條件再以遮罩過濾
+            indexed = next((k for k in filters if indexes.get(k) is not None), None)
+            if indexed is not None:
+                df = df.loc[sorted(indexes.get(indexed).lookup(filters.pop(indexed)))]
             for k, v in filters.items():
-                if k in df.columns:
-                    df = df[df[k].astype(str) == str(v)]
+                df = df[Eq(k, str(v)).mask(df)]
+        return df
+
+    # ---------- CRUD ----------
+    def list(self, table: str, filters: Optional[Filters] = None, limit: Optional[int] = None) -> List[Dict]:
+        if limit is not None and self._in_memory(table) is None:
+            # 尚未載入的表：邊讀邊篩，湊滿 limit 即停止解析
+            return list(self.iter_rows(table, filters=filters, limit=limit))
+        df = self._filter_df(table, self._read_df(table), filters)
         if limit is not None:
             df = df.head(limit)
         return df.to_dict(orient="records")
 
+    def iter_rows(self, table: str, filters: Optional[Filters] = None,
+                  columns: Optional[Sequence[str]] = None, chunksize: int = 1000,
+                  limit: Optional[int] = None) -> Iterator[Dict]:
+        """
+        逐列產生資料（dict），記憶體用量只與 chunksize 有關
+        - 表已在記憶體（快取/交易/journal）時直接分段走訪，不重新解析
+        - 否則以 pd.read_csv(chunksize=...) 分段讀檔，只解析 columns 與篩選欄位，達到 limit 即停止
+        - 串流讀取不放入快取，避免大量匯出把其他表擠出快取
+        """
+        if limit is not None and limit <= 0:
+            return
+        emitted = 0
+        df = self._in_memory(table)
+        if df is not None:
+            chunks = self._memory_chunks(self._filter_df(table, df, filters), chunksize)
+            filters = None
+        else:
+            p = self._csv_path(table)
+            self._note_read(p, None, snapshot_version(p, (Journal(p).path,)))
+            chunks = self._csv_chunks(p, filters, columns, chunksize)
+            if self._compact:
+                chunks = (strip_frame(c) for c in chunks)
+        for chunk in chunks:
+            if isinstance(filters, Expr):
+                chunk = chunk[filters.mask(chunk)]
+            elif filters:
+                for k, v in filters.items():
+                    if k in chunk.columns:
+                        chunk = chunk[chunk[k] == str(v)]
+            if columns is not None:
+                chunk = chunk[[c for c in columns if c in chunk.columns]]
+            if limit is not None:
+                chunk = chunk.head(limit - emitted)
+            for rec in chunk.to_dict(orient="records"):
+                yield rec
+            emitted += len(chunk)
+            if limit is not None and emitted >= limit:
+                return
+
+    @staticmethod
+    def _memory_chunks(df: pd.DataFrame, chunksize: int) -> Iterator[pd.DataFrame]:
+        for start in range(0, len(df), chunksize):
+            yield df.iloc[start:start + chunksize]
+
+    @staticmethod
+    def _csv_chunks(p: Path, filters: Optional[Filters], columns: Optional[Sequence[str]],
+                    chunksize: int) -> Iterator[pd.DataFrame]:
+        if not p.exists() or p.stat().st_size == 0:
+            return
+        usecols = None
+        if columns is not None:
+            filter_cols = filters.columns() if isinstance(filters, Expr) else set(filters or ())
+            wanted = set(columns) | filter_cols
+            usecols = lambda c: c in wanted
+        with pd.read_csv(p, dtype=str, keep_default_na=False, encoding="utf-8-sig",
+                         usecols=usecols, chunksize=chunksize) as reader:
+            yield from reader
+
     def get_by_pk(self, table: str, pk: str, value: str) -> Optional[Dict]:
-        df = self._read_df(table)
+        df = self._in_memory(table)
+        if df is None and self.offset_index:
+            # 未載入的表：以位移索引只讀取該筆，不解析整檔
+            p = self._csv_path(table)
+            if p.exists():
+                self._note_read(p, None, snapshot_version(p, (Journal(p).path,)))
+                usable, rec = offset_index(p, pk, self.sidecar.cache_dir, strip=self._compact).get(value)
+                if usable:
+                    return rec
+        if df is None:
+            df = self._read_df(table)
         if pk not in df.columns:
             return None
-        rows = df[df[pk].astype(str) == str(value)]
-        if rows.empty:
+        labels = self._indexes(table, df).ensure(df, pk, unique=True).lookup(value)
+        if not labels:
             return None
-        rec = rows.iloc[0].to_dict()
+        rec = df.loc[labels[0]].to_dict()
         return rec
 
     def upsert(self, table: str, pk: str, row: Dict) -> Dict:
         # 讀檔 → 更新或追加 → 寫回
-        df = self._read_df(table)
+        base = self._read_df(table)
+        # 索引逐鍵 copy-on-write：舊快照的索引保持不變，新快照只記錄異動的鍵
+        indexes = self._indexes(table, base).copy()
+        row = self._clean(row)
+        # 淺複本：只有被寫入的欄位會被複製
+        df = writable_for_row(base, row)
         # 若空表，建立欄位
         if df.empty:
             df = pd.DataFrame(columns=list(row.keys()))
+            indexes = TableIndexes()
         # 確保所有欄位存在
         for col in row.keys():
             if col not in df.columns:
                 df[col] = ""
-        row = {k: ("" if v is None else str(v)) for k, v in row.items()}
         if pk not in df.columns:
             df[pk] = ""
-        mask = df[pk].astype(str) == str(row.get(pk, ""))
-        if mask.any():
-            df.loc[mask, list(row.keys())] = list(row.values())
+        labels = indexes.ensure(df, pk, unique=True).lookup(row.get(pk, ""))
+        if labels:
+            old = {label: self._row_values(df, label, indexes.by_column) for label in labels}
+            df.loc[labels, list(row.keys())] = list(row.values())
+            for label in labels:
+                indexes.update_row(label, old[label], row)
         else:
-            df = pd.concat([df, pd.DataFrame([row])], ignore_index=True)
-        self._write_df(table, df)
+            # 新列標籤接在最大值之後，既有列標籤不變，索引才能沿用
+            label = int(df.index.max()) + 1 if len(df) else 0
+            full = {c: row.get(c, "") for c in df.columns}
+            new = pd.DataFrame([full], index=[label])
+            # 新列沿用既有欄位型別（category 欄位已含新值），合併後不會退化成 object
+            new = new.astype({c: t for c, t in df.dtypes.items() if isinstance(t, pd.CategoricalDtype)})
+            df = pd.concat([df, new])
+            indexes.add_row(label, full)
+        self._save(table, base, df, indexes, [{"op": "upsert", "pk": pk, "row": row}])
         return row
 
     def delete(self, table: str, pk: str, value: str) -> bool:
-        df = self._read_df(table)
-        if df.empty or pk not in df.columns:
+        base = self._read_df(table)
+        if base.empty or pk not in base.columns:
             return False
-        before = len(df)
-        df = df[df[pk].astype(str) != str(value)]
-        if len(df) == before:
+        indexes = self._indexes(table, base).copy()
+        labels = indexes.ensure(base, pk, unique=True).lookup(value)
+        if not labels:
             return False
-        self._write_df(table, df)
+        for label in labels:
+            indexes.remove_row(label, self._row_values(base, label, indexes.by_column))
+        df = base.drop(index=labels)
+        self._save(table, base, df, indexes, [{"op": "delete", "pk": pk, "value": str(value)}])
         return True
 
+    def upsert_many(self, table: str, pk: str, rows: Sequence[Dict]) -> Dict[str, int]:
+        # 一次合併：以主鍵 join 既有資料，整批更新/追加後只寫一次
+        if not rows:
+            return {"inserted": 0, "updated": 0}
+        norm = [self._clean(r) for r in rows]
+        new = pd.DataFrame(norm)
+        if pk not in new.columns:
+            new[pk] = ""
+        new[pk] = new[pk].fillna("")
+        # 同一主鍵出現多次：依序合併欄位（後者覆蓋前者），與逐筆 upsert 結果相同
+        new = new.groupby(pk, sort=False, dropna=False).last().reset_index()
+
+        base = self._read_df(table)
+        df = expand_categoricals(base) if not base.empty else pd.DataFrame(columns=list(new.columns))
+        for col in new.columns:
+            if col not in df.columns:
+                df[col] = ""
+
+        exists = new[pk].isin(df[pk])
+        updates = new[exists].set_index(pk)
+        inserts = new[~exists]
+        if len(updates):
+            # 只覆蓋有提供的欄位（NaN 表示該列未提供）
+            patch = df.loc[df[pk].isin(updates.index), [pk]].join(updates, on=pk)
+            df.update(patch[list(updates.columns)])
+        if len(inserts):
+            start = int(df.index.max()) + 1 if len(df) else 0
+            inserts = inserts.reindex(columns=df.columns).fillna("")
+            inserts.index = range(start, start + len(inserts))
+            df = pd.concat([df, inserts])
+
+        records = [{"op": "upsert", "pk": pk, "row": {k: v for k, v in r.items() if isinstance(v, str)}}
+                   for r in new.to_dict(orient="records")]
+        # 批次異動後索引於下次讀取時重建
+        self._save(table, base, df, None, records)
+        return {"inserted": int(len(inserts)), "updated": int(len(updates))}
+
+    def delete_many(self, table: str, pk: str, values: Sequence[str]) -> Dict[str, int]:
+        base = self._read_df(table)
+        if base.empty or pk not in base.columns or not values:
+            return {"deleted": 0}
+        keys = pd.Index([str(v) for v in values]).unique()
+        mask = base[pk].astype(str).isin(keys)
+        deleted = int(mask.sum())
+        if deleted == 0:
+            return {"deleted": 0}
+        df = base[~mask]
+        present = base.loc[mask, pk].astype(str).unique()
+        records = [{"op": "delete", "pk": pk, "value": v} for v in present]
+        self._save(table, base, df, None, records)
+        return {"deleted": deleted}
+
+    def _derived(self, table: str, df: pd.DataFrame, key: str, build):
+        # 由快照衍生的小型結構（代碼清單、對照表）掛在快照的 extras 上，CSV 變動時一起失效
+        extras = self.cache.extras(self._csv_path(table), df)
+        if extras is None:
+            return build()
+        value = extras.get(key)
+        if value is None:
+            value = extras[key] = build()
+        return value
+
     def list_distinct(self, table: str, column: str) -> List[str]:
         df = self._read_df(table)
         if df.empty or column not in df.columns:
             return []
-        return [str(x) for x in df[column].dropna().astype(str).drop_duplicates().sort_values().tolist()]
+
+        def build():
+            s = df[column]
+            if isinstance(s.dtype, pd.CategoricalDtype):
+                # category 欄位只需走訪實際用到的代碼
+                s = pd.Series(s.cat.remove_unused_categories().cat.categories)
+            return [str(x) for x in s.dropna().astype(str).drop_duplicates().sort_values().tolist()]
+
+        return list(self._derived(table, df, f"distinct:{column}", build))
+
+    def value_map(self, table: str, key_column: str, value_column: str) -> Dict[str, str]:
+        """key_column → value_column 對照（key 重複時取第一筆，略過空白）"""
+        df = self._read_df(table)
+        if df.empty or key_column not in df.columns or value_column not in df.columns:
+            return {}
+
+        def build():
+            keys = df[key_column].astype(str).str.strip()
+            values = df[value_column].astype(str).str.strip()
+            mapping: Dict[str, str] = {}
+            for k, v in zip(keys.tolist(), values.tolist()):
+                if k and v and k not in mapping:
+                    mapping[k] = v
+            return mapping
+
+        return dict(self._derived(table, df, f"map:{key_column}:{value_column}", build))
+
+    def options(self, table: str, value_column: str, label_columns: Sequence[str] = ()) -> List[Tuple[str, str]]:
+        """下拉選單選項 [(標籤, 值), ...]：值不重複（取第一筆）、保留檔案順序，略過空白值"""
+        df = self._read_df(table)
+        if df.empty or value_column not in df.columns:
+            return []
+        labels = [c for c in label_columns if c in df.columns]
+
+        def build():
+            cols = [df[c].astype(str).str.strip().tolist() for c in (value_column, *labels)]
+            seen = set()
+            options: List[Tuple[str, str]] = []
+            for value, *parts in zip(*cols):
+                if not value or value in seen:
+                    continue
+                seen.add(value)
+                parts = [part for part in parts if part]
+                options.append((f"{value} - {' / '.join(parts)}" if parts else value, value))
+            return options
+
+        return list(self._derived(table, df, f"options:{value_column}:{','.join(labels)}", build))
+
+    def memory_usage(self, table: str) -> int:
+        """目前載入表示法的記憶體用量（bytes，含字串內容）"""
+        return memory_bytes(self._read_df(table))
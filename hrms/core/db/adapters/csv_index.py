@@ -0,0 +1,158 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+import os
+import pandas as pd
+import yaml
+
+
+@dataclass
+class TableSpec:
+    """config/csv_schema.yaml 中單一資料表的主鍵與索引宣告"""
+    primary_key: Optional[str] = None
+    indexes: List[str] = field(default_factory=list)
+    # compact 載入表示法下以 category 儲存的低基數欄位
+    categorical: List[str] = field(default_factory=list)
+
+
+def load_csv_schema(path: str = "config/csv_schema.yaml") -> Dict[str, TableSpec]:
+    """讀取 CSV 規格檔，回傳 {CSV 檔名大寫: TableSpec}"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+    specs: Dict[str, TableSpec] = {}
+    for name, cfg in (data.get("tables") or {}).items():
+        cfg = cfg or {}
+        csv_name = str(cfg.get("csv_name", name)).upper()
+        specs[csv_name] = TableSpec(
+            primary_key=cfg.get("primary_key"),
+            indexes=list(cfg.get("indexes") or []),
+            categorical=list(cfg.get("categorical") or []),
+        )
+    return specs
+
+
+class HashIndex:
+    """
+    欄位值 → DataFrame 列標籤（index label）的雜湊索引
+    - 以字串比對，與原本 `df[col].astype(str) == str(v)` 語意相同
+    - unique 只代表宣告為主鍵；舊資料若有重複值仍全部保留，查詢時取第一筆
+    - 逐鍵 copy-on-write：_map 建立後不再修改，可由多份快照共用；
+      add/remove 只把異動的鍵寫進 _overlay（空 list 表示已刪除），copy() 只複製 _overlay。
+      _overlay 超過 _map 的 1/8 時合併成新的 _map（攤銷後每次寫入 O(1)）
+    """
+
+    def __init__(self, column: str, unique: bool = False, mapping: Optional[Dict[str, List]] = None,
+                 overlay: Optional[Dict[str, List]] = None):
+        self.column = column
+        self.unique = unique
+        self._map: Dict[str, List] = mapping if mapping is not None else {}
+        self._overlay: Dict[str, List] = overlay if overlay is not None else {}
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, column: str, unique: bool = False) -> "HashIndex":
+        mapping: Dict[str, List] = {}
+        for label, value in zip(df.index.tolist(), df[column].astype(str).tolist()):
+            bucket = mapping.get(value)
+            if bucket is None:
+                mapping[value] = [label]
+            else:
+                bucket.append(label)
+        return cls(column, unique, mapping)
+
+    def _bucket(self, key: str) -> List:
+        bucket = self._overlay.get(key)
+        return bucket if bucket is not None else self._map.get(key, [])
+
+    def lookup(self, value) -> List:
+        return self._bucket(str(value))
+
+    def lookup_many(self, values: Iterable) -> List:
+        labels: List = []
+        for v in values:
+            labels.extend(self._bucket(str(v)))
+        return labels
+
+    def keys(self) -> List[str]:
+        if not self._overlay:
+            return list(self._map.keys())
+        keys = [k for k in self._map if k not in self._overlay]
+        return keys + [k for k, bucket in self._overlay.items() if bucket]
+
+    def add(self, label, value):
+        key = str(value)
+        self._overlay[key] = self._bucket(key) + [label]
+        self._maybe_fold()
+
+    def remove(self, label, value):
+        key = str(value)
+        self._overlay[key] = [x for x in self._bucket(key) if x != label]
+        self._maybe_fold()
+
+    def _maybe_fold(self):
+        if len(self._overlay) <= max(64, len(self._map) // 8):
+            return
+        # 產生新的 _map，舊快照仍持有原本的 dict
+        mapping = dict(self._map)
+        for key, bucket in self._overlay.items():
+            if bucket:
+                mapping[key] = bucket
+            else:
+                mapping.pop(key, None)
+        self._map, self._overlay = mapping, {}
+
+    def copy(self) -> "HashIndex":
+        return HashIndex(self.column, self.unique, self._map, dict(self._overlay))
+
+    def __len__(self) -> int:
+        if not self._overlay:
+            return len(self._map)
+        return sum(1 for k in self._map if k not in self._overlay) + sum(1 for b in self._overlay.values() if b)
+
+
+class TableIndexes:
+    """單一資料表快照的全部索引（欄位名稱 → HashIndex）"""
+
+    def __init__(self, indexes: Optional[Dict[str, HashIndex]] = None):
+        self.by_column: Dict[str, HashIndex] = indexes or {}
+
+    def get(self, column: str) -> Optional[HashIndex]:
+        return self.by_column.get(column)
+
+    def ensure(self, df: pd.DataFrame, column: str, unique: bool = False) -> Optional[HashIndex]:
+        """取得欄位索引，不存在則建立；欄位不在表中時回傳 None"""
+        idx = self.by_column.get(column)
+        if idx is None and column in df.columns:
+            idx = HashIndex.build(df, column, unique)
+            self.by_column[column] = idx
+        return idx
+
+    def copy(self) -> "TableIndexes":
+        # 各欄位索引逐鍵 copy-on-write，成本與尚未合併的異動鍵數成正比
+        return TableIndexes({c: i.copy() for c, i in self.by_column.items()})
+
+    def add_row(self, label, row: Dict):
+        for col, idx in self.by_column.items():
+            idx.add(label, row.get(col, ""))
+
+    def remove_row(self, label, row: Dict):
+        for col, idx in self.by_column.items():
+            idx.remove(label, row.get(col, ""))
+
+    def update_row(self, label, old: Dict, new: Dict):
+        for col, idx in self.by_column.items():
+            if col in new and str(old.get(col, "")) != str(new[col]):
+                idx.remove(label, old.get(col, ""))
+                idx.add(label, new[col])
+
+
+def build_table_indexes(df: pd.DataFrame, spec: Optional[TableSpec]) -> TableIndexes:
+    indexes = TableIndexes()
+    if spec is None or df.empty:
+        return indexes
+    if spec.primary_key:
+        indexes.ensure(df, spec.primary_key, unique=True)
+    for col in spec.indexes:
+        indexes.ensure(df, col)
+    return indexes
@@ -0,0 +1,93 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import json
+import os
+import time
+
+
+@dataclass
+class JournalOp:
+    """同一個 (主鍵欄位, 主鍵值) 在 journal 中合併後的最終操作"""
+    deleted: bool = False          # 是否需先移除既有列
+    row: Optional[Dict] = None     # 最後要寫入的欄位；None 表示僅刪除
+
+
+class Journal:
+    """
+    CSV 資料表的 append-only 異動檔（<TABLE>.csv.journal）
+    每行一筆 JSON：{"op": "upsert"|"delete", "pk": 欄位, "row": {...} | "value": 值, "ts": 時間}
+    呼叫端需持有該表的 FileLock 再呼叫 append/clear
+    """
+
+    def __init__(self, csv_path: Path):
+        self.path = csv_path.with_name(csv_path.name + ".journal")
+
+    def exists(self) -> bool:
+        return self.path.exists() and self.path.stat().st_size > 0
+
+    def size(self) -> int:
+        try:
+            return self.path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def append(self, records: List[Dict]):
+        now = time.time()
+        payload = "".join(
+            json.dumps({**rec, "ts": now}, ensure_ascii=False) + "\n" for rec in records
+        )
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def read(self) -> List[Dict]:
+        if not self.path.exists():
+            return []
+        records = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # 寫到一半中斷的最後一行：忽略（fsync 前未完成的異動視為未發生）
+                    break
+        return records
+
+    def first_ts(self) -> Optional[float]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return float(json.loads(f.readline()).get("ts"))
+        except (FileNotFoundError, ValueError, TypeError):
+            return None
+
+    def clear(self):
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def fold(records: List[Dict]) -> Dict[Tuple[str, str], JournalOp]:
+    """依序合併 journal 記錄：同一主鍵多次 upsert 合併欄位，delete 之後的 upsert 視為重建"""
+    ops: Dict[Tuple[str, str], JournalOp] = {}
+    for rec in records:
+        pk = rec.get("pk")
+        if rec.get("op") == "upsert":
+            row = rec.get("row") or {}
+            key = (pk, str(row.get(pk, "")))
+            prev = ops.get(key)
+            if prev is None:
+                ops[key] = JournalOp(row=dict(row))
+            elif prev.row is None:
+                ops[key] = JournalOp(deleted=True, row=dict(row))
+            else:
+                prev.row.update(row)
+        elif rec.get("op") == "delete":
+            ops[(pk, str(rec.get("value", "")))] = JournalOp(deleted=True)
+    return ops
@@ -0,0 +1,187 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import csv
+import hashlib
+import io
+import json
+import mmap
+import os
+import tempfile
+import threading
+
+_FORMAT = 1
+
+
+def _records(mm, start: int, end: int):
+    """
+    由 start 起逐筆切出 CSV 記錄，回傳 (起始位移, 結束位移)
+    以引號奇偶判斷記錄邊界：引號內的換行（例如 BASIC.Meno）不會被當成新記錄
+    """
+    pos = start
+    while pos < end:
+        rec_start = pos
+        quotes = 0
+        while pos < end:
+            nl = mm.find(b"\n", pos, end)
+            line_end = end if nl < 0 else nl + 1
+            quotes += mm[pos:line_end].count(b'"')
+            pos = line_end
+            if quotes % 2 == 0:
+                break
+        yield rec_start, pos
+
+
+def _parse_record(raw: bytes) -> List[str]:
+    text = raw.decode("utf-8-sig")
+    return next(csv.reader(io.StringIO(text, newline="")), [])
+
+
+def _prefix_sha1(mm, end: int) -> str:
+    return hashlib.sha1(mm[:end]).hexdigest()
+
+
+class OffsetIndex:
+    """
+    主鍵 → 記錄起始位移的索引，持久化於 <cache_dir>/<TABLE>.csv.<pk>.offsets.json
+    - 查詢時以 mmap 直接跳到該列，只解析那一筆記錄
+    - 檔案只在尾端追加時（前段內容雜湊不變），從上次掃描位置續掃，不必整檔重建
+    - strip：鍵與回傳值去除前後空白（對應 compact 載入表示法）
+    """
+
+    def __init__(self, csv_path: Path, pk: str, store_path: Path, strip: bool = False):
+        self.csv_path = csv_path
+        self.pk = pk
+        self.store_path = store_path
+        self.strip = strip
+        self.header: List[str] = []
+        self.offsets: Dict[str, List[int]] = {}
+        self.size = -1
+        self.mtime_ns = -1
+        # 已掃描且以換行結尾的範圍；續掃從這裡開始
+        self.scanned_to = 0
+        self.prefix_sha1 = ""
+        self._lock = threading.Lock()
+
+    # ---------- persistence ----------
+    def _load(self) -> bool:
+        try:
+            with open(self.store_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return False
+        if data.get("format") != _FORMAT or data.get("pk") != self.pk or data.get("strip", False) != self.strip:
+            return False
+        self.header = data["header"]
+        self.offsets = {k: list(v) for k, v in data["offsets"].items()}
+        self.size, self.mtime_ns = data["size"], data["mtime_ns"]
+        self.scanned_to, self.prefix_sha1 = data["scanned_to"], data["prefix_sha1"]
+        return True
+
+    def _save(self):
+        data = {
+            "format": _FORMAT, "pk": self.pk, "strip": self.strip, "header": self.header, "offsets": self.offsets,
+            "size": self.size, "mtime_ns": self.mtime_ns,
+            "scanned_to": self.scanned_to, "prefix_sha1": self.prefix_sha1,
+        }
+        try:
+            self.store_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(prefix=self.store_path.name + ".", suffix=".tmp",
+                                       dir=str(self.store_path.parent))
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp, self.store_path)
+        except OSError:
+            # 無法寫入快取目錄時只保留在記憶體
+            pass
+
+    # ---------- build ----------
+    def _scan(self, mm, start: int, end: int):
+        # 續掃前先移除舊的未完成尾端記錄
+        if start > 0:
+            for key in list(self.offsets):
+                kept = [o for o in self.offsets[key] if o < start]
+                if kept:
+                    self.offsets[key] = kept
+                else:
+                    del self.offsets[key]
+        pk_pos = self.header.index(self.pk)
+        last_complete = start
+        for rec_start, rec_end in _records(mm, start, end):
+            if mm[rec_end - 1:rec_end] == b"\n":
+                last_complete = rec_end
+            fields = _parse_record(mm[rec_start:rec_end])
+            if not fields or fields == [""] or len(fields) <= pk_pos:
+                continue
+            key = fields[pk_pos].strip() if self.strip else fields[pk_pos]
+            self.offsets.setdefault(key, []).append(rec_start)
+        self.scanned_to = last_complete
+        self.prefix_sha1 = _prefix_sha1(mm, last_complete)
+
+    def _refresh(self, mm, st) -> bool:
+        """確保索引對應目前檔案；無法使用（空檔、無主鍵欄、欄名重複）時回傳 False"""
+        if st.st_size == self.size and st.st_mtime_ns == self.mtime_ns:
+            return bool(self.header)
+        if self.size < 0 and self._load() and st.st_size == self.size and st.st_mtime_ns == self.mtime_ns:
+            return bool(self.header)
+        end = len(mm)
+        appended = (
+            self.header and end > self.scanned_to > 0
+            and _prefix_sha1(mm, self.scanned_to) == self.prefix_sha1
+        )
+        if appended:
+            self._scan(mm, self.scanned_to, end)
+        else:
+            first = next(_records(mm, 0, end), None)
+            header = _parse_record(mm[first[0]:first[1]]) if first else []
+            self.size, self.mtime_ns = st.st_size, st.st_mtime_ns
+            if self.pk not in header or len(set(header)) != len(header):
+                self.header, self.offsets = [], {}
+                return False
+            self.header = header
+            self.offsets = {}
+            self._scan(mm, first[1], end)
+        self.size, self.mtime_ns = st.st_size, st.st_mtime_ns
+        self._save()
+        return True
+
+    # ---------- lookup ----------
+    def get(self, value) -> Tuple[bool, Optional[Dict]]:
+        """回傳 (可用, 資料列)；索引無法使用時 (False, None)，呼叫端改走一般路徑"""
+        with self._lock:
+            try:
+                # 同一個檔案描述子完成檢查、續掃與讀取，期間被原子改名替換也不會錯位
+                with open(self.csv_path, "rb") as f:
+                    st = os.fstat(f.fileno())
+                    if st.st_size == 0:
+                        return False, None
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        if not self._refresh(mm, st):
+                            return False, None
+                        offsets = self.offsets.get(str(value))
+                        if not offsets:
+                            return True, None
+                        rec_start, rec_end = next(_records(mm, offsets[0], len(mm)))
+                        fields = _parse_record(mm[rec_start:rec_end])
+            except (OSError, ValueError):
+                return False, None
+        fields += [""] * (len(self.header) - len(fields))
+        if self.strip:
+            fields = [f.strip() for f in fields]
+        return True, dict(zip(self.header, fields))
+
+
+# 行程內共用：(csv 路徑, 主鍵欄, strip) → OffsetIndex
+_registry: Dict[Tuple[str, str, bool], OffsetIndex] = {}
+_registry_lock = threading.Lock()
+
+
+def offset_index(csv_path: Path, pk: str, cache_dir: Path, strip: bool = False) -> OffsetIndex:
+    key = (str(Path(csv_path).resolve()), pk, strip)
+    with _registry_lock:
+        idx = _registry.get(key)
+        if idx is None:
+            tag = ".strip" if strip else ""
+            store = Path(cache_dir) / f"{csv_path.name}.{pk}{tag}.offsets.json"
+            idx = _registry[key] = OffsetIndex(Path(csv_path), pk, store, strip=strip)
+        return idx
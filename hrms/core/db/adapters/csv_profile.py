@@ -0,0 +1,80 @@
+from __future__ import annotations
+from typing import Dict, Iterable, Optional
+import sys
+import pandas as pd
+
+LOAD_PROFILES = ("raw", "compact")
+
+
+def _is_text(s: pd.Series) -> bool:
+    return s.dtype == object or pd.api.types.is_string_dtype(s.dtype)
+
+
+def strip_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """去除 Access 匯出的定寬補空白（文字欄位前後空白）"""
+    out = df.copy()
+    for col in out.columns:
+        if _is_text(out[col]) and not isinstance(out[col].dtype, pd.CategoricalDtype):
+            out[col] = out[col].str.strip()
+    return out
+
+
+def compact_frame(df: pd.DataFrame, categorical: Iterable[str] = (), strip: bool = True) -> pd.DataFrame:
+    """
+    精簡記憶體的表示法：
+    - strip：文字欄位去除補空白
+    - categorical：低基數欄位（部門、區域、狀態…）轉為 pandas category，只存代碼
+    - 其餘 object 欄位的字串 intern，重複的代碼共用同一個物件
+    """
+    if df.empty:
+        return df
+    out = strip_frame(df) if strip else df.copy()
+    cats = set(categorical)
+    for col in out.columns:
+        s = out[col]
+        if col in cats:
+            if not isinstance(s.dtype, pd.CategoricalDtype):
+                out[col] = s.astype("category")
+        elif s.dtype == object:
+            out[col] = s.map(lambda v: sys.intern(v) if isinstance(v, str) else v)
+    return out
+
+
+def expand_categoricals(df: pd.DataFrame) -> pd.DataFrame:
+    """寫入前把 category 欄位還原為一般字串欄位（新值不必先加入 categories）；回傳副本"""
+    out = df.copy()
+    for col in out.columns:
+        if isinstance(out[col].dtype, pd.CategoricalDtype):
+            out[col] = out[col].astype(out[col].cat.categories.dtype)
+    return out
+
+
+def writable_for_row(df: pd.DataFrame, row: Dict[str, str]) -> pd.DataFrame:
+    """
+    單列寫入用的淺複本（pandas Copy-on-Write：之後只有被寫入的欄位會複製）
+    category 欄位只補上 row 中的新值，不還原整個欄位
+    """
+    out = df.copy(deep=False)
+    for col, value in row.items():
+        if col in out.columns and isinstance(out[col].dtype, pd.CategoricalDtype) \
+                and value not in out[col].cat.categories:
+            out[col] = out[col].cat.add_categories([value])
+    return out
+
+
+def recategorize(df: pd.DataFrame, categorical: Iterable[str] = ()) -> pd.DataFrame:
+    """把寫入路徑中失去 category 型別的宣告欄位轉回 category；其餘欄位不動（不複製整表）"""
+    cols = [c for c in categorical if c in df.columns and not isinstance(df[c].dtype, pd.CategoricalDtype)]
+    if not cols or df.empty:
+        return df
+    out = df.copy(deep=False)
+    for col in cols:
+        out[col] = out[col].astype("category")
+    return out
+
+
+def memory_bytes(df: Optional[pd.DataFrame]) -> int:
+    if df is None or df.empty:
+        return 0
+    return int(df.memory_usage(deep=True, index=True).sum())
+
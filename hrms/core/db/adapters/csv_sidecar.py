@@ -0,0 +1,112 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Optional
+import hashlib
+import os
+import tempfile
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    HAS_ARROW = True
+except ImportError:
+    HAS_ARROW = False
+
+# 來源 CSV 的指紋，存放在 Arrow schema metadata
+_META_MTIME = b"hrms.src_mtime_ns"
+_META_SIZE = b"hrms.src_size"
+_META_SHA1 = b"hrms.src_sha1"
+
+
+def _sha1(path: Path) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class SidecarStore:
+    """
+    CSV 資料表的欄式快取檔（Arrow IPC，未壓縮以便 memory-map）
+    - CSV 仍是唯一的資料來源；sidecar 只是解析結果的快取
+    - mtime/size 相同即視為有效；mtime 改變但 size 相同時再比對 SHA-1（僅 touch 過的檔案不必重建）
+    - 未安裝 pyarrow 時 enabled 為 False，一律回到解析 CSV
+    - tag 區分不同載入表示法（例如 compact），各自一個檔案
+    """
+
+    def __init__(self, cache_dir: Path, enabled: bool = True, tag: str = ""):
+        self.cache_dir = Path(cache_dir)
+        self.enabled = enabled and HAS_ARROW
+        self.tag = tag
+
+    def path_for(self, csv_path: Path) -> Path:
+        suffix = f".{self.tag}" if self.tag else ""
+        return self.cache_dir / f"{csv_path.name}{suffix}.arrow"
+
+    def load(self, csv_path: Path) -> Optional[pd.DataFrame]:
+        """
+        sidecar 有效時讀取，否則回傳 None
+        以 memory-map 讀取可省去解析 CSV，但 to_pandas() 仍會把欄位（尤其字串）複製成 pandas 物件；
+        讀完即關閉對應，避免佔用檔案（Windows 上無法取代被 map 的檔案）
+        """
+        if not self.enabled:
+            return None
+        side = self.path_for(csv_path)
+        try:
+            st = os.stat(csv_path)
+            with pa.memory_map(str(side), "r") as source:
+                reader = ipc.open_file(source)
+                meta = reader.schema.metadata or {}
+                try:
+                    mtime, size = int(meta[_META_MTIME]), int(meta[_META_SIZE])
+                except (KeyError, ValueError):
+                    return None
+                if size != st.st_size:
+                    return None
+                touched = mtime != st.st_mtime_ns
+                if touched and meta.get(_META_SHA1, b"").decode() != _sha1(csv_path):
+                    return None
+                table = reader.read_all()
+        except (FileNotFoundError, OSError, pa.ArrowInvalid):
+            return None
+        if touched:
+            # 內容相同只是 mtime 改變：更新記錄的 mtime，之後的載入不必再計算 SHA-1
+            meta = dict(meta)
+            meta[_META_MTIME] = str(st.st_mtime_ns).encode()
+            self._write(side, table.replace_schema_metadata(meta))
+        return table.to_pandas()
+
+    def save(self, csv_path: Path, df: pd.DataFrame, mtime_ns: int, size: int):
+        """寫入 sidecar（臨時檔 → 原子改名）；失敗時略過，不影響讀取"""
+        if not self.enabled or df.empty:
+            return
+        try:
+            table = pa.Table.from_pandas(df.reset_index(drop=True), preserve_index=False)
+            meta = dict(table.schema.metadata or {})
+            meta.update({
+                _META_MTIME: str(mtime_ns).encode(),
+                _META_SIZE: str(size).encode(),
+                _META_SHA1: _sha1(csv_path).encode(),
+            })
+        except (OSError, pa.ArrowException):
+            return
+        self._write(self.path_for(csv_path), table.replace_schema_metadata(meta))
+
+    def _write(self, side: Path, table: "pa.Table"):
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(prefix=side.name + ".", suffix=".tmp", dir=str(self.cache_dir))
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    with ipc.new_file(f, table.schema) as writer:
+                        writer.write_table(table)
+                os.replace(tmp, side)
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.unlink(tmp)
+                raise
+        except (OSError, pa.ArrowException):
+            # 例如 Windows 上舊 sidecar 仍被其他程序 memory-map 佔用：下次冷啟動再重建
+            pass
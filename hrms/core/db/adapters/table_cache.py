@@ -0,0 +1,173 @@
+from __future__ import annotations
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+import os
+import threading
+import pandas as pd
+
+# 檔案版本：(mtime_ns, size)；任一改變即視為失效
+FileVersion = Tuple[int, int]
+# 快照版本：主檔與所有附屬檔（例如 journal）的檔案版本
+SnapshotVersion = Tuple[Optional[FileVersion], ...]
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def file_version(path: Path) -> Optional[FileVersion]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def snapshot_version(path: Path, watch: Sequence[Path] = ()) -> Optional[SnapshotVersion]:
+    """主檔不存在時回傳 None（不快取）"""
+    main = file_version(path)
+    if main is None:
+        return None
+    return (main,) + tuple(file_version(w) for w in watch)
+
+
+@dataclass
+class _Entry:
+    version: SnapshotVersion
+    df: pd.DataFrame
+    nbytes: int
+    # 依附於此快照的衍生結構（例如索引），隨快照一起失效
+    extras: Dict[str, Any] = field(default_factory=dict)
+
+
+class TableCache:
+    """
+    行程共用的 CSV 資料表快取
+    - 以 (path, mtime_ns, size) 判斷是否仍有效，外部工具改檔也會自動失效
+    - watch 可再列出附屬檔（例如 journal），任一檔案變動都會使快照失效
+    - 回傳的 DataFrame 為唯讀快照，呼叫端若要修改必須先 copy()
+    - 超過記憶體上限時依 LRU 淘汰（跨資料表）
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._total = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    # ---------- 設定 ----------
+    def configure(self, max_bytes: Optional[int] = None):
+        with self._lock:
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            self._evict()
+
+    # ---------- 讀取 ----------
+    def get(self, path: Path, loader: Callable[[Path], pd.DataFrame],
+            watch: Sequence[Path] = ()) -> pd.DataFrame:
+        key = str(Path(path).resolve())
+        version = snapshot_version(path, watch)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.version == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.df
+            self.misses += 1
+        # 解析放在鎖外，避免大表阻塞其他資料表的讀取
+        df = loader(path)
+        # 讀取期間檔案若被改寫，不快取這份可能不一致的結果
+        if version is not None and snapshot_version(path, watch) == version:
+            self.put(path, df, version)
+        return df
+
+    def peek(self, path: Path, watch: Sequence[Path] = ()) -> Optional[pd.DataFrame]:
+        """只查快取不載入：有效快照回傳 DataFrame，否則 None"""
+        key = str(Path(path).resolve())
+        version = snapshot_version(path, watch)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.version != version:
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.df
+
+    def version_of(self, path: Path, df: pd.DataFrame) -> Optional[SnapshotVersion]:
+        """df 若仍是目前快取內容，回傳其版本；否則 None"""
+        key = str(Path(path).resolve())
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.df is not df:
+                return None
+            return entry.version
+
+    def extras(self, path: Path, df: pd.DataFrame) -> Optional[Dict[str, Any]]:
+        """取得 df 這份快照的附屬資料；df 已不是目前快取內容時回傳 None"""
+        key = str(Path(path).resolve())
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.df is not df:
+                return None
+            return entry.extras
+
+    def put(self, path: Path, df: pd.DataFrame, version: Optional[SnapshotVersion] = None,
+            extras: Optional[Dict[str, Any]] = None, watch: Sequence[Path] = (),
+            based_on: Optional[pd.DataFrame] = None):
+        """
+        寫入後直接放入新內容，省去下一次讀取的重新解析
+        based_on：df 由目前快取中的這份快照少量異動而來時，記憶體用量依列數比例沿用，
+        不重新計算（deep memory_usage 需走訪每個字串）
+        """
+        key = str(Path(path).resolve())
+        if version is None:
+            version = snapshot_version(path, watch)
+        with self._lock:
+            prev = self._entries.get(key)
+            self._drop(key)
+            if version is None:
+                return
+            if based_on is not None and prev is not None and prev.df is based_on and len(based_on):
+                nbytes = int(prev.nbytes * len(df) / len(based_on))
+            else:
+                nbytes = int(df.memory_usage(index=True, deep=True).sum())
+            if nbytes > self.max_bytes:
+                return
+            self._entries[key] = _Entry(version, df, nbytes, dict(extras or {}))
+            self._total += nbytes
+            self._evict()
+
+    def invalidate(self, path: Optional[Path] = None):
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._total = 0
+            else:
+                self._drop(str(Path(path).resolve()))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "tables": len(self._entries),
+                "bytes": self._total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    # ---------- helpers ----------
+    def _drop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total -= entry.nbytes
+
+    def _evict(self):
+        while self._entries and self._total > self.max_bytes:
+            _, entry = self._entries.popitem(last=False)
+            self._total -= entry.nbytes
+
+
+# 全域共用實例；UnitOfWork.from_settings() 會依設定調整上限
+shared_table_cache = TableCache()
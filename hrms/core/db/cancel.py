@@ -0,0 +1,73 @@
+"""
+可取消的查詢
+背景查詢被新的查詢取代時呼叫 CancelToken.cancel()；SQLite 連線掛上 progress handler，
+執行中的 SQL 每隔固定虛擬機指令數檢查一次，已取消即中斷（不必等查詢跑完）
+
+使用範例：
+    token = CancelToken()
+    with UnitOfWork(readonly=True) as uow, interruptible(uow.session, token):
+        rows = BasicRepository(uow.session).list(limit=200)
+    # 其他執行緒：token.cancel() → 上面的查詢拋出 QueryCancelled
+"""
+from __future__ import annotations
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+
+class QueryCancelled(RuntimeError):
+    """查詢已被取消"""
+
+
+class CancelToken:
+    """取消旗標（執行緒安全）"""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def check(self):
+        """已取消時拋出 QueryCancelled"""
+        if self._event.is_set():
+            raise QueryCancelled()
+
+
+@contextmanager
+def interruptible(session: Session, token: CancelToken, every: int = 1000) -> Iterator[Session]:
+    """
+    區塊內 session 執行的 SQL 可由 token 中斷
+
+    Args:
+        session: 區塊內使用的 Session（取得其 DBAPI 連線掛上 progress handler）
+        token: 取消旗標
+        every: 每隔幾個 SQLite 虛擬機指令檢查一次
+
+    Raises:
+        QueryCancelled: 進入前或執行中已取消
+    """
+    token.check()
+    dbapi_conn = session.connection().connection.dbapi_connection
+    hooked = isinstance(dbapi_conn, sqlite3.Connection)
+    if hooked:
+        # 回傳非 0 時 SQLite 中斷目前的語句（OperationalError: interrupted）
+        dbapi_conn.set_progress_handler(lambda: 1 if token.cancelled else 0, every)
+    try:
+        yield session
+    except (OperationalError, sqlite3.OperationalError) as e:
+        if token.cancelled:
+            raise QueryCancelled() from e
+        raise
+    finally:
+        if hooked:
+            # 連線會歸還連線池，移除 handler 以免影響下一個使用者
+            dbapi_conn.set_progress_handler(None, every)
+    token.check()
@@ -1,9 +1,14 @@
 from abc import ABC, abstractmethod
-from typing import Callable, Dict, List, Optional, Sequence
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence, Union
+
+if TYPE_CHECKING:
+    from .filters import Expr
 
 class DBAdapter(ABC):
     @abstractmethod
-    def list(self, table: str, filters: Optional[Dict[str, str]] = None, limit: Optional[int] = None) -> List[Dict]:
+    def list(self, table: str, filters: Optional[Union[Dict[str, str], "Expr"]] = None,
+             limit: Optional[int] = None) -> List[Dict]:
+        """filters 可為 {欄位: 值} 等值條件或 hrms.core.db.filters 的運算式"""
         ...
 
     @abstractmethod
@@ -21,3 +26,13 @@ class DBAdapter(ABC):
     @abstractmethod
     def list_distinct(self, table: str, column: str) -> List[str]:
         ...
+
+    @abstractmethod
+    def upsert_many(self, table: str, pk: str, rows: Sequence[Dict]) -> Dict[str, int]:
+        """批次新增/更新，回傳 {"inserted": n, "updated": n}"""
+        ...
+
+    @abstractmethod
+    def delete_many(self, table: str, pk: str, values: Sequence[str]) -> Dict[str, int]:
+        """批次刪除，回傳 {"deleted": n}"""
+        ...
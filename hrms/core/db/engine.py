@@ -0,0 +1,120 @@
+"""
+資料庫引擎註冊表
+同一 URL 在行程內只建立一個（具連線池的）引擎；SQLite 連線建立時套用 settings.yaml 的 PRAGMA 設定
+"""
+from __future__ import annotations
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from ..config import SQLiteSettings, settings
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+
+_engines: Dict[Tuple[str, bool], Engine] = {}
+# 已檢查過結構（必要時已遷移）的資料庫 URL（ensure_schema）
+_checked: Set[str] = set()
+_lock = threading.Lock()
+
+
+def resolve_db_url(url: Optional[str] = None) -> str:
+    """預設取 settings；SQLite 相對路徑轉為以專案根目錄為準的絕對路徑"""
+    url = url or settings.database.sqlite.url
+    if url.startswith("sqlite:///") and not url.startswith("sqlite:////"):
+        path = url[len("sqlite:///"):]
+        if path and path != ":memory:" and not Path(path).is_absolute():
+            url = f"sqlite:///{(PROJECT_ROOT / path).resolve()}"
+    return url
+
+
+def sqlite_pragmas(profile: SQLiteSettings) -> List[Tuple[str, object]]:
+    """設定檔轉為 PRAGMA 清單（未設定者略過）"""
+    pragmas: List[Tuple[str, object]] = []
+    if profile.busy_timeout_ms is not None:
+        # 放最前面：後續 PRAGMA（如切換 WAL）遇到鎖時也會等待
+        pragmas.append(("busy_timeout", int(profile.busy_timeout_ms)))
+    if profile.journal_mode:
+        pragmas.append(("journal_mode", profile.journal_mode.upper()))
+    if profile.synchronous:
+        pragmas.append(("synchronous", profile.synchronous.upper()))
+    if profile.cache_size_kb is not None:
+        # 負值表示 KiB
+        pragmas.append(("cache_size", -int(profile.cache_size_kb)))
+    if profile.mmap_size_mb is not None:
+        pragmas.append(("mmap_size", int(profile.mmap_size_mb) * 1024 * 1024))
+    if profile.temp_store:
+        pragmas.append(("temp_store", profile.temp_store.upper()))
+    return pragmas
+
+
+def apply_sqlite_profile(engine: Engine, profile: Optional[SQLiteSettings] = None,
+                         readonly: bool = False) -> Engine:
+    """
+    在引擎的 connect 事件套用 PRAGMA（每個新連線執行一次）
+    readonly=True 時最後加上 query_only，連線無法寫入（也就不會取得寫入鎖）
+    """
+    pragmas = sqlite_pragmas(profile or settings.database.sqlite)
+    if readonly:
+        pragmas.append(("query_only", "ON"))
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return engine
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    return engine
+
+
+def get_engine(url: Optional[str] = None, readonly: bool = False) -> Engine:
+    """
+    取得共用引擎（同一 URL 只建立一次；唯讀引擎另有一組連線池）
+
+    Args:
+        url: 資料庫 URL；None 為 settings.yaml / DB_URL 設定
+        readonly: SQLite 唯讀連線（PRAGMA query_only）
+    """
+    key = (resolve_db_url(url), readonly)
+    engine = _engines.get(key)
+    if engine is None:
+        with _lock:
+            engine = _engines.get(key)
+            if engine is None:
+                engine = apply_sqlite_profile(create_engine(key[0], echo=False, future=True), readonly=readonly)
+                _engines[key] = engine
+    return engine
+
+
+def ensure_schema(url: Optional[str] = None) -> None:
+    """
+    補上模型新增的欄位與觸發器（舊資料庫第一次使用時自動遷移；每個資料庫只檢查一次）
+    由 UnitOfWork / ReadSession 建立 Session 前呼叫，匯入模組或建立引擎本身不會寫入資料庫
+    """
+    url = resolve_db_url(url)
+    with _lock:
+        if url in _checked:
+            return
+        _checked.add(url)
+    # 延遲匯入：domain.models 不依賴本模組；遷移需寫入，一律使用可寫入的引擎
+    from domain.models import ensure_migrated
+    try:
+        ensure_migrated(get_engine(url))
+    except BaseException:
+        with _lock:
+            _checked.discard(url)
+        raise
+
+
+def dispose_engines() -> None:
+    """關閉所有引擎的連線池（測試或切換資料庫時使用）"""
+    with _lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+        _checked.clear()
@@ -0,0 +1,228 @@
+"""
+資料表篩選條件運算式
+可組合的條件（eq / in_ / between / date_between / startswith / contains / is_empty，以 & | 組合），
+由 CSVAdapter 編譯成一次向量化遮罩，等值/集合條件可直接走雜湊索引
+
+使用範例：
+    from hrms.core.db.filters import eq, in_, between
+    expr = in_("Dept_Code", ["L21041", "L21042"]) & between("On_Board_Date", "2011-01-01", "2011-12-31")
+    adapter.list("BASIC", filters=expr)
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from functools import reduce
+from typing import Iterable, List, Optional, Set, Tuple
+import re
+import pandas as pd
+
+# 2011-08-01、2011/8/1、2011.08.01（可帶時間）；20110801（Access 匯出常見，可能補空白）
+_DATE = r"^\s*(\d{4})(?:([-/.])(\d{1,2})\2(\d{1,2})(?:[ T].*)?|(\d{2})(\d{2}))\s*$"
+
+
+def iso_dates(s: pd.Series) -> pd.Series:
+    """日期字串欄轉為 YYYY-MM-DD；空白或無法解析者為空字串"""
+    parts = s.astype(str).str.extract(_DATE)
+    month = parts[2].fillna(parts[4]).str.zfill(2)
+    day = parts[3].fillna(parts[5]).str.zfill(2)
+    return (parts[0] + "-" + month + "-" + day).fillna("").astype(object)
+
+
+def iso_date(value: str) -> str:
+    """單一日期字串轉為 YYYY-MM-DD；無法解析時原樣（去除空白）回傳"""
+    m = re.match(_DATE, value)
+    if m is None:
+        return value.strip()
+    return f"{m.group(1)}-{(m.group(3) or m.group(5)).zfill(2)}-{(m.group(4) or m.group(6)).zfill(2)}"
+
+
+class Expr:
+    """條件運算式基底：mask() 產生布林遮罩，labels() 嘗試以索引取得候選列"""
+
+    def __and__(self, other: "Expr") -> "Expr":
+        return And((self, other))
+
+    def __or__(self, other: "Expr") -> "Expr":
+        return Or((self, other))
+
+    def columns(self) -> Set[str]:
+        raise NotImplementedError
+
+    def mask(self, df: pd.DataFrame) -> pd.Series:
+        raise NotImplementedError
+
+    def labels(self, indexes) -> Optional[Set]:
+        """可由索引求出候選列標籤時回傳集合，否則 None（需全表遮罩）"""
+        return None
+
+
+@dataclass(frozen=True)
+class _ColumnExpr(Expr):
+    column: str
+
+    def columns(self) -> Set[str]:
+        return {self.column}
+
+    def mask(self, df: pd.DataFrame) -> pd.Series:
+        # 欄位不存在：視為空字串
+        if self.column not in df.columns:
+            return self._apply(pd.Series("", index=df.index, dtype=object))
+        s = df[self.column]
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            # category 欄位：只對各類別求值一次，再依代碼展開
+            hit = self._apply(pd.Series(s.cat.categories.astype(str))).to_numpy(dtype=bool)
+            if not len(hit):
+                return pd.Series(False, index=df.index)
+            codes = s.cat.codes.to_numpy()
+            return pd.Series((codes >= 0) & hit[codes], index=df.index)
+        return self._apply(s.astype(str))
+
+    def _apply(self, s: pd.Series) -> pd.Series:
+        raise NotImplementedError
+
+
+@dataclass(frozen=True)
+class Eq(_ColumnExpr):
+    value: str = ""
+
+    def _apply(self, s):
+        return s == str(self.value)
+
+    def labels(self, indexes):
+        idx = indexes.get(self.column)
+        return set(idx.lookup(self.value)) if idx is not None else None
+
+
+@dataclass(frozen=True)
+class In(_ColumnExpr):
+    values: Tuple[str, ...] = ()
+
+    def _apply(self, s):
+        return s.isin(self.values)
+
+    def labels(self, indexes):
+        idx = indexes.get(self.column)
+        return set(idx.lookup_many(self.values)) if idx is not None else None
+
+
+@dataclass(frozen=True)
+class Between(_ColumnExpr):
+    """字串字典序區間（含兩端）；low/high 為 None 表示不設限。日期需為同一格式（例如 YYYY-MM-DD）"""
+    low: Optional[str] = None
+    high: Optional[str] = None
+
+    def _apply(self, s):
+        m = pd.Series(True, index=s.index)
+        if self.low is not None:
+            m &= s >= str(self.low)
+        if self.high is not None:
+            m &= s <= str(self.high)
+        return m
+
+
+@dataclass(frozen=True)
+class DateBetween(Between):
+    """日期區間（含兩端）：欄位值不論 YYYY-MM-DD、YYYY/M/D 或 YYYYMMDD 都先轉為 YYYY-MM-DD；空白或無法解析者不符合"""
+
+    def _apply(self, s):
+        dates = iso_dates(s)
+        m = dates != ""
+        if self.low is not None:
+            m &= dates >= self.low
+        if self.high is not None:
+            m &= dates <= self.high
+        return m
+
+
+@dataclass(frozen=True)
+class StartsWith(_ColumnExpr):
+    prefix: str = ""
+
+    def _apply(self, s):
+        return s.str.startswith(self.prefix)
+
+
+@dataclass(frozen=True)
+class Contains(_ColumnExpr):
+    text: str = ""
+    case: bool = True
+
+    def _apply(self, s):
+        return s.str.contains(self.text, case=self.case, regex=False)
+
+
+@dataclass(frozen=True)
+class IsEmpty(_ColumnExpr):
+    """空白或只有空白字元（Access 匯出常見的補空白欄位）"""
+
+    def _apply(self, s):
+        return s.str.strip() == ""
+
+
+@dataclass(frozen=True)
+class And(Expr):
+    parts: Tuple[Expr, ...]
+
+    def columns(self):
+        return set().union(*(p.columns() for p in self.parts))
+
+    def mask(self, df):
+        return reduce(lambda a, b: a & b, (p.mask(df) for p in self.parts),
+                      pd.Series(True, index=df.index))
+
+    def labels(self, indexes):
+        # 任一子條件可走索引即可縮小範圍；多個則取交集
+        found = [l for l in (p.labels(indexes) for p in self.parts) if l is not None]
+        return reduce(lambda a, b: a & b, found) if found else None
+
+
+@dataclass(frozen=True)
+class Or(Expr):
+    parts: Tuple[Expr, ...]
+
+    def columns(self):
+        return set().union(*(p.columns() for p in self.parts))
+
+    def mask(self, df):
+        return reduce(lambda a, b: a | b, (p.mask(df) for p in self.parts),
+                      pd.Series(False, index=df.index))
+
+    def labels(self, indexes):
+        # 每個子條件都能走索引時才可取聯集
+        found: List[Optional[Set]] = [p.labels(indexes) for p in self.parts]
+        if not found or any(l is None for l in found):
+            return None
+        return reduce(lambda a, b: a | b, found)
+
+
+# ---------- 建構函式 ----------
+def eq(column: str, value) -> Expr:
+    return Eq(column, str(value))
+
+def in_(column: str, values: Iterable) -> Expr:
+    return In(column, tuple(str(v) for v in values))
+
+def between(column: str, low=None, high=None) -> Expr:
+    return Between(column, None if low is None else str(low), None if high is None else str(high))
+
+def date_between(column: str, low=None, high=None) -> Expr:
+    return DateBetween(column, None if low is None else iso_date(str(low)),
+                       None if high is None else iso_date(str(high)))
+
+def startswith(column: str, prefix: str) -> Expr:
+    return StartsWith(column, prefix)
+
+def contains(column: str, text: str, case: bool = True) -> Expr:
+    return Contains(column, text, case)
+
+def is_empty(column: str) -> Expr:
+    return IsEmpty(column)
+
+def and_(*exprs: Expr) -> Expr:
+    return And(tuple(exprs))
+
+def or_(*exprs: Expr) -> Expr:
+    return Or(tuple(exprs))
+
+def from_dict(filters: dict) -> Expr:
+    """舊式 {欄位: 值} 等值條件轉為運算式"""
+    return And(tuple(Eq(k, str(v)) for k, v in filters.items()))
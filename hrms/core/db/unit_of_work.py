@@ -1,7 +1,15 @@
 from __future__ import annotations
 from dataclasses import dataclass
+from functools import lru_cache
 from ..config import settings
 from .adapters.csv_adapter import CSVAdapter
+from .adapters.table_cache import shared_table_cache
+from .adapters.csv_index import load_csv_schema
+
+@lru_cache(maxsize=None)
+def _csv_schema(path: str):
+    # 規格檔只在第一次使用時讀取
+    return load_csv_schema(path)
 
 @dataclass
 class UnitOfWork:
@@ -10,11 +18,28 @@ class UnitOfWork:
     @classmethod
     def from_settings(cls):
         assert settings.database.backend == "csv", "此骨架以 CSV 為後端"
-        return cls(adapter=CSVAdapter(settings.database.csv.data_dir))
+        csv_cfg = settings.database.csv
+        shared_table_cache.configure(max_bytes=csv_cfg.cache_max_mb * 1024 * 1024)
+        return cls(adapter=CSVAdapter(csv_cfg.data_dir, cache=shared_table_cache,
+                                      schema=_csv_schema(csv_cfg.schema_path),
+                                      write_mode=csv_cfg.write_mode,
+                                      journal_max_bytes=csv_cfg.journal_max_kb * 1024,
+                                      journal_max_age=csv_cfg.journal_max_age_s,
+                                      sidecar=csv_cfg.sidecar_cache,
+                                      sidecar_dir=csv_cfg.sidecar_dir or None,
+                                      offset_index=csv_cfg.offset_index,
+                                      load_profile=csv_cfg.load_profile))
 
     def __enter__(self):
+        # 區塊內的異動先暫存在記憶體，離開時每個表只寫一次
+        self.adapter.begin()
         return self
 
     def __exit__(self, exc_type, exc, tb):
-        # CSV 為檔案儲存，無需額外清理/關閉
+        if exc_type is None:
+            # 全部寫成臨時檔後才原子改名，不會留下只套用一半的狀態
+            self.adapter.commit()
+        else:
+            # 發生例外：放棄所有暫存異動
+            self.adapter.rollback()
         return False
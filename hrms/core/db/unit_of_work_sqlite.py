@@ -4,36 +4,39 @@ SQLite UnitOfWork
 """
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Optional
+from typing import Iterable, Optional, Tuple
+import time
 from sqlalchemy.orm import Session
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, scoped_session
-from pathlib import Path
-import os
+from sqlalchemy.orm import sessionmaker
+from repositories.versioning import data_version, table_version
+from .engine import ensure_schema, get_engine
 
-# 資料庫設定
-def _get_engine():
-    """取得資料庫引擎"""
-    # 從環境變數取得資料庫路徑
-    db_url = os.getenv("DB_URL", "sqlite:///./hrms.db")
-    
-    # 處理 SQLite 路徑
-    if db_url.startswith("sqlite:///") and not db_url.startswith("sqlite:////"):
-        db_path = Path(db_url.replace("sqlite:///", ""))
-        if not db_path.is_absolute():
-            db_path = Path(__file__).resolve().parents[3] / db_path
-        db_url = f"sqlite:///{db_path}"
+
+class ReadOnlyError(RuntimeError):
+    """唯讀 Session 上嘗試寫入"""
+
+
+class ReadOnlySession(Session):
+    """唯讀 Session：有待寫入的變更時 flush 直接拒絕"""
     
-    return create_engine(db_url, echo=False, future=True)
+    def flush(self, objects=None):
+        if self.new or self.dirty or self.deleted:
+            raise ReadOnlyError("唯讀 Session 不可寫入，請改用 UnitOfWork()")
+        super().flush(objects)
+
+
+# 全域引擎（引擎註冊表共用，含 SQLite PRAGMA 設定）與 Session 工廠
+_engine = get_engine()
+_SessionFactory = sessionmaker(bind=_engine, autoflush=False, autocommit=False, future=True)
+# 唯讀：query_only 連線、不 autoflush、結束交易不讓物件過期
+_ReadSessionFactory = sessionmaker(bind=get_engine(readonly=True), class_=ReadOnlySession,
+                                   autoflush=False, expire_on_commit=False, future=True)
 
-def _get_session_factory():
-    """取得 Session 工廠"""
-    engine = _get_engine()
-    return sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 
-# 全域引擎與 Session 工廠
-_engine = _get_engine()
-_SessionFactory = _get_session_factory()
+def _new_session(factory: sessionmaker) -> Session:
+    # 第一次使用某個資料庫時先補齊結構（舊資料庫自動遷移）
+    ensure_schema(factory.kw["bind"].url.render_as_string(hide_password=False))
+    return factory()
 
 @dataclass
 class UnitOfWork:
@@ -47,6 +50,10 @@ class UnitOfWork:
             employee = repo.get_by_pk("000056")
             # 自動 Commit
     
+        with UnitOfWork(readonly=True) as uow:
+            # 唯讀：不 flush、不 commit，離開時直接歸還連線
+            employees = BasicRepository(uow.session).get_active_employees()
+    
         with UnitOfWork() as uow:
             repo = BasicRepository(uow.session)
             try:
@@ -56,11 +63,12 @@ class UnitOfWork:
                 pass
     """
     session: Optional[Session] = None
+    readonly: bool = False
     
     def __enter__(self):
         """進入上下文，建立 Session"""
         if self.session is None:
-            self.session = _SessionFactory()
+            self.session = _new_session(_ReadSessionFactory if self.readonly else _SessionFactory)
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -69,6 +77,9 @@ class UnitOfWork:
             return False
         
         try:
+            if self.readonly:
+                # 唯讀：close 即結束讀取交易，不需 commit/rollback
+                return False
             if exc_type is not None:
                 # 發生例外，Rollback
                 self.session.rollback()
@@ -87,5 +98,73 @@ class UnitOfWork:
         """建立 UnitOfWork 實例"""
         return cls()
 
+class ReadSession:
+    """
+    視窗共用的長效唯讀 Session
+    跨多次重新整理重用同一 Session（identity map 中已載入的物件不需重查），
+    每次使用結束即結束讀取交易（不持有快照，下次讀到最新資料）；
+    本行程對監看資料表的寫入（資料表版本變更）、invalidate() 或超過 max_age 秒後清空 identity map
+    
+    使用範例：
+        self._reader = ReadSession(tables=["TRAINING_RECORD", "BASIC"])
+        with self._reader as session:
+            records = TrainingRecordRepository(session).list(limit=50)
+    """
+    
+    def __init__(self, tables: Optional[Iterable[str]] = None, max_age: float = 60.0):
+        """
+        Args:
+            tables: 監看的資料表；None 表示任一資料表變更都失效
+            max_age: identity map 保留秒數（其他行程的寫入無法偵測，以此為上限）；0 表示不限
+        """
+        self.tables = tuple(tables) if tables else None
+        self.max_age = max_age
+        self._session: Optional[ReadOnlySession] = None
+        self._version: Optional[Tuple[int, ...]] = None
+        self._loaded_at = 0.0
+        self._depth = 0
+    
+    def _current_version(self) -> Tuple[int, ...]:
+        if self.tables is None:
+            return (data_version(),)
+        return tuple(table_version(t) for t in self.tables)
+    
+    def invalidate(self):
+        """清空已載入的物件（下次使用時重新查詢）"""
+        if self._session is not None:
+            self._session.expunge_all()
+        self._version = None
+    
+    def __enter__(self) -> ReadOnlySession:
+        if self._session is None:
+            self._session = _new_session(_ReadSessionFactory)
+        if self._depth == 0:
+            version = self._current_version()
+            stale = self.max_age and time.monotonic() - self._loaded_at > self.max_age
+            if version != self._version or stale:
+                self._session.expunge_all()
+                self._version = version
+                self._loaded_at = time.monotonic()
+        self._depth += 1
+        return self._session
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._depth -= 1
+        if self._depth == 0 and self._session is not None:
+            if exc_type is not None:
+                self._session.rollback()
+            else:
+                # 結束讀取交易並歸還連線；無變更、expire_on_commit=False，已載入物件保留
+                self._session.commit()
+        return False
+    
+    def close(self):
+        """關閉 Session（視窗關閉時呼叫）"""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+        self._version = None
+
+
 # 相容性別名
 UnitOfWorkSQLite = UnitOfWork
@@ -1,19 +1,63 @@
+"""
+CSV 後端的對照表
+代碼清單與代碼 → 說明對照掛在行程共用的資料表快照上（shared_table_cache），
+CSV 未變動（mtime/size 相同）前不重新讀取或計算
+"""
 from __future__ import annotations
-from typing import List
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+from ..core.db.adapters.csv_adapter import CSVAdapter
+from ..core.db.adapters.table_cache import shared_table_cache
 from ..core.db.unit_of_work import UnitOfWork
 
+
+@lru_cache(maxsize=None)
+def _adapter() -> CSVAdapter:
+    # 只讀取，共用一個 adapter（不開交易）
+    return UnitOfWork.from_settings().adapter
+
+
 def list_dept_codes() -> List[str]:
-    with UnitOfWork.from_settings() as uow:
-        return uow.adapter.list_distinct("L_Section", "Dept_Code")
+    return _adapter().list_distinct("L_Section", "Dept_Code")
 
 def list_areas() -> List[str]:
-    with UnitOfWork.from_settings() as uow:
-        return uow.adapter.list_distinct("Area", "Area")
+    return _adapter().list_distinct("Area", "Area")
 
 def list_jobs() -> List[str]:
-    with UnitOfWork.from_settings() as uow:
-        return uow.adapter.list_distinct("L_Job", "L_Job")
+    return _adapter().list_distinct("L_Job", "L_Job")
 
 def list_vac_types() -> List[str]:
-    with UnitOfWork.from_settings() as uow:
-        return uow.adapter.list_distinct("VAC_Type", "VAC_ID")
+    return _adapter().list_distinct("VAC_Type", "VAC_ID")
+
+def list_shifts() -> List[str]:
+    return _adapter().list_distinct("SHIFT", "Shift")
+
+def list_shops() -> List[str]:
+    return _adapter().list_distinct("SHOP", "SHOP")
+
+def list_certify_types() -> List[str]:
+    return _adapter().list_distinct("CERTIFY_TYPE", "Certify_Type")
+
+def get_dept_name(dept_code: str) -> Optional[str]:
+    return _adapter().value_map("L_Section", "Dept_Code", "Dept_Name").get(dept_code)
+
+
+@lru_cache(maxsize=None)
+def _adapter_for(data_dir: Path) -> CSVAdapter:
+    # 設定的資料目錄沿用共用 adapter；其他目錄同樣掛在共用快取上
+    adapter = _adapter()
+    if Path(adapter.data_dir).resolve() == data_dir:
+        return adapter
+    return CSVAdapter(str(data_dir), cache=shared_table_cache)
+
+
+def lookup_options(path: Path, value_column: str, label_columns: Sequence[str] = ()) -> List[Tuple[str, str]]:
+    """
+    CSV 對照表（<資料目錄>/<表名>.csv）的下拉選單選項 [(標籤, 值), ...]，值不重複、保留檔案順序
+    由共用快取中的資料表快照衍生，CSV 未變動前不重新讀取或計算
+    """
+    path = Path(path).resolve()
+    if not path.exists():
+        return []
+    return _adapter_for(path.parent).options(path.stem, value_column, label_columns)
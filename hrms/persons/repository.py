@@ -1,9 +1,12 @@
 from __future__ import annotations
-from typing import List, Dict, Optional
+from typing import Dict, Iterator, List, Optional, Sequence
 from ..core.db.repository import BaseRepository
+from ..core.db.filters import Expr, date_between, eq, in_, or_
 
 TABLE = "BASIC"
 PK = "EMP_ID"
+# 到職日：既有資料在 On_Board_date（YYYYMMDD，補空白），本系統寫入 On_Board_Date
+ONBOARD_COLUMNS = ("On_Board_date", "On_Board_Date")
 
 class EmployeeRepositoryCSV(BaseRepository):
     def list(self, only_active: bool = True, limit: int | None = None) -> List[Dict]:
@@ -12,15 +15,48 @@ class EmployeeRepositoryCSV(BaseRepository):
             filt = {"Active": "true"}
         return self.adapter.list(TABLE, filters=filt, limit=limit)
 
+    def iter(self, only_active: bool = True, limit: int | None = None,
+             columns: Sequence[str] | None = None, chunksize: int = 1000) -> Iterator[Dict]:
+        # 串流讀取：大量匯出/API 回應時記憶體用量固定
+        filt = {"Active": "true"} if only_active else None
+        return self.adapter.iter_rows(TABLE, filters=filt, columns=columns, chunksize=chunksize, limit=limit)
+
+    def search(self, dept_codes: Sequence[str] | None = None, onboard_from: str | None = None,
+               onboard_to: str | None = None, only_active: bool = True,
+               limit: int | None = None) -> List[Dict]:
+        # 多部門 + 到職日區間，於儲存層以向量化遮罩篩選（日期可為 YYYY-MM-DD / YYYYMMDD 等格式）
+        conds: List[Expr] = []
+        if only_active:
+            conds.append(eq("Active", "true"))
+        if dept_codes:
+            conds.append(in_("Dept_Code", dept_codes))
+        if onboard_from or onboard_to:
+            conds.append(or_(*(date_between(c, onboard_from, onboard_to) for c in ONBOARD_COLUMNS)))
+        expr = None
+        for c in conds:
+            expr = c if expr is None else expr & c
+        return self.adapter.list(TABLE, filters=expr, limit=limit)
+
     def get(self, emp_id: str) -> Optional[Dict]:
         return self.adapter.get_by_pk(TABLE, PK, emp_id)
 
-    def upsert(self, row: Dict) -> Dict:
+    @staticmethod
+    def _normalize(row: Dict) -> Dict:
         # 正規化布林字串
         if "Active" in row:
             v = str(row["Active"]).strip().lower()
             row["Active"] = "true" if v in ("1","true","y","yes") else "false"
-        return self.adapter.upsert(TABLE, PK, row)
+        return row
+
+    def upsert(self, row: Dict) -> Dict:
+        return self.adapter.upsert(TABLE, PK, self._normalize(row))
+
+    def upsert_many(self, rows: List[Dict]) -> Dict[str, int]:
+        # 批次匯入：一次合併、一次寫檔
+        return self.adapter.upsert_many(TABLE, PK, [self._normalize(r) for r in rows])
 
     def delete(self, emp_id: str) -> bool:
         return self.adapter.delete(TABLE, PK, emp_id)
+
+    def delete_many(self, emp_ids: List[str]) -> Dict[str, int]:
+        return self.adapter.delete_many(TABLE, PK, emp_ids)
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import List, Dict, Optional
+from typing import Dict, Iterator, List, Optional, Sequence
 from ..core.db.unit_of_work import UnitOfWork
 
 def list_employees(only_active: bool = True, limit: int | None = None) -> List[Dict]:
@@ -8,6 +8,13 @@ def list_employees(only_active: bool = True, limit: int | None = None) -> List[D
         repo = EmployeeRepositoryCSV(uow.adapter)
         return repo.list(only_active=only_active, limit=limit)
 
+def iter_employees(only_active: bool = True, limit: int | None = None,
+                   columns: Sequence[str] | None = None) -> Iterator[Dict]:
+    from .repository import EmployeeRepositoryCSV
+    with UnitOfWork.from_settings() as uow:
+        repo = EmployeeRepositoryCSV(uow.adapter)
+        yield from repo.iter(only_active=only_active, limit=limit, columns=columns)
+
 def get_employee(emp_id: str) -> Optional[Dict]:
     from .repository import EmployeeRepositoryCSV
     with UnitOfWork.from_settings() as uow:
@@ -20,6 +27,12 @@ def upsert_employee(row: Dict) -> Dict:
         repo = EmployeeRepositoryCSV(uow.adapter)
         return repo.upsert(row)
 
+def upsert_employees(rows: List[Dict]) -> Dict[str, int]:
+    from .repository import EmployeeRepositoryCSV
+    with UnitOfWork.from_settings() as uow:
+        repo = EmployeeRepositoryCSV(uow.adapter)
+        return repo.upsert_many(rows)
+
 def delete_employee(emp_id: str) -> bool:
     from .repository import EmployeeRepositoryCSV
     with UnitOfWork.from_settings() as uow:
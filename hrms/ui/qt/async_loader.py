@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+視窗的背景查詢
+查詢在 QThreadPool 上以獨立的唯讀 Session 執行，結果以 signal 送回 GUI 執行緒後回呼；
+同一 key 送出新查詢時，前一次（等待中或執行中）立即取消——執行中的 SQLite 語句由 progress handler 中斷，
+且只有最後一次的結果會回呼，不會有舊的搜尋結果蓋掉新的
+
+使用範例：
+    self._loader = AsyncLoader(self)
+    self._loader.failed.connect(lambda key, message: QMessageBox.critical(self, "錯誤", message))
+    # 輸入框 textChanged：停止輸入 DEBOUNCE_MS 後才查詢
+    self._loader.submit(
+        "list",
+        lambda session: AreaRepository(session).list(filters=filters),
+        self._update_table,
+        delay_ms=AsyncLoader.DEBOUNCE_MS,
+    )
+    # closeEvent
+    self._loader.shutdown()
+"""
+from __future__ import annotations
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, Signal
+from sqlalchemy.orm import Session
+
+from hrms.core.db.cancel import CancelToken, QueryCancelled, interruptible
+from hrms.core.db.unit_of_work_sqlite import UnitOfWork
+
+# 背景執行的查詢：唯讀 Session → 結果（ORM 物件於 Session 關閉後仍可讀取已載入的欄位）
+Query = Callable[[Session], Any]
+
+
+class _TaskSignals(QObject):
+    # key, 世代, 結果 / 錯誤訊息
+    done = Signal(str, int, object)
+    failed = Signal(str, int, str)
+
+
+class _QueryTask(QRunnable):
+    """在執行緒池中執行一次查詢；已取消則不送出結果"""
+
+    def __init__(self, key: str, generation: int, query: Query, token: CancelToken, signals: _TaskSignals,
+                 session_factory: Optional[Callable[[], Session]] = None):
+        super().__init__()
+        self._key = key
+        self._generation = generation
+        self._query = query
+        self._token = token
+        self._session_factory = session_factory
+        # 持有參考，確保送出 signal 前物件不被回收
+        self._signals = signals
+
+    def run(self):
+        if self._token.cancelled:
+            return
+        try:
+            session = self._session_factory() if self._session_factory is not None else None
+            with UnitOfWork(session=session, readonly=True) as uow, interruptible(uow.session, self._token):
+                result = self._query(uow.session)
+        except QueryCancelled:
+            return
+        except Exception as e:
+            if not self._token.cancelled:
+                self._signals.failed.emit(self._key, self._generation, str(e))
+            return
+        if not self._token.cancelled:
+            self._signals.done.emit(self._key, self._generation, result)
+
+
+class AsyncLoader(QObject):
+    """
+    每個視窗一個，依 key 區分彼此獨立的查詢（例如 "list"、"comboboxes"）
+    回呼一律在 GUI 執行緒執行
+    """
+
+    # 輸入框的防彈跳時間（毫秒）
+    DEBOUNCE_MS = 300
+
+    # 未指定 on_error 時發出（key, 錯誤訊息）
+    failed = Signal(str, str)
+    # 有/無尚未完成的查詢
+    busyChanged = Signal(bool)
+
+    def __init__(self, parent=None, pool: Optional[QThreadPool] = None,
+                 session_factory: Optional[Callable[[], Session]] = None):
+        """
+        Args:
+            pool: 執行緒池；None 時使用全域執行緒池
+            session_factory: 建立查詢用 Session；None 時使用預設資料庫的唯讀 Session
+        """
+        super().__init__(parent)
+        self._pool = pool or QThreadPool.globalInstance()
+        self._session_factory = session_factory
+        self._generation: Dict[str, int] = {}
+        # 每個 key 最新一次查詢：(世代, 回呼, 錯誤回呼)
+        self._callbacks: Dict[str, Tuple[int, Callable[[Any], None], Optional[Callable[[str], None]]]] = {}
+        self._queued: Dict[str, Query] = {}
+        self._tokens: Dict[str, CancelToken] = {}
+        self._timers: Dict[str, QTimer] = {}
+        self._closed = False
+        self._busy = False
+
+    def submit(self, key: str, query: Query, on_result: Callable[[Any], None],
+               on_error: Optional[Callable[[str], None]] = None, delay_ms: int = 0):
+        """
+        排入背景查詢；同一 key 先前的查詢立即取消
+
+        Args:
+            key: 查詢類別
+            query: 在背景執行緒執行，參數為唯讀 Session；不可存取任何 Qt 元件
+            on_result: 結果回呼（GUI 執行緒）
+            on_error: 錯誤回呼（GUI 執行緒）；None 時發出 failed
+            delay_ms: 延遲送出（期間再次 submit 會重新計時），用於輸入框防彈跳
+        """
+        if self._closed:
+            return
+        self._cancel_running(key)
+        generation = self._generation.get(key, 0) + 1
+        self._generation[key] = generation
+        self._callbacks[key] = (generation, on_result, on_error)
+        self._queued[key] = query
+        self._update_busy()
+        if delay_ms > 0:
+            timer = self._timers.get(key)
+            if timer is None:
+                timer = QTimer(self)
+                timer.setSingleShot(True)
+                timer.timeout.connect(lambda k=key: self._start(k))
+                self._timers[key] = timer
+            timer.start(delay_ms)
+        else:
+            timer = self._timers.get(key)
+            if timer is not None:
+                timer.stop()
+            self._start(key)
+
+    def cancel(self, key: Optional[str] = None):
+        """取消查詢（None 表示全部）；已取消的查詢不會回呼"""
+        for k in ([key] if key is not None else list(self._callbacks)):
+            self._cancel_running(k)
+            timer = self._timers.get(k)
+            if timer is not None:
+                timer.stop()
+            self._queued.pop(k, None)
+            self._callbacks.pop(k, None)
+        self._update_busy()
+
+    def is_busy(self, key: Optional[str] = None) -> bool:
+        """是否有尚未完成的查詢"""
+        return key in self._callbacks if key is not None else bool(self._callbacks)
+
+    def shutdown(self):
+        """取消全部查詢並不再接受新查詢（視窗關閉時呼叫）"""
+        self.cancel()
+        self._closed = True
+
+    # ---------- 內部 ----------
+    def _cancel_running(self, key: str):
+        token = self._tokens.pop(key, None)
+        if token is not None:
+            token.cancel()
+
+    def _start(self, key: str):
+        query = self._queued.pop(key, None)
+        if query is None or self._closed:
+            return
+        token = CancelToken()
+        self._tokens[key] = token
+        signals = _TaskSignals()
+        signals.done.connect(self._on_done)
+        signals.failed.connect(self._on_failed)
+        self._pool.start(_QueryTask(key, self._generation[key], query, token, signals, self._session_factory))
+
+    def _take(self, key: str, generation: int):
+        # 只接受該 key 最新一次查詢的結果
+        entry = self._callbacks.get(key)
+        if entry is None or entry[0] != generation:
+            return None
+        del self._callbacks[key]
+        self._tokens.pop(key, None)
+        self._update_busy()
+        return entry
+
+    def _on_done(self, key: str, generation: int, result: Any):
+        entry = self._take(key, generation)
+        if entry is not None:
+            entry[1](result)
+
+    def _on_failed(self, key: str, generation: int, message: str):
+        entry = self._take(key, generation)
+        if entry is None:
+            return
+        if entry[2] is not None:
+            entry[2](message)
+        else:
+            self.failed.emit(key, message)
+
+    def _update_busy(self):
+        busy = bool(self._callbacks)
+        if busy != self._busy:
+            self._busy = busy
+            self.busyChanged.emit(busy)
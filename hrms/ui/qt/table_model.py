@@ -0,0 +1,358 @@
+# -*- coding: utf-8 -*-
+"""
+Repository 分段載入的表格模型
+QTableView 捲動接近底部時才向資料庫取下一段（canFetchMore / fetchMore），
+資料列只保存 named tuple，儲存格文字在 data() 時才產生；排序交由資料庫 ORDER BY
+記憶體中最多保留 max_blocks 段（最近使用者），離開視窗較久的段落釋放，
+再捲回時依該段起點的 keyset 游標（或 OFFSET）重新讀取
+
+使用範例：
+    model = RepositoryTableModel(
+        self._reader, TrainingRecordRepository,
+        [TableColumn("Certify_No", "證照編號"), TableColumn("C_Name", "員工姓名", sortable=False)],
+        order_by=["Certify_No"],
+    )
+    self.table_view.setModel(model)
+    self.table_view.setSortingEnabled(True)
+    model.set_filters({"Active": True})
+
+傳入 loader（AsyncLoader）時改在背景執行緒查詢：fetchMore 只送出查詢即返回，
+資料到達後才插入列；篩選/排序變更時取消尚未完成的查詢
+"""
+from __future__ import annotations
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt, Signal
+
+
+@dataclass(frozen=True)
+class TableColumn:
+    """
+    表格欄位
+    field: 資料表欄位或 Repository 的 derived_columns
+    format: 值 → 顯示文字；None 時 None 顯示為空白
+    sortable: derived_columns 無法由資料庫排序，需設為 False
+    """
+    field: str
+    header: str
+    format: Optional[Callable[[Any], str]] = None
+    sortable: bool = True
+
+
+class RepositoryTableModel(QAbstractTableModel):
+    """
+    以 Repository 為資料來源的唯讀表格模型
+    - 排序欄位皆為 NOT NULL 時以 keyset 游標取下一段（不論捲到第幾筆都只讀 block_size 筆），
+      否則以 OFFSET 取下一段
+    - 記憶體上限為 max_blocks × block_size 個 named tuple（無 QStandardItem），與捲動過多少列無關；
+      另外每段只保留起點游標（一個字串）以便重新讀取
+    - show_rows() 的固定結果全部保留在記憶體（筆數由呼叫端決定）
+    """
+
+    # 載入失敗時發出（錯誤訊息）；發生錯誤後停止繼續載入，呼叫 refresh() 可重試
+    loadFailed = Signal(str)
+    # 背景模式下總筆數查詢完成時發出
+    totalChanged = Signal(int)
+
+    def __init__(self, reader, repo_class: type, columns: Sequence[TableColumn],
+                 order_by: Optional[Sequence[str]] = None, filters: Optional[Dict[str, Any]] = None,
+                 block_size: int = 200, extra_fields: Sequence[str] = (),
+                 row_background: Optional[Callable[[Any], Any]] = None, loader=None,
+                 max_blocks: Optional[int] = 10, parent=None):
+        """
+        Args:
+            reader: ReadSession（或任何回傳 Session 的 context manager）
+            repo_class: Repository 類別，以 repo_class(session) 建立
+            columns: 顯示欄位
+            order_by: 預設排序（同 list_after，"-欄位" 為遞減）
+            filters: 篩選條件（同 list）
+            block_size: 每次向資料庫取得的筆數
+            extra_fields: 不顯示但需要讀取的欄位（例如上色判斷用）
+            row_background: 資料列 → 背景色（QColor）或 None
+            loader: AsyncLoader；None 時在 GUI 執行緒以 reader 同步查詢
+            max_blocks: 記憶體中最多保留的段數；None 表示不釋放
+        """
+        super().__init__(parent)
+        self._reader = reader
+        self._repo_class = repo_class
+        self._columns = list(columns)
+        self._fields = list(dict.fromkeys([c.field for c in self._columns] + list(extra_fields)))
+        self._order_by = list(order_by or [])
+        self._filters = dict(filters or {})
+        self.block_size = block_size
+        self._row_background = row_background
+        self._loader = loader
+        self.max_blocks = max_blocks
+        self._fetching = False
+        # 段落編號 → 資料列（依最近使用排序）；列 i 位於第 i // block_size 段
+        self._blocks: "OrderedDict[int, List[Any]]" = OrderedDict()
+        # 第 i 段的起點游標（keyset 模式重新讀取用）
+        self._block_cursors: List[Optional[str]] = []
+        # 背景重新讀取中的段落
+        self._reloading: Set[int] = set()
+        self._row_count = 0
+        self._cursor: Optional[str] = None
+        self._exhausted = False
+        self._total: Optional[int] = None
+        # show_rows() 顯示的固定結果（不向資料庫分段載入）
+        self._static = False
+
+    # ---------- Qt 介面 ----------
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._row_count
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._columns)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.BackgroundRole):
+            return None
+        record = self._record(index.row())
+        if record is None:
+            # 已釋放的段落重新讀取中
+            return None
+        if role == Qt.DisplayRole:
+            column = self._columns[index.column()]
+            value = getattr(record, column.field)
+            if column.format is not None:
+                return column.format(value)
+            return "" if value is None else str(value)
+        if role == Qt.BackgroundRole and self._row_background is not None:
+            return self._row_background(record)
+        return None
+
+    def headerData(self, section: int, orientation, role: int = Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self._columns[section].header
+        return str(section + 1)
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        return not parent.isValid() and not self._exhausted and not self._fetching
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()):
+        self._request_block()
+
+    def sort(self, column: int, order=Qt.AscendingOrder):
+        """排序交由資料庫：重設游標後重新取第一段"""
+        if not 0 <= column < len(self._columns) or not self._columns[column].sortable:
+            return
+        field = self._columns[column].field
+        if self._static:
+            # 固定結果（例如依相關度排序的搜尋結果）只在記憶體中排序
+            self.layoutAboutToBeChanged.emit()
+            rows = sorted(self._static_rows(), key=lambda r: (getattr(r, field) is None, getattr(r, field) or ""),
+                          reverse=order == Qt.DescendingOrder)
+            self._set_static_rows(rows)
+            self.layoutChanged.emit()
+            return
+        order_by = [("-" if order == Qt.DescendingOrder else "") + field]
+        # setSortingEnabled(True) 會以目前排序呼叫一次，排序未變時不必重查
+        if order_by == self._order_by:
+            return
+        self._order_by = order_by
+        self.refresh()
+
+    # ---------- 操作 ----------
+    def set_filters(self, filters: Optional[Dict[str, Any]], delay_ms: int = 0):
+        """變更篩選條件並重新載入；delay_ms 為背景查詢的防彈跳時間"""
+        self._filters = dict(filters or {})
+        self.refresh(delay_ms)
+
+    def refresh(self, delay_ms: int = 0):
+        """清除已載入的資料列；第一段立即載入，其餘等捲動時再取"""
+        self._cancel()
+        self.beginResetModel()
+        self._clear_rows()
+        self._cursor = None
+        self._exhausted = False
+        self._total = None
+        self._static = False
+        self.endResetModel()
+        self._request_block(delay_ms)
+        if self._loader is not None:
+            filters, repo_class = dict(self._filters), self._repo_class
+            self._loader.submit(
+                self._key("count"),
+                lambda session: repo_class(session).cached_count(filters=filters),
+                self._on_total, lambda message: None, delay_ms=delay_ms
+            )
+
+    def show_rows(self, rows: Sequence[Any]):
+        """顯示呼叫端查好的結果（例如全文檢索），不再分段載入；refresh()/set_filters() 後恢復"""
+        self._cancel()
+        self.beginResetModel()
+        self._clear_rows()
+        self._set_static_rows(list(rows))
+        self._cursor = None
+        self._exhausted = True
+        self._total = self._row_count
+        self._static = True
+        self.endResetModel()
+
+    def row(self, index: int) -> Any:
+        """第 index 列的資料（named tuple）；所在段落已釋放時同步重新讀取"""
+        if not 0 <= index < self._row_count:
+            raise IndexError(index)
+        record = self._record(index)
+        if record is None:
+            self._reload_block(index // self.block_size, sync=True)
+            record = self._record(index)
+        return record
+
+    @property
+    def total(self) -> Optional[int]:
+        """已知的總筆數；背景模式下查詢完成前為 None"""
+        return self._total
+
+    def total_count(self) -> int:
+        """符合篩選條件的總筆數（依篩選條件快取，資料表變更前不重算）；同步查詢"""
+        if self._total is None:
+            with self._reader as session:
+                self._total = self._repo_class(session).cached_count(filters=self._filters)
+        return self._total
+
+    # ---------- 資料來源 ----------
+    def _use_keyset(self) -> bool:
+        # keyset 游標要求排序欄位不可為 NULL（主鍵會自動補上）
+        table = self._repo_class.model_class.__table__
+        names = [name.lstrip("-") for name in self._order_by]
+        return all(n in table.c and not table.c[n].nullable for n in names)
+
+    def _key(self, name: str) -> str:
+        return f"{self._repo_class.__name__}.{name}"
+
+    def _cancel(self):
+        self._fetching = False
+        if self._loader is not None:
+            self._loader.cancel(self._key("block"))
+            self._loader.cancel(self._key("count"))
+            for block in self._reloading:
+                self._loader.cancel(self._key(f"block.{block}"))
+        self._reloading.clear()
+
+    # ---------- 段落 ----------
+    def _clear_rows(self):
+        self._blocks.clear()
+        self._block_cursors = []
+        self._row_count = 0
+
+    def _static_rows(self) -> List[Any]:
+        return [r for b in sorted(self._blocks) for r in self._blocks[b]]
+
+    def _set_static_rows(self, rows: List[Any]):
+        # 固定結果不釋放，依 block_size 切段以共用 _record()
+        self._blocks = OrderedDict(
+            (i // self.block_size, rows[i:i + self.block_size]) for i in range(0, len(rows), self.block_size)
+        )
+        self._row_count = len(rows)
+
+    def _record(self, index: int) -> Any:
+        """第 index 列；所在段落已釋放時排入重新讀取並回傳 None（同步模式直接讀回）"""
+        block = index // self.block_size
+        rows = self._blocks.get(block)
+        if rows is None:
+            self._reload_block(block)
+            rows = self._blocks.get(block)
+            if rows is None:
+                return None
+        self._blocks.move_to_end(block)
+        offset = index - block * self.block_size
+        return rows[offset] if offset < len(rows) else None
+
+    def _store_block(self, block: int, rows: List[Any]):
+        self._blocks[block] = rows
+        self._blocks.move_to_end(block)
+        if self.max_blocks is None or self._static:
+            return
+        # 釋放最久未使用的段落（剛存入的段落為最近使用，不會被釋放）
+        while len(self._blocks) > max(self.max_blocks, 1):
+            self._blocks.popitem(last=False)
+
+    def _reload_block(self, block: int, sync: bool = False):
+        """重新讀取已釋放的段落（以該段起點游標或 OFFSET；資料若已變動，以讀回的內容為準）"""
+        if block >= len(self._block_cursors) or block in self._blocks:
+            return
+        args = (self._block_cursors[block], list(self._order_by), dict(self._filters),
+                block * self.block_size, self._use_keyset())
+        if self._loader is None or sync:
+            try:
+                with self._reader as session:
+                    rows = self._query_block(session, *args)[0]
+            except Exception as e:
+                self.loadFailed.emit(str(e))
+                return
+            self._store_block(block, rows)
+            return
+        if block in self._reloading:
+            return
+        self._reloading.add(block)
+        self._loader.submit(self._key(f"block.{block}"), lambda session: self._query_block(session, *args),
+                            lambda result, b=block: self._on_reloaded(b, result[0]),
+                            lambda message, b=block: self._on_reload_failed(b, message))
+
+    def _on_reloaded(self, block: int, rows: List[Any]):
+        self._reloading.discard(block)
+        self._store_block(block, rows)
+        first = block * self.block_size
+        last = min(first + self.block_size, self._row_count) - 1
+        if last >= first:
+            self.dataChanged.emit(self.index(first, 0), self.index(last, len(self._columns) - 1))
+
+    def _on_reload_failed(self, block: int, message: str):
+        self._reloading.discard(block)
+        self.loadFailed.emit(message)
+
+    def _request_block(self, delay_ms: int = 0):
+        if self._exhausted or self._fetching:
+            return
+        # 查詢參數取快照：背景執行緒不讀取模型狀態
+        start = self._cursor
+        args = (start, list(self._order_by), dict(self._filters), self._row_count, self._use_keyset())
+        if self._loader is None:
+            try:
+                with self._reader as session:
+                    block = self._query_block(session, *args)
+            except Exception as e:
+                self._on_block_failed(str(e))
+                return
+            self._on_block(block, start)
+            return
+        self._fetching = True
+        self._loader.submit(self._key("block"), lambda session: self._query_block(session, *args),
+                            lambda block: self._on_block(block, start), self._on_block_failed, delay_ms=delay_ms)
+
+    def _query_block(self, session, cursor: Optional[str], order_by: List[str], filters: Dict[str, Any],
+                     offset: int, keyset: bool) -> Tuple[List[Any], Optional[str], bool]:
+        """取得一段資料：(資料列, 下一段游標, 是否已取完)；可在背景執行緒執行"""
+        repo = self._repo_class(session)
+        if keyset:
+            page = repo.list_after(cursor, order_by=order_by, limit=self.block_size,
+                                   filters=filters, columns=self._fields)
+            return page.items, page.next_cursor, page.next_cursor is None
+        rows = repo.select_rows(self._fields, filters=filters, order_by=order_by,
+                                limit=self.block_size + 1, offset=offset)
+        return rows[:self.block_size], None, len(rows) <= self.block_size
+
+    def _on_block(self, block: Tuple[List[Any], Optional[str], bool], start_cursor: Optional[str] = None):
+        rows, self._cursor, self._exhausted = block
+        self._fetching = False
+        if rows:
+            start = self._row_count
+            self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+            self._block_cursors.append(start_cursor)
+            self._store_block(len(self._block_cursors) - 1, rows)
+            self._row_count += len(rows)
+            self.endInsertRows()
+
+    def _on_block_failed(self, message: str):
+        self._fetching = False
+        self._exhausted = True
+        self.loadFailed.emit(message)
+
+    def _on_total(self, total: int):
+        self._total = total
+        self.totalChanged.emit(total)
@@ -20,6 +20,7 @@ from PySide6.QtWidgets import (
 )
 
 from hrms.core.config import settings
+from hrms.lookups.service import lookup_options
 
 
 def _resolve_data_dir() -> Path:
@@ -158,37 +159,13 @@ class BasicCSVWindow(QDialog):
         else:
             widget.setText(value or "")
 
-    def _read_external_csv(self, csv_name: str) -> pd.DataFrame:
-        path = _resolve_data_dir() / csv_name
-        if not path.exists():
-            return pd.DataFrame()
-        try:
-            return pd.read_csv(path, encoding="utf-8", dtype=str, keep_default_na=False)
-        except Exception:
-            return pd.DataFrame()
-
     def reload_lookup_options(self):
         for col, spec in self.lookups.items():
             combo = self._lookup_widgets.get(col)
             if combo is None:
                 continue
-            df = self._read_external_csv(spec.source_csv)
-            seen = set()
-            options: List[tuple[str, str]] = []
-            for _, row in df.iterrows():
-                raw_val = str(row.get(spec.value_column, "")).strip()
-                if not raw_val or raw_val in seen:
-                    continue
-                seen.add(raw_val)
-                label_parts = []
-                for field in spec.label_columns:
-                    part = str(row.get(field, "")).strip()
-                    if part:
-                        label_parts.append(part)
-                label = raw_val
-                if label_parts:
-                    label = f"{raw_val} - {' / '.join(label_parts)}"
-                options.append((label, raw_val))
+            # 依檔案版本快取，CSV 未變動時不重新讀取
+            options = lookup_options(_resolve_data_dir() / spec.source_csv, spec.value_column, spec.label_columns)
             current_value = self._get_widget_value(col)
             combo.blockSignals(True)
             combo.clear()
@@ -1,20 +1,20 @@
 # -*- coding: utf-8 -*-
 """
 員工基本資料管理視窗（SQLite 版本）
-現代化 UI 設計，包含搜尋、分頁、資料驗證
+現代化 UI 設計，包含搜尋、分段載入列表、資料驗證
+列表與下拉選單於背景執行緒查詢（AsyncLoader），輸入搜尋條件時不會卡住畫面
 """
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QLineEdit, QCheckBox,
     QPushButton, QMessageBox, QComboBox, QGroupBox, QLabel,
     QTableView, QHeaderView, QDateEdit
 )
-from PySide6.QtCore import Qt, QSortFilterProxyModel, QDate
-from PySide6.QtGui import QStandardItemModel, QStandardItem
-from typing import Optional, List
+from PySide6.QtCore import Qt, QDate
 
-from hrms.core.db.unit_of_work_sqlite import UnitOfWork
+from hrms.core.db.unit_of_work_sqlite import UnitOfWork, ReadSession
+from hrms.ui.qt.async_loader import AsyncLoader
+from hrms.ui.qt.table_model import RepositoryTableModel, TableColumn
 from repositories import BasicRepository, LookupService
-from domain.models import Basic
 
 
 class BasicWindow(QDialog):
@@ -22,25 +22,51 @@ class BasicWindow(QDialog):
     員工基本資料管理視窗
     功能：
     - 員工資料 CRUD
-    - 即時搜尋（員工編號、姓名）
-    - 分頁顯示（每頁 50 筆）
+    - 即時搜尋（員工編號、姓名；停止輸入後才查詢）
+    - 列表捲動時分段載入（每次 200 筆），點選欄位標題由資料庫排序
     - 資料驗證（必填欄位）
     """
     
-    PAGE_SIZE = 50
+    BLOCK_SIZE = 200
+    # 姓名搜尋（全文檢索依相關度排序）最多顯示筆數
+    NAME_SEARCH_LIMIT = 200
+    ORDER_BY = ["EMP_ID"]
+    # 列表只讀取顯示用欄位（named tuple，不建立 ORM 物件）
+    LIST_COLUMNS = [
+        TableColumn("EMP_ID", "員工編號"),
+        TableColumn("C_Name", "姓名"),
+        TableColumn("Dept_Code", "部門"),
+        TableColumn("Title", "職稱"),
+        TableColumn("SHIFT", "班別"),
+        TableColumn("Shop", "工站"),
+        TableColumn("Area", "區域"),
+        TableColumn("Function", "職務"),
+        TableColumn("On_Board_Date", "到職日"),
+        TableColumn("Active", "狀態", format=lambda v: "在職" if v else "離職"),
+    ]
     
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("員工基本資料管理（SQLite 版）")
         self.resize(1200, 800)
         
-        self.current_page = 1
-        self.total_records = 0
         self.search_filters = {}
         
+        # 單筆載入用的唯讀 Session（本行程寫入監看的資料表時自動失效）
+        self._reader = ReadSession(tables=["BASIC", "L_Section"])
+        # 列表、姓名搜尋、下拉選單於背景查詢
+        self._loader = AsyncLoader(self)
+        
         self._init_ui()
+        self._load_comboboxes()
         self._load_data()
     
+    def closeEvent(self, event):
+        """關閉視窗時取消背景查詢並釋放唯讀 Session"""
+        self._loader.shutdown()
+        self._reader.close()
+        super().closeEvent(event)
+    
     def _init_ui(self):
         """初始化 UI"""
         main_layout = QVBoxLayout(self)
@@ -56,14 +82,6 @@ class BasicWindow(QDialog):
         # 表單區域
         form_group = self._create_form_group()
         main_layout.addWidget(form_group)
-        
-        # 分頁控制區域
-        pagination_group = self._create_pagination_group()
-        main_layout.addWidget(pagination_group)
-        
-        # 載入表單區域的部門選項（因為表單區域剛初始化完成）
-        if hasattr(self, 'dept'):
-            self._load_dept_options_to_form()
     
     def _create_search_group(self) -> QGroupBox:
         """建立搜尋區域"""
@@ -89,7 +107,6 @@ class BasicWindow(QDialog):
         self.search_dept = QComboBox()
         self.search_dept.setEditable(True)
         self.search_dept.addItem("", "")
-        self._load_dept_options()
         self.search_dept.currentTextChanged.connect(self._on_search_changed)
         layout.addWidget(self.search_dept)
         
@@ -118,7 +135,7 @@ class BasicWindow(QDialog):
         toolbar = QHBoxLayout()
         
         self.btn_refresh = QPushButton("🔄 刷新")
-        self.btn_refresh.clicked.connect(self._load_data)
+        self.btn_refresh.clicked.connect(lambda: self._load_data())
         toolbar.addWidget(self.btn_refresh)
         
         self.btn_export = QPushButton("📊 匯出 Excel")
@@ -128,22 +145,25 @@ class BasicWindow(QDialog):
         toolbar.addStretch()
         layout.addLayout(toolbar)
         
-        # 資料表格
-        self.table_model = QStandardItemModel()
-        self.table_proxy = QSortFilterProxyModel()
-        self.table_proxy.setSourceModel(self.table_model)
+        # 資料表格：捲動到底時才載入下一段，點選欄位標題由資料庫排序
+        self.table_model = RepositoryTableModel(
+            self._reader, BasicRepository, self.LIST_COLUMNS,
+            order_by=self.ORDER_BY, block_size=self.BLOCK_SIZE, loader=self._loader, parent=self
+        )
+        self.table_model.rowsInserted.connect(self._update_status)
+        self.table_model.totalChanged.connect(self._update_status)
+        self.table_model.loadFailed.connect(
+            lambda message: QMessageBox.critical(self, "錯誤", f"載入資料失敗:\n{message}"))
         
         self.table_view = QTableView()
-        self.table_view.setModel(self.table_proxy)
+        self.table_view.setModel(self.table_model)
         self.table_view.setSelectionBehavior(QTableView.SelectRows)
         self.table_view.setSelectionMode(QTableView.SingleSelection)
         self.table_view.setAlternatingRowColors(True)
+        self.table_view.horizontalHeader().setSortIndicator(0, Qt.AscendingOrder)
         self.table_view.setSortingEnabled(True)
         self.table_view.doubleClicked.connect(self._on_table_double_click)
         
-        # 設定表格標題
-        self._setup_table_headers()
-        
         layout.addWidget(self.table_view)
         
         # 狀態列
@@ -243,163 +263,66 @@ class BasicWindow(QDialog):
         group.setLayout(layout)
         return group
     
-    def _create_pagination_group(self) -> QGroupBox:
-        """建立分頁控制區域"""
-        group = QGroupBox("分頁控制")
-        layout = QHBoxLayout()
-        
-        self.btn_first = QPushButton("⏮ 第一頁")
-        self.btn_first.clicked.connect(lambda: self._goto_page(1))
-        layout.addWidget(self.btn_first)
-        
-        self.btn_prev = QPushButton("◀ 上一頁")
-        self.btn_prev.clicked.connect(self._goto_prev_page)
-        layout.addWidget(self.btn_prev)
-        
-        self.lbl_page = QLabel("第 1 頁 / 共 1 頁")
-        layout.addWidget(self.lbl_page)
-        
-        self.btn_next = QPushButton("下一頁 ▶")
-        self.btn_next.clicked.connect(self._goto_next_page)
-        layout.addWidget(self.btn_next)
-        
-        self.btn_last = QPushButton("最末頁 ⏭")
-        self.btn_last.clicked.connect(self._goto_last_page)
-        layout.addWidget(self.btn_last)
+    def _load_data(self, delay_ms: int = 0):
+        """
+        重新載入列表（只取第一段，其餘捲動時再載入）
+        
+        Args:
+            delay_ms: 防彈跳時間（搜尋條件輸入中時使用）
+        """
+        name = self.search_name.text().strip()
+        if not name:
+            self._loader.cancel("name_search")
+            self.table_model.set_filters(self.search_filters, delay_ms=delay_ms)
+            self._update_status()
+            return
         
-        layout.addStretch()
-        group.setLayout(layout)
-        return group
-    
-    def _setup_table_headers(self):
-        """設定表格標題"""
-        headers = ["員工編號", "姓名", "部門", "職稱", "班別", "工站", "區域", "職務", "到職日", "狀態"]
-        self.table_model.setHorizontalHeaderLabels(headers)
+        # 姓名搜尋：全文檢索依相關度排序，結果筆數有上限，一次顯示
+        only_active = self.search_active.currentText() == "在職"
+        limit = self.NAME_SEARCH_LIMIT
+        
+        def show(employees):
+            self.table_model.show_rows(employees)
+            self.lbl_status.setText(f"姓名搜尋：{len(employees)} 筆資料")
+        
+        self.lbl_status.setText("搜尋中…")
+        self._loader.submit(
+            "name_search",
+            lambda session: BasicRepository(session).search_by_name(name, only_active=only_active, limit=limit),
+            show,
+            lambda message: QMessageBox.critical(self, "錯誤", f"載入資料失敗:\n{message}"),
+            delay_ms=delay_ms
+        )
     
-    def _load_data(self):
-        """載入資料"""
-        try:
-            with UnitOfWork() as uow:
-                repo = BasicRepository(uow.session)
-                
-                self.total_records = repo.count(filters=self.search_filters)
-                
-                total_pages = (self.total_records + self.PAGE_SIZE - 1) // self.PAGE_SIZE
-                if total_pages == 0:
-                    total_pages = 1
-                
-                if self.current_page > total_pages:
-                    self.current_page = total_pages
-                if self.current_page < 1:
-                    self.current_page = 1
-                
-                offset = (self.current_page - 1) * self.PAGE_SIZE
-                
-                # 如果有姓名搜尋，使用特殊方法
-                if self.search_name.text().strip():
-                    employees = repo.search_by_name(
-                        self.search_name.text().strip(),
-                        only_active=(self.search_active.currentText() == "在職"),
-                        limit=self.PAGE_SIZE
-                    )
-                else:
-                    employees = repo.list(
-                        filters=self.search_filters,
-                        limit=self.PAGE_SIZE,
-                        offset=offset
-                    )
-                
-                self._update_table(employees)
-                self._update_pagination_info()
-                
-                self.lbl_status.setText(f"顯示 {len(employees)} / {self.total_records} 筆資料")
-                
-        except Exception as e:
-            QMessageBox.critical(self, "錯誤", f"載入資料失敗:\n{str(e)}")
+    def _update_status(self, *args):
+        """更新狀態列（總筆數於背景查詢，完成前只顯示已載入筆數）"""
+        if self.search_name.text().strip():
+            return
+        total = self.table_model.total
+        if total is None:
+            self.lbl_status.setText(f"顯示 {self.table_model.rowCount()} 筆資料（載入中…）")
+        else:
+            self.lbl_status.setText(f"顯示 {self.table_model.rowCount()} / {total} 筆資料")
     
-    def _update_table(self, employees: List[Basic]):
-        """更新表格資料"""
-        self.table_model.removeRows(0, self.table_model.rowCount())
-        
-        for row, emp in enumerate(employees):
-            self.table_model.insertRow(row)
-            
-            # 員工編號
-            item = QStandardItem(emp.EMP_ID or "")
-            item.setData(emp.EMP_ID)
-            self.table_model.setItem(row, 0, item)
+    def _load_comboboxes(self):
+        """載入部門選項（背景查詢；對照表快取命中時不存取資料庫）"""
+        def apply(dept_codes):
+            # 填入選項不觸發搜尋
+            self.search_dept.blockSignals(True)
+            self.search_dept.clear()
+            self.search_dept.addItem("", "")
+            self.search_dept.addItems(dept_codes)
+            self.search_dept.blockSignals(False)
             
-            # 姓名
-            self.table_model.setItem(row, 1, QStandardItem(emp.C_Name or ""))
-            
-            # 部門
-            self.table_model.setItem(row, 2, QStandardItem(emp.Dept_Code or ""))
-            
-            # 職稱
-            self.table_model.setItem(row, 3, QStandardItem(emp.Title or ""))
-            
-            # 班別
-            self.table_model.setItem(row, 4, QStandardItem(emp.SHIFT or ""))
-            
-            # 工站
-            self.table_model.setItem(row, 5, QStandardItem(emp.Shop or ""))
-            
-            # 區域
-            self.table_model.setItem(row, 6, QStandardItem(emp.Area or ""))
-            
-            # 職務
-            self.table_model.setItem(row, 7, QStandardItem(emp.Function or ""))
-            
-            # 到職日
-            self.table_model.setItem(row, 8, QStandardItem(emp.On_Board_Date or ""))
-            
-            # 狀態
-            status = "在職" if emp.Active else "離職"
-            self.table_model.setItem(row, 9, QStandardItem(status))
-    
-    def _update_pagination_info(self):
-        """更新分頁資訊"""
-        total_pages = (self.total_records + self.PAGE_SIZE - 1) // self.PAGE_SIZE
-        if total_pages == 0:
-            total_pages = 1
-        
-        self.lbl_page.setText(f"第 {self.current_page} 頁 / 共 {total_pages} 頁")
-        
-        self.btn_first.setEnabled(self.current_page > 1)
-        self.btn_prev.setEnabled(self.current_page > 1)
-        self.btn_next.setEnabled(self.current_page < total_pages)
-        self.btn_last.setEnabled(self.current_page < total_pages)
-    
-    def _load_dept_options(self):
-        """載入部門選項"""
-        try:
-            with UnitOfWork() as uow:
-                service = LookupService(uow.session)
-                dept_codes = service.list_dept_codes()
-                
-                # 搜尋區域的部門下拉選單（一定存在）
-                self.search_dept.clear()
-                self.search_dept.addItem("", "")
-                self.search_dept.addItems(dept_codes)
-                
-                # 表單區域的部門下拉選單（可能還沒初始化）
-                if hasattr(self, 'dept'):
-                    self.dept.clear()
-                    self.dept.addItems(dept_codes)
-        except Exception as e:
-            QMessageBox.warning(self, "警告", f"載入部門選項失敗:\n{str(e)}")
-    
-    def _load_dept_options_to_form(self):
-        """載入表單區域的部門選項（確保表單區域已初始化）"""
-        try:
-            with UnitOfWork() as uow:
-                service = LookupService(uow.session)
-                dept_codes = service.list_dept_codes()
-                
-                self.dept.clear()
-                self.dept.addItems(dept_codes)
-        except Exception as e:
-            QMessageBox.warning(self, "警告", f"載入表單部門選項失敗:\n{str(e)}")
+            self.dept.clear()
+            self.dept.addItems(dept_codes)
+        
+        self._loader.submit(
+            "comboboxes",
+            lambda session: list(LookupService(session).list_dept_codes()),
+            apply,
+            lambda message: QMessageBox.warning(self, "警告", f"載入部門選項失敗:\n{message}")
+        )
     
     def _on_search_changed(self):
         """搜尋條件變更時"""
@@ -416,8 +339,8 @@ class BasicWindow(QDialog):
         elif self.search_active.currentText() == "離職":
             self.search_filters["Active"] = False
         
-        self.current_page = 1
-        self._load_data()
+        # 輸入中不查詢，停止輸入後才送出（前一次查詢會被取消）
+        self._load_data(AsyncLoader.DEBOUNCE_MS)
     
     def _clear_search(self):
         """清除搜尋"""
@@ -427,47 +350,18 @@ class BasicWindow(QDialog):
         self.search_active.setCurrentIndex(0)
         
         self.search_filters = {}
-        self.current_page = 1
-        self._load_data()
-    
-    def _goto_page(self, page: int):
-        """跳轉到指定頁碼"""
-        total_pages = (self.total_records + self.PAGE_SIZE - 1) // self.PAGE_SIZE
-        
-        if page < 1:
-            page = 1
-        if page > total_pages:
-            page = total_pages
-        
-        self.current_page = page
         self._load_data()
     
-    def _goto_prev_page(self):
-        """上一頁"""
-        self._goto_page(self.current_page - 1)
-    
-    def _goto_next_page(self):
-        """下一頁"""
-        self._goto_page(self.current_page + 1)
-    
-    def _goto_last_page(self):
-        """最末頁"""
-        total_pages = (self.total_records + self.PAGE_SIZE - 1) // self.PAGE_SIZE
-        self._goto_page(total_pages)
-    
     def _on_table_double_click(self, index):
         """表格雙擊"""
-        source_index = self.table_proxy.mapToSource(index)
-        emp_id_item = self.table_model.item(source_index.row(), 0)
-        
-        if emp_id_item:
-            self._load_employee(emp_id_item.text())
+        record = self.table_model.row(index.row())
+        self._load_employee(record.EMP_ID)
     
     def _load_employee(self, emp_id: str):
         """載入員工資料"""
         try:
-            with UnitOfWork() as uow:
-                repo = BasicRepository(uow.session)
+            with self._reader as session:
+                repo = BasicRepository(session)
                 employee = repo.get_by_pk(emp_id)
                 
                 if employee:
@@ -603,7 +497,7 @@ class BasicWindow(QDialog):
             from hrms.core.reporting.reports import df_to_excel
             import pandas as pd
             
-            with UnitOfWork() as uow:
+            with UnitOfWork(readonly=True) as uow:
                 repo = BasicRepository(uow.session)
                 employees = repo.list(filters=self.search_filters)
                 
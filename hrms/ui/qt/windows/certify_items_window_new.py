@@ -10,10 +10,14 @@ from PySide6.QtCore import Qt
 from PySide6.QtGui import QStandardItemModel, QStandardItem
 from typing import List
 
+from hrms.core.utils.logger import get_logger
 from hrms.core.db.unit_of_work_sqlite import UnitOfWork
-from repositories import CertifyItemRepository, CertifyTypeRepository, SectionRepository
+from hrms.ui.qt.async_loader import AsyncLoader
+from repositories import CertifyItemRepository, LookupService
 from domain.models import CertifyItem
 
+logger = get_logger()
+
 
 class CertifyItemsWindow(QDialog):
     """證照項目管理視窗"""
@@ -22,9 +26,19 @@ class CertifyItemsWindow(QDialog):
         super().__init__(parent)
         self.setWindowTitle("證照項目管理")
         self.resize(1100, 700)
+        # 列表與下拉選單於背景查詢，結果回到 GUI 執行緒才更新畫面
+        self._loader = AsyncLoader(self)
+        self._loader.failed.connect(
+            lambda key, message: QMessageBox.critical(self, "錯誤", f"載入資料失敗:\n{message}"))
+        
         self._init_ui()
         self._load_data()
     
+    def closeEvent(self, event):
+        """關閉視窗時取消背景查詢"""
+        self._loader.shutdown()
+        super().closeEvent(event)
+    
     def _init_ui(self):
         """初始化 UI"""
         main_layout = QVBoxLayout(self)
@@ -129,43 +143,46 @@ class CertifyItemsWindow(QDialog):
         main_layout.addWidget(table_group)
     
     def _load_data(self):
-        """載入資料"""
-        try:
-            with UnitOfWork() as uow:
-                item_repo = CertifyItemRepository(uow.session)
-                items = item_repo.list()
-                self._update_table(items)
-                
-                # 載入下拉選單
-                self._load_comboboxes()
-        except Exception as e:
-            QMessageBox.critical(self, "錯誤", f"載入資料失敗:\n{str(e)}")
+        """載入資料（背景查詢）"""
+        self._loader.submit("list", lambda session: CertifyItemRepository(session).list(), self._update_table)
+        
+        # 載入下拉選單
+        self._load_comboboxes()
     
     def _load_comboboxes(self):
-        """載入下拉選單選項"""
-        try:
-            with UnitOfWork() as uow:
-                # 部門
-                section_repo = SectionRepository(uow.session)
-                sections = section_repo.list()
-                self.search_dept.clear()
-                self.search_dept.addItem("", "")
-                self.dept.clear()
-                for section in sections:
-                    self.search_dept.addItem(section.Dept_Code, section.Dept_Code)
-                    self.dept.addItem(section.Dept_Code, section.Dept_Code)
-                
-                # 證照類型
-                type_repo = CertifyTypeRepository(uow.session)
-                types = type_repo.list()
-                self.search_type.clear()
-                self.search_type.addItem("", "")
-                self.certify_type.clear()
-                for ct in types:
-                    self.search_type.addItem(ct.Certify_Type, ct.Certify_Type)
-                    self.certify_type.addItem(ct.Certify_Type, ct.Certify_Type)
-        except Exception as e:
-            print(f"載入下拉選單失敗: {e}")
+        """載入下拉選單選項（背景查詢）"""
+        def query(session):
+            # 對照表快取：資料表未變更前不查詢資料庫
+            lookups = LookupService(session)
+            return list(lookups.list_dept_codes()), list(lookups.list_certify_types())
+        
+        def apply(result):
+            dept_codes, certify_types = result
+            # 填入選項不觸發搜尋
+            self.search_dept.blockSignals(True)
+            self.search_type.blockSignals(True)
+            
+            # 部門
+            self.search_dept.clear()
+            self.search_dept.addItem("", "")
+            self.dept.clear()
+            for code in dept_codes:
+                self.search_dept.addItem(code, code)
+                self.dept.addItem(code, code)
+            
+            # 證照類型
+            self.search_type.clear()
+            self.search_type.addItem("", "")
+            self.certify_type.clear()
+            for ct in certify_types:
+                self.search_type.addItem(ct, ct)
+                self.certify_type.addItem(ct, ct)
+            
+            self.search_dept.blockSignals(False)
+            self.search_type.blockSignals(False)
+        
+        self._loader.submit("comboboxes", query, apply,
+                            lambda message: logger.warning("載入下拉選單失敗: %s", message))
     
     def _update_table(self, items: List[CertifyItem]):
         """更新表格"""
@@ -195,13 +212,14 @@ class CertifyItemsWindow(QDialog):
         if self.search_type.currentText():
             filters["Certify_Type"] = self.search_type.currentText()
         
-        try:
-            with UnitOfWork() as uow:
-                repo = CertifyItemRepository(uow.session)
-                items = repo.list(filters=filters)
-                self._update_table(items)
-        except Exception as e:
-            QMessageBox.critical(self, "錯誤", f"搜尋失敗:\n{str(e)}")
+        # 輸入中不查詢，停止輸入後才送出（前一次查詢會被取消）
+        self._loader.submit(
+            "list",
+            lambda session: CertifyItemRepository(session).list(filters=filters),
+            self._update_table,
+            lambda message: QMessageBox.critical(self, "錯誤", f"搜尋失敗:\n{message}"),
+            delay_ms=AsyncLoader.DEBOUNCE_MS
+        )
     
     def _on_table_double_click(self, index):
         """表格雙擊"""
@@ -8,12 +8,16 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QStandardItemModel, QStandardItem
-from typing import List
+from typing import Dict, List, Tuple
 
+from hrms.core.utils.logger import get_logger
 from hrms.core.db.unit_of_work_sqlite import UnitOfWork
+from hrms.ui.qt.async_loader import AsyncLoader
 from repositories import CertifyRecordRepository, BasicRepository, CertifyItemRepository, CertifyTypeRepository
 from domain.models import CertifyRecord
 
+logger = get_logger()
+
 
 class CertifyRecordWindow(QDialog):
     """證照記錄管理視窗"""
@@ -22,9 +26,19 @@ class CertifyRecordWindow(QDialog):
         super().__init__(parent)
         self.setWindowTitle("證照記錄管理")
         self.resize(1100, 700)
+        # 列表與下拉選單於背景查詢，結果回到 GUI 執行緒才更新畫面
+        self._loader = AsyncLoader(self)
+        self._loader.failed.connect(
+            lambda key, message: QMessageBox.critical(self, "錯誤", f"載入資料失敗:\n{message}"))
+        
         self._init_ui()
         self._load_data()
     
+    def closeEvent(self, event):
+        """關閉視窗時取消背景查詢"""
+        self._loader.shutdown()
+        super().closeEvent(event)
+    
     def _init_ui(self):
         """初始化 UI"""
         main_layout = QVBoxLayout(self)
@@ -121,81 +135,69 @@ class CertifyRecordWindow(QDialog):
         main_layout.addWidget(table_group)
     
     def _load_data(self):
-        """載入資料"""
-        try:
-            with UnitOfWork() as uow:
-                record_repo = CertifyRecordRepository(uow.session)
-                records = record_repo.list()
-                self._update_table(records)
-                
-                # 載入下拉選單
-                self._load_comboboxes()
-        except Exception as e:
-            QMessageBox.critical(self, "錯誤", f"載入資料失敗:\n{str(e)}")
+        """載入資料（背景查詢）"""
+        self._loader.submit("list", lambda session: self._query_records(session, {}), self._update_table)
+        
+        # 載入下拉選單
+        self._load_comboboxes()
     
     def _load_comboboxes(self):
-        """載入下拉選單選項"""
-        try:
-            with UnitOfWork() as uow:
-                # 員工列表
-                basic_repo = BasicRepository(uow.session)
-                employees = basic_repo.list()
-                
-                self.search_emp.clear()
-                self.search_emp.addItem("", "")
-                self.emp_id.clear()
-                for emp in employees:
-                    display_text = f"{emp.EMP_ID} - {getattr(emp, 'C_Name', '')}"
-                    self.search_emp.addItem(display_text, emp.EMP_ID)
-                    self.emp_id.addItem(display_text, emp.EMP_ID)
-                
-                # 證照項目
-                item_repo = CertifyItemRepository(uow.session)
-                items = item_repo.list()
-                
-                self.search_certify.clear()
-                self.search_certify.addItem("", "")
-                self.certify_no.clear()
-                for item in items:
-                    display_text = f"{item.Certify_ID} - {item.Certify_Name}"
-                    self.search_certify.addItem(display_text, item.Certify_ID)
-                    self.certify_no.addItem(display_text, item.Certify_ID)
-                
-                # 證照類型
-                type_repo = CertifyTypeRepository(uow.session)
-                types = type_repo.list()
-                
-                self.record_type.clear()
-                self.record_type.addItem("", "")
-                for ct in types:
-                    self.record_type.addItem(ct.Certify_Type, ct.Certify_Type)
-        except Exception as e:
-            print(f"載入下拉選單失敗: {e}")
+        """載入下拉選單選項（背景查詢）"""
+        def query(session):
+            # 員工列表
+            employees = [(f"{emp.EMP_ID} - {getattr(emp, 'C_Name', '')}", emp.EMP_ID)
+                         for emp in BasicRepository(session).list()]
+            # 證照項目
+            items = [(f"{item.Certify_ID} - {item.Certify_Name}", item.Certify_ID)
+                     for item in CertifyItemRepository(session).list()]
+            # 證照類型
+            types = [ct.Certify_Type for ct in CertifyTypeRepository(session).list()]
+            return employees, items, types
+        
+        def apply(result):
+            employees, items, types = result
+            # 填入選項不觸發搜尋
+            self.search_emp.blockSignals(True)
+            self.search_certify.blockSignals(True)
+            
+            self.search_emp.clear()
+            self.search_emp.addItem("", "")
+            self.emp_id.clear()
+            for label, value in employees:
+                self.search_emp.addItem(label, value)
+                self.emp_id.addItem(label, value)
+            
+            self.search_certify.clear()
+            self.search_certify.addItem("", "")
+            self.certify_no.clear()
+            for label, value in items:
+                self.search_certify.addItem(label, value)
+                self.certify_no.addItem(label, value)
+            
+            self.record_type.clear()
+            self.record_type.addItem("", "")
+            for ct in types:
+                self.record_type.addItem(ct, ct)
+            
+            self.search_emp.blockSignals(False)
+            self.search_certify.blockSignals(False)
+        
+        self._loader.submit("comboboxes", query, apply,
+                            lambda message: logger.warning("載入下拉選單失敗: %s", message))
+    
+    @staticmethod
+    def _query_records(session, filters: Dict[str, str]) -> Tuple[List[CertifyRecord], Dict[str, str], Dict[str, str]]:
+        """證照記錄與顯示用的員工姓名、證照名稱（於背景執行緒執行）"""
+        records = CertifyRecordRepository(session).list(filters=filters)
+        emp_names = {emp.EMP_ID: getattr(emp, 'C_Name', '') for emp in BasicRepository(session).list()}
+        certify_names = {item.Certify_ID: item.Certify_Name for item in CertifyItemRepository(session).list()}
+        return records, emp_names, certify_names
     
-    def _update_table(self, records: List[CertifyRecord]):
+    def _update_table(self, result: Tuple[List[CertifyRecord], Dict[str, str], Dict[str, str]]):
         """更新表格"""
+        records, emp_names, certify_names = result
         self.table_model.removeRows(0, self.table_model.rowCount())
         
-        # 取得員工和證照名稱以供顯示
-        emp_names = {}
-        certify_names = {}
-        
-        try:
-            with UnitOfWork() as uow:
-                # 取得員工姓名
-                basic_repo = BasicRepository(uow.session)
-                employees = basic_repo.list()
-                for emp in employees:
-                    emp_names[emp.EMP_ID] = getattr(emp, 'C_Name', '')
-                
-                # 取得證照名稱
-                item_repo = CertifyItemRepository(uow.session)
-                items = item_repo.list()
-                for item in items:
-                    certify_names[item.Certify_ID] = item.Certify_Name
-        except:
-            pass
-        
         for row, record in enumerate(records):
             self.table_model.insertRow(row)
             
@@ -226,13 +228,14 @@ class CertifyRecordWindow(QDialog):
         if self.search_certify.currentData():
             filters["Certify_NO"] = self.search_certify.currentData()
         
-        try:
-            with UnitOfWork() as uow:
-                repo = CertifyRecordRepository(uow.session)
-                records = repo.list(filters=filters)
-                self._update_table(records)
-        except Exception as e:
-            QMessageBox.critical(self, "錯誤", f"搜尋失敗:\n{str(e)}")
+        # 輸入中不查詢，停止輸入後才送出（前一次查詢會被取消）
+        self._loader.submit(
+            "list",
+            lambda session: self._query_records(session, filters),
+            self._update_table,
+            lambda message: QMessageBox.critical(self, "錯誤", f"搜尋失敗:\n{message}"),
+            delay_ms=AsyncLoader.DEBOUNCE_MS
+        )
     
     def _on_table_double_click(self, index):
         """表格雙擊"""
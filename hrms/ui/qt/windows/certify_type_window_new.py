@@ -11,6 +11,7 @@ from PySide6.QtCore import Qt
 from PySide6.QtGui import QStandardItemModel, QStandardItem
 
 from hrms.core.db.unit_of_work_sqlite import UnitOfWork
+from hrms.ui.qt.async_loader import AsyncLoader
 from repositories import CertifyTypeRepository
 
 
@@ -21,9 +22,19 @@ class CertifyTypeWindow(QDialog):
         super().__init__(parent)
         self.setWindowTitle("認證類型管理")
         self.resize(700, 500)
+        # 列表於背景查詢，結果回到 GUI 執行緒才更新表格
+        self._loader = AsyncLoader(self)
+        self._loader.failed.connect(
+            lambda key, message: QMessageBox.critical(self, "錯誤", f"載入資料失敗:\n{message}"))
+        
         self._init_ui()
         self._load_data()
     
+    def closeEvent(self, event):
+        """關閉視窗時取消背景查詢"""
+        self._loader.shutdown()
+        super().closeEvent(event)
+    
     def _init_ui(self):
         """初始化 UI"""
         main_layout = QVBoxLayout(self)
@@ -70,14 +81,8 @@ class CertifyTypeWindow(QDialog):
         main_layout.addWidget(table_group)
     
     def _load_data(self):
-        """載入資料"""
-        try:
-            with UnitOfWork() as uow:
-                repo = CertifyTypeRepository(uow.session)
-                certify_types = repo.list()
-                self._update_table(certify_types)
-        except Exception as e:
-            QMessageBox.critical(self, "錯誤", f"載入資料失敗:\n{str(e)}")
+        """載入資料（背景查詢）"""
+        self._loader.submit("list", lambda session: CertifyTypeRepository(session).list(), self._update_table)
     
     def _update_table(self, certify_types):
         """更新表格"""
@@ -12,6 +12,7 @@ from PySide6.QtGui import QStandardItemModel, QStandardItem
 from typing import List
 
 from hrms.core.db.unit_of_work_sqlite import UnitOfWork
+from hrms.ui.qt.async_loader import AsyncLoader
 from repositories import JobRepository
 from domain.models import Job
 
@@ -23,9 +24,19 @@ class JobWindow(QDialog):
         super().__init__(parent)
         self.setWindowTitle("職務管理")
         self.resize(700, 500)
+        # 列表於背景查詢，結果回到 GUI 執行緒才更新表格
+        self._loader = AsyncLoader(self)
+        self._loader.failed.connect(
+            lambda key, message: QMessageBox.critical(self, "錯誤", f"載入資料失敗:\n{message}"))
+        
         self._init_ui()
         self._load_data()
     
+    def closeEvent(self, event):
+        """關閉視窗時取消背景查詢"""
+        self._loader.shutdown()
+        super().closeEvent(event)
+    
     def _init_ui(self):
         """初始化 UI"""
         main_layout = QVBoxLayout(self)
@@ -78,14 +89,8 @@ class JobWindow(QDialog):
         main_layout.addWidget(table_group)
     
     def _load_data(self):
-        """載入資料"""
-        try:
-            with UnitOfWork() as uow:
-                repo = JobRepository(uow.session)
-                jobs = repo.list()
-                self._update_table(jobs)
-        except Exception as e:
-            QMessageBox.critical(self, "錯誤", f"載入資料失敗:\n{str(e)}")
+        """載入資料（背景查詢）"""
+        self._loader.submit("list", lambda session: JobRepository(session).list(), self._update_table)
     
     def _update_table(self, jobs: List[Job]):
         """更新表格"""
@@ -11,6 +11,7 @@ from PySide6.QtGui import QStandardItemModel, QStandardItem
 from typing import List
 
 from hrms.core.db.unit_of_work_sqlite import UnitOfWork
+from hrms.ui.qt.async_loader import AsyncLoader
 from repositories import ShiftRepository, SectionRepository
 from domain.models import Shift
 
@@ -22,9 +23,19 @@ class ShiftWindow(QDialog):
         super().__init__(parent)
         self.setWindowTitle("班別管理")
         self.resize(900, 600)
+        # 列表於背景查詢，結果回到 GUI 執行緒才更新表格
+        self._loader = AsyncLoader(self)
+        self._loader.failed.connect(
+            lambda key, message: QMessageBox.critical(self, "錯誤", f"載入資料失敗:\n{message}"))
+        
         self._init_ui()
         self._load_data()
     
+    def closeEvent(self, event):
+        """關閉視窗時取消背景查詢"""
+        self._loader.shutdown()
+        super().closeEvent(event)
+    
     def _init_ui(self):
         """初始化 UI"""
         main_layout = QVBoxLayout(self)
@@ -90,21 +101,21 @@ class ShiftWindow(QDialog):
         main_layout.addWidget(table_group)
     
     def _load_data(self):
-        """載入資料"""
-        try:
-            with UnitOfWork() as uow:
-                shift_repo = ShiftRepository(uow.session)
-                shifts = shift_repo.list()
-                self._update_table(shifts)
-                
-                # 載入部門選項
-                dept_repo = SectionRepository(uow.session)
-                sections = dept_repo.list()
-                self.dept.clear()
-                for section in sections:
-                    self.dept.addItem(section.Dept_Code, section.Dept_Code)
-        except Exception as e:
-            QMessageBox.critical(self, "錯誤", f"載入資料失敗:\n{str(e)}")
+        """載入資料（背景查詢）"""
+        def query(session):
+            shifts = ShiftRepository(session).list()
+            # 部門選項
+            dept_codes = [section.Dept_Code for section in SectionRepository(session).list()]
+            return shifts, dept_codes
+        
+        def apply(result):
+            shifts, dept_codes = result
+            self._update_table(shifts)
+            self.dept.clear()
+            for code in dept_codes:
+                self.dept.addItem(code, code)
+        
+        self._loader.submit("list", query, apply)
     
     def _update_table(self, shifts: List[Shift]):
         """更新表格"""
@@ -2,7 +2,8 @@
 """
 證照記錄管理視窗（SQLite 版本）
 包含證照到期提醒功能
-重點：處理 9,605 筆資料，必須使用分頁和高效搜尋
+重點：處理 9,605 筆資料，列表捲動時才分段向資料庫載入（RepositoryTableModel），
+查詢皆在背景執行緒執行（AsyncLoader），輸入搜尋條件時不會卡住畫面
 """
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QLineEdit,
@@ -10,41 +11,67 @@ from PySide6.QtWidgets import (
     QLabel, QCheckBox, QDateEdit, QSplitter
 )
 from PySide6.QtCore import Qt, QDate
-from PySide6.QtGui import QStandardItemModel, QStandardItem, QColor
+from PySide6.QtGui import QColor
 from typing import List, Optional
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
-from hrms.core.db.unit_of_work_sqlite import UnitOfWork
+from hrms.core.utils.logger import get_logger
+from hrms.core.db.unit_of_work_sqlite import UnitOfWork, ReadSession
+from hrms.ui.qt.async_loader import AsyncLoader
+from hrms.ui.qt.table_model import RepositoryTableModel, TableColumn
 from repositories import TrainingRecordRepository, BasicRepository, CertifyItemRepository
-from domain.models import TrainingRecord
+
+logger = get_logger()
 
 
 class TrainingRecordWindow(QDialog):
     """
     證照記錄管理視窗
     重點功能：
-    - 分頁顯示（每頁 50 筆，處理 9,605 筆資料）
+    - 完整列表捲動顯示（每次向資料庫取 200 筆，處理 9,605 筆資料）
     - 多條件搜尋（員工、證照、日期）
     - 證照到期提醒（30 天內到期標紅色）
     - 批次操作（未來可擴充）
     """
     
-    PAGE_SIZE = 50  # 每頁 50 筆，避免載入過多資料
+    BLOCK_SIZE = 200  # 捲動到底時每次載入筆數
+    ORDER_BY = ["Certify_No"]
+    # 列表只讀取顯示用欄位（named tuple，不建立 ORM 物件）；員工姓名、證照名稱於同一查詢取得
+    LIST_COLUMNS = [
+        TableColumn("Certify_No", "證照編號"),
+        TableColumn("EMP_ID", "員工編號"),
+        TableColumn("C_Name", "員工姓名", sortable=False),
+        TableColumn("Certify_ID", "證照ID"),
+        TableColumn("Certify_Name", "證照名稱", sortable=False),
+        TableColumn("Certify_date", "核發日期"),
+        TableColumn("Certify_type", "證照類型"),
+        TableColumn("update_date", "更新日期"),
+        TableColumn("Active", "狀態", format=lambda v: "有效" if v else "過期"),
+    ]
     
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("證照記錄管理（含到期提醒）")
         self.resize(1400, 800)
         
-        self.current_page = 1
-        self.total_records = 0
         self.search_filters = {}
         self._expiring_days = 30  # 預設 30 天內到期提醒
         
+        # 單筆載入用的唯讀 Session（本行程寫入監看的資料表時自動失效）
+        self._reader = ReadSession(tables=["TRAINING_RECORD", "BASIC", "CERTIFY_ITEMS"])
+        # 列表、下拉選單、到期統計於背景查詢
+        self._loader = AsyncLoader(self)
+        
         self._init_ui()
         self._load_comboboxes()
         self._load_data()
     
+    def closeEvent(self, event):
+        """關閉視窗時取消背景查詢並釋放唯讀 Session"""
+        self._loader.shutdown()
+        self._reader.close()
+        super().closeEvent(event)
+    
     def _init_ui(self):
         """初始化 UI"""
         main_layout = QVBoxLayout(self)
@@ -64,10 +91,6 @@ class TrainingRecordWindow(QDialog):
         # 表單區域
         form_group = self._create_form_group()
         main_layout.addWidget(form_group)
-        
-        # 分頁控制
-        pagination_group = self._create_pagination_group()
-        main_layout.addWidget(pagination_group)
     
     def _create_search_group(self) -> QGroupBox:
         """建立搜尋區域"""
@@ -161,7 +184,7 @@ class TrainingRecordWindow(QDialog):
         toolbar = QHBoxLayout()
         
         self.btn_refresh = QPushButton("🔄 刷新")
-        self.btn_refresh.clicked.connect(self._load_data)
+        self.btn_refresh.clicked.connect(lambda: self._load_data())
         toolbar.addWidget(self.btn_refresh)
         
         self.btn_export = QPushButton("📊 匯出 Excel")
@@ -180,18 +203,25 @@ class TrainingRecordWindow(QDialog):
         alert_label.setStyleSheet("color: #666; font-style: italic;")
         layout.addWidget(alert_label)
         
-        # 資料表格
-        self.table_model = QStandardItemModel()
-        self.table_model.setHorizontalHeaderLabels([
-            "證照編號", "員工編號", "員工姓名", "證照ID", "證照名稱",
-            "核發日期", "證照類型", "更新日期", "狀態"
-        ])
+        # 資料表格：捲動到底時才載入下一段，點選欄位標題由資料庫排序
+        self.table_model = RepositoryTableModel(
+            self._reader, TrainingRecordRepository, self.LIST_COLUMNS,
+            order_by=self.ORDER_BY, block_size=self.BLOCK_SIZE,
+            extra_fields=["Expiry_Date"], row_background=self._row_background,
+            loader=self._loader, parent=self
+        )
+        self.table_model.rowsInserted.connect(self._update_status)
+        self.table_model.totalChanged.connect(self._update_status)
+        self.table_model.loadFailed.connect(
+            lambda message: QMessageBox.critical(self, "錯誤", f"載入資料失敗:\n{message}"))
         
         self.table_view = QTableView()
         self.table_view.setModel(self.table_model)
         self.table_view.setSelectionBehavior(QTableView.SelectRows)
         self.table_view.setSelectionMode(QTableView.SingleSelection)
         self.table_view.setAlternatingRowColors(True)
+        self.table_view.horizontalHeader().setSortIndicator(0, Qt.AscendingOrder)
+        self.table_view.setSortingEnabled(True)
         self.table_view.doubleClicked.connect(self._on_table_double_click)
         
         layout.addWidget(self.table_view)
@@ -227,6 +257,7 @@ class TrainingRecordWindow(QDialog):
         # 第二行
         self.certify_id = QComboBox()
         self.certify_id.setEditable(True)
+        self.certify_id.currentIndexChanged.connect(self._calculate_expiry_date)
         layout.addRow("證照ID*:", self.certify_id)
         
         # 第三行
@@ -294,247 +325,77 @@ class TrainingRecordWindow(QDialog):
         group.setLayout(layout)
         return group
     
-    def _create_pagination_group(self) -> QGroupBox:
-        """建立分頁控制區域"""
-        group = QGroupBox("分頁控制")
-        layout = QHBoxLayout()
-        
-        self.btn_first = QPushButton("⏮ 第一頁")
-        self.btn_first.clicked.connect(lambda: self._goto_page(1))
-        layout.addWidget(self.btn_first)
-        
-        self.btn_prev = QPushButton("◀ 上一頁")
-        self.btn_prev.clicked.connect(self._goto_prev_page)
-        layout.addWidget(self.btn_prev)
-        
-        self.lbl_page = QLabel("第 1 頁 / 共 1 頁")
-        layout.addWidget(self.lbl_page)
-        
-        self.btn_next = QPushButton("下一頁 ▶")
-        self.btn_next.clicked.connect(self._goto_next_page)
-        layout.addWidget(self.btn_next)
-        
-        self.btn_last = QPushButton("最末頁 ⏭")
-        self.btn_last.clicked.connect(self._goto_last_page)
-        layout.addWidget(self.btn_last)
-        
-        layout.addStretch()
-        
-        # 跳轉到指定頁
-        layout.addWidget(QLabel("跳轉到:"))
-        self.page_input = QLineEdit()
-        self.page_input.setMaximumWidth(50)
-        self.page_input.returnPressed.connect(self._goto_input_page)
-        layout.addWidget(self.page_input)
-        
-        group.setLayout(layout)
-        return group
-    
     def _load_comboboxes(self):
-        """載入下拉選單選項"""
-        try:
-            with UnitOfWork() as uow:
-                # 員工列表
-                basic_repo = BasicRepository(uow.session)
-                employees = basic_repo.get_active_employees(limit=200)  # 只載入前 200 位，避免太多
-                
-                self.emp_id.clear()
-                for emp in employees:
-                    self.emp_id.addItem(f"{emp.EMP_ID} - {emp.C_Name}", emp.EMP_ID)
-                
-                # 證照項目
-                item_repo = CertifyItemRepository(uow.session)
-                items = item_repo.list(limit=100)  # 只載入前 100 個
-                
-                self.certify_id.clear()
-                for item in items:
-                    self.certify_id.addItem(f"{item.Certify_ID} - {item.Certify_Name}", item.Certify_ID)
-                
-        except Exception as e:
-            print(f"載入下拉選單失敗: {e}")
+        """載入下拉選單選項（背景查詢）"""
+        def query(session):
+            # 員工只載入前 200 位、證照項目前 100 個，避免太多
+            employees = BasicRepository(session).get_active_employees(limit=200)
+            items = CertifyItemRepository(session).list(limit=100)
+            return (
+                [(f"{emp.EMP_ID} - {emp.C_Name}", emp.EMP_ID) for emp in employees],
+                [(f"{item.Certify_ID} - {item.Certify_Name}", item.Certify_ID) for item in items],
+            )
+        
+        def apply(options):
+            employees, items = options
+            self.emp_id.clear()
+            for label, value in employees:
+                self.emp_id.addItem(label, value)
+            self.certify_id.clear()
+            for label, value in items:
+                self.certify_id.addItem(label, value)
+        
+        self._loader.submit("comboboxes", query, apply,
+                            lambda message: logger.warning("載入下拉選單失敗: %s", message))
     
-    def _load_data(self):
-        """載入資料（分頁）"""
-        try:
-            with UnitOfWork() as uow:
-                repo = TrainingRecordRepository(uow.session)
-                
-                # 計算總筆數
-                self.total_records = repo.count(filters=self.search_filters)
-                
-                # 計算總頁數
-                total_pages = (self.total_records + self.PAGE_SIZE - 1) // self.PAGE_SIZE
-                if total_pages == 0:
-                    total_pages = 1
-                
-                # 校正頁碼
-                if self.current_page > total_pages:
-                    self.current_page = total_pages
-                if self.current_page < 1:
-                    self.current_page = 1
-                
-                # 計算偏移量
-                offset = (self.current_page - 1) * self.PAGE_SIZE
-                
-                # 查詢資料
-                records = repo.list(
-                    filters=self.search_filters,
-                    limit=self.PAGE_SIZE,
-                    offset=offset
-                )
-                
-                # 更新表格
-                self._update_table(records)
-                
-                # 更新分頁資訊
-                self._update_pagination_info()
-                
-                # 更新狀態列
-                self.lbl_status.setText(f"顯示 {len(records)} / {self.total_records} 筆資料")
-                
-                # 檢查到期證照
-                self._check_expiring_certifications()
-                
-        except Exception as e:
-            QMessageBox.critical(self, "錯誤", f"載入資料失敗:\n{str(e)}")
+    def _load_data(self, delay_ms: int = 0):
+        """
+        重新載入列表（只取第一段，其餘捲動時再載入）
+        
+        Args:
+            delay_ms: 防彈跳時間（搜尋條件輸入中時使用）
+        """
+        self.table_model.set_filters(self.search_filters, delay_ms=delay_ms)
+        self._update_status()
+        
+        # 檢查到期證照
+        self._check_expiring_certifications(delay_ms)
     
-    def _update_table(self, records: List[TrainingRecord]):
-        """更新表格資料"""
-        self.table_model.removeRows(0, self.table_model.rowCount())
-        
-        # 取得員工和證照資訊以供顯示
-        emp_names = {}
-        certify_names = {}
-        
-        try:
-            with UnitOfWork() as uow:
-                # 取得員工姓名
-                basic_repo = BasicRepository(uow.session)
-                for record in records[:50]:  # 只查詢前 50 個員工，避免太多查詢
-                    emp = basic_repo.get_by_pk(record.EMP_ID)
-                    if emp:
-                        emp_names[record.EMP_ID] = emp.C_Name
-                
-                # 取得證照名稱
-                item_repo = CertifyItemRepository(uow.session)
-                for record in records[:50]:
-                    # 使用 get() 方法根據 Certify_ID 查詢（因為 Certify_ID 在實務上應該是唯一）
-                    item = item_repo.get(Certify_ID=record.Certify_ID)
-                    if item:
-                        certify_names[record.Certify_ID] = item.Certify_Name
-        except:
-            pass
-        
-        expiring_count = 0
-        
-        for row, record in enumerate(records):
-            self.table_model.insertRow(row)
-            
-            # 證照編號
-            self.table_model.setItem(row, 0, QStandardItem(str(record.Certify_No)))
-            
-            # 員工編號
-            self.table_model.setItem(row, 1, QStandardItem(record.EMP_ID or ""))
-            
-            # 員工姓名
-            emp_name = emp_names.get(record.EMP_ID, "")
-            self.table_model.setItem(row, 2, QStandardItem(emp_name))
-            
-            # 證照ID
-            self.table_model.setItem(row, 3, QStandardItem(record.Certify_ID or ""))
-            
-            # 證照名稱
-            certify_name = certify_names.get(record.Certify_ID, "")
-            self.table_model.setItem(row, 4, QStandardItem(certify_name))
-            
-            # 核發日期
-            self.table_model.setItem(row, 5, QStandardItem(record.Certify_date or ""))
-            
-            # 證照類型
-            self.table_model.setItem(row, 6, QStandardItem(record.Certify_type or ""))
-            
-            # 更新日期
-            self.table_model.setItem(row, 7, QStandardItem(record.update_date or ""))
-            
-            # 狀態
-            status = "有效" if record.Active else "過期"
-            self.table_model.setItem(row, 8, QStandardItem(status))
-            
-            # 檢查是否到期（簡化版，假設證照效期為1年）
-            is_expiring = False
-            is_expired = False
-            
-            if record.Certify_date:
-                try:
-                    cert_date = datetime.strptime(record.Certify_date, "%Y-%m-%d")
-                    expiry_date = cert_date + timedelta(days=365)
-                    today = datetime.now()
-                    days_until_expiry = (expiry_date - today).days
-                    
-                    if days_until_expiry <= 0:
-                        is_expired = True
-                        # 設定背景色為黃色（已過期）
-                        for col in range(self.table_model.columnCount()):
-                            item = self.table_model.item(row, col)
-                            if item:
-                                item.setBackground(QColor("#fff3cd"))
-                    elif days_until_expiry <= self._expiring_days:
-                        is_expiring = True
-                        expiring_count += 1
-                        # 設定背景色為紅色（即將到期）
-                        for col in range(self.table_model.columnCount()):
-                            item = self.table_model.item(row, col)
-                            if item:
-                                item.setBackground(QColor("#f8d7da"))
-                except:
-                    pass
-        
-        # 更新到期證照計數
-        self.lbl_expiring_count.setText(str(expiring_count))
+    def _update_status(self, *args):
+        """更新狀態列（總筆數於背景查詢，完成前只顯示已載入筆數）"""
+        total = self.table_model.total
+        if total is None:
+            self.lbl_status.setText(f"顯示 {self.table_model.rowCount()} 筆資料（載入中…）")
+        else:
+            self.lbl_status.setText(f"顯示 {self.table_model.rowCount()} / {total} 筆資料")
     
-    def _update_pagination_info(self):
-        """更新分頁資訊"""
-        total_pages = (self.total_records + self.PAGE_SIZE - 1) // self.PAGE_SIZE
-        if total_pages == 0:
-            total_pages = 1
-        
-        self.lbl_page.setText(f"第 {self.current_page} 頁 / 共 {total_pages} 頁")
-        
-        self.btn_first.setEnabled(self.current_page > 1)
-        self.btn_prev.setEnabled(self.current_page > 1)
-        self.btn_next.setEnabled(self.current_page < total_pages)
-        self.btn_last.setEnabled(self.current_page < total_pages)
-        
-        self.page_input.setText(str(self.current_page))
+    def _row_background(self, record) -> Optional[QColor]:
+        """依到期日上色（到期日由證照項目效期計算，YYYY-MM-DD）"""
+        if not record.Expiry_Date:
+            return None
+        try:
+            days_until_expiry = (date.fromisoformat(record.Expiry_Date) - date.today()).days
+        except ValueError:
+            return None
+        if days_until_expiry <= 0:
+            # 黃色（已過期）
+            return QColor("#fff3cd")
+        if days_until_expiry <= self._expiring_days:
+            # 紅色（即將到期）
+            return QColor("#f8d7da")
+        return None
     
-    def _check_expiring_certifications(self):
+    def _check_expiring_certifications(self, delay_ms: int = 0):
         """檢查到期證照（背景執行）"""
-        try:
-            with UnitOfWork() as uow:
-                repo = TrainingRecordRepository(uow.session)
-                
-                # 取得所有有效證照
-                records = repo.list(filters={"Active": True})
-                
-                expiring_count = 0
-                
-                for record in records:
-                    if record.Certify_date:
-                        try:
-                            cert_date = datetime.strptime(record.Certify_date, "%Y-%m-%d")
-                            expiry_date = cert_date + timedelta(days=365)
-                            today = datetime.now()
-                            days_until_expiry = (expiry_date - today).days
-                            
-                            if 0 < days_until_expiry <= self._expiring_days:
-                                expiring_count += 1
-                        except:
-                            pass
-                
-                self.lbl_expiring_count.setText(str(expiring_count))
-                
-        except Exception as e:
-            print(f"檢查到期證照失敗: {e}")
+        days = self._expiring_days
+        # 到期日索引範圍查詢，只取筆數
+        self._loader.submit(
+            "expiring",
+            lambda session: TrainingRecordRepository(session).count_expiring(days),
+            lambda count: self.lbl_expiring_count.setText(str(count)),
+            lambda message: logger.warning("檢查到期證照失敗: %s", message),
+            delay_ms=delay_ms
+        )
     
     def _show_expiring_only(self):
         """僅顯示到期證照"""
@@ -545,24 +406,36 @@ class TrainingRecordWindow(QDialog):
         try:
             days = int(self.alert_days.text())
             self._expiring_days = days
-            self._load_data()
+            self._load_data(AsyncLoader.DEBOUNCE_MS)
         except:
             pass
     
     def _calculate_expiry_date(self):
-        """計算到期日（簡化版）"""
+        """計算到期日：核發日期 + 證照項目效期（與資料庫觸發器存入 Expiry_Date 的規則相同）"""
+        certify_id = self.certify_id.currentData() or self.certify_id.currentText().strip()
         certify_date = self.certify_date.date().toPython()
-        if certify_date:
-            expiry_date = certify_date + timedelta(days=365)
-            today = datetime.now().date()
-            days_until_expiry = (expiry_date - today).days
-            
-            if days_until_expiry <= 0:
-                self.expiry_alert.setText(f"已過期 {abs(days_until_expiry)} 天")
-            elif days_until_expiry <= self._expiring_days:
-                self.expiry_alert.setText(f"{days_until_expiry} 天後到期 ⚠️")
-            else:
-                self.expiry_alert.setText(f"{days_until_expiry} 天後到期")
+        if not certify_id or not certify_date:
+            self.expiry_alert.clear()
+            return
+        try:
+            with self._reader as session:
+                valid_days = CertifyItemRepository(session).valid_days(certify_id)
+        except Exception as e:
+            logger.warning("查詢證照效期失敗: %s", e)
+            self.expiry_alert.clear()
+            return
+        if valid_days is None:
+            self.expiry_alert.setText("不會到期")
+            return
+        expiry_date = certify_date + timedelta(days=valid_days)
+        days_until_expiry = (expiry_date - datetime.now().date()).days
+        
+        if days_until_expiry <= 0:
+            self.expiry_alert.setText(f"已過期 {abs(days_until_expiry)} 天")
+        elif days_until_expiry <= self._expiring_days:
+            self.expiry_alert.setText(f"{days_until_expiry} 天後到期 ⚠️")
+        else:
+            self.expiry_alert.setText(f"{days_until_expiry} 天後到期")
     
     def _on_search_changed(self):
         """搜尋條件變更"""
@@ -579,8 +452,8 @@ class TrainingRecordWindow(QDialog):
         elif self.search_active.currentText() == "過期":
             self.search_filters["Active"] = False
         
-        self.current_page = 1
-        self._load_data()
+        # 輸入中不查詢，停止輸入後才送出（前一次查詢會被取消）
+        self._load_data(AsyncLoader.DEBOUNCE_MS)
     
     def _clear_search(self):
         """清除搜尋"""
@@ -592,53 +465,18 @@ class TrainingRecordWindow(QDialog):
         self.search_date_to.clear()
         
         self.search_filters = {}
-        self.current_page = 1
-        self._load_data()
-    
-    def _goto_page(self, page: int):
-        """跳轉到指定頁碼"""
-        total_pages = (self.total_records + self.PAGE_SIZE - 1) // self.PAGE_SIZE
-        
-        if page < 1:
-            page = 1
-        if page > total_pages:
-            page = total_pages
-        
-        self.current_page = page
         self._load_data()
     
-    def _goto_prev_page(self):
-        """上一頁"""
-        self._goto_page(self.current_page - 1)
-    
-    def _goto_next_page(self):
-        """下一頁"""
-        self._goto_page(self.current_page + 1)
-    
-    def _goto_last_page(self):
-        """最末頁"""
-        total_pages = (self.total_records + self.PAGE_SIZE - 1) // self.PAGE_SIZE
-        self._goto_page(total_pages)
-    
-    def _goto_input_page(self):
-        """跳轉到輸入的頁碼"""
-        try:
-            page = int(self.page_input.text())
-            self._goto_page(page)
-        except:
-            pass
-    
     def _on_table_double_click(self, index):
         """表格雙擊"""
-        certify_no = self.table_model.item(index.row(), 0).text()
-        if certify_no:
-            self._load_record(int(certify_no))
+        record = self.table_model.row(index.row())
+        self._load_record(record.Certify_No)
     
     def _load_record(self, certify_no: int):
         """載入證照記錄"""
         try:
-            with UnitOfWork() as uow:
-                repo = TrainingRecordRepository(uow.session)
+            with self._reader as session:
+                repo = TrainingRecordRepository(session)
                 record = repo.get_by_pk(certify_no)
                 
                 if record:
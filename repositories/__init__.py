@@ -4,7 +4,8 @@ Repository 層
 """
 
 # Base Repository
-from .base import BaseRepository, BaseRepositorySQLAlchemy, RepositoryError
+from .base import BaseRepository, BaseRepositorySQLAlchemy, RepositoryError, KeysetPage
+from .loading import LOAD_STRATEGIES, set_strict_loading
 
 # Employee Repository
 from .employee import BasicRepository, PersonInfoRepository
@@ -15,6 +16,7 @@ from .lookup import (
     VacTypeRepository, ShiftRepository, ShopRepository,
     LookupService
 )
+from .lookup_cache import LookupCache, LookupTable, lookup_cache
 
 # Certification Repository
 from .certification import (
@@ -30,11 +32,17 @@ from .authority import (
     AuthorizationService
 )
 
+# 全域搜尋
+from .search import SearchHit, global_search
+
 __all__ = [
     # Base
     "BaseRepository",
     "BaseRepositorySQLAlchemy",
     "RepositoryError",
+    "KeysetPage",
+    "LOAD_STRATEGIES",
+    "set_strict_loading",
     
     # Employee
     "BasicRepository",
@@ -48,6 +56,9 @@ __all__ = [
     "ShiftRepository",
     "ShopRepository",
     "LookupService",
+    "LookupCache",
+    "LookupTable",
+    "lookup_cache",
     
     # Certification
     "CertifyRepository",
@@ -62,4 +73,8 @@ __all__ = [
     "AuthorityRepository",
     "DelAuthorityRepository",
     "AuthorizationService",
+    
+    # Search
+    "SearchHit",
+    "global_search",
 ]
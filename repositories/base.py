@@ -3,24 +3,110 @@ Repository 基礎類別
 實作通用的 CRUD 操作
 """
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional, TypeVar, Generic
+from dataclasses import dataclass, field
+from collections import namedtuple
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Callable, List, Dict, Any, Optional, Sequence, Tuple, TypeVar, Generic
 from sqlalchemy.orm import Session
-from sqlalchemy import inspect
+from sqlalchemy import inspect, and_, or_, tuple_, func, select, literal, literal_column
+from sqlalchemy import update as sa_update, delete as sa_delete
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy import table as sa_table, column as sa_column
+import base64
+import json
+import threading
+from domain.models.fulltext import FULLTEXT_INDEXES, MIN_TERM_LENGTH, has_fulltext
+from .loading import load_options
+from .versioning import mark_changed, table_version
 
 T = TypeVar('T')
 
+# 分頁總筆數快取：(資料表, 篩選條件簽章) → (資料表版本, 總筆數)
+_TOTAL_CACHE_MAX = 256
+_total_cache: Dict[Tuple[str, Tuple], Tuple[int, int]] = {}
+_total_cache_lock = threading.Lock()
+
+
+@dataclass
+class KeysetPage(Generic[T]):
+    """
+    Keyset 分頁結果
+    next_cursor / prev_cursor 為不透明字串，直接傳回 list_after() 即可取得下一頁/上一頁；
+    None 表示該方向已無資料
+    """
+    items: List[T] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+def _encode_value(value: Any) -> Any:
+    # JSON 無日期型別：加上標記以便還原
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"$d": value.isoformat()}
+    return value
+
+
+@lru_cache(maxsize=256)
+def _record_type(table_name: str, columns: Tuple[str, ...]):
+    """投影查詢的唯讀資料列型別（named tuple，無 ORM 狀態）"""
+    return namedtuple(f"{table_name}Row", columns, rename=True)
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "$dt" in value:
+            return datetime.fromisoformat(value["$dt"])
+        if "$d" in value:
+            return date.fromisoformat(value["$d"])
+    return value
+
 class BaseRepository(ABC, Generic[T]):
     """
     Repository 基礎類別
     提供通用的資料庫操作方法
     """
+    # list/get 只指定 load 時的關聯載入策略
+    default_load_strategy = "selectin"
+    # 衍生欄位（投影查詢可與資料表欄位一起指定）：名稱 → 以目前資料表為關聯的 SQL 運算式
+    # 例如員工姓名、證照名稱等關聯表欄位，列表一次查詢即可取得，不必逐筆 get_by_pk
+    derived_columns: Dict[str, Callable[[], Any]] = {}
+    
     def __init__(self, session: Session, model_class: type):
         self.session = session
         self.model_class = model_class
         self.table_name = model_class.__tablename__
     
+    def _column(self, name: str):
+        """
+        取得資料表欄位（Core Column）；用於條件與排序時，投影查詢不會被轉成 ORM 查詢
+        非資料表欄位的屬性則回傳 ORM 屬性
+        """
+        table = self.model_class.__table__
+        return table.c[name] if name in table.c else getattr(self.model_class, name)
+    
+    def _apply_filters(self, query, filters: Optional[Dict[str, Any]]):
+        """套用等值篩選條件（不存在的欄位或 None 值略過）"""
+        if filters:
+            for column, value in filters.items():
+                if hasattr(self.model_class, column) and value is not None:
+                    query = query.filter(self._column(column) == value)
+        return query
+    
+    def _load_options(self, load: Optional[Sequence[str]], strategy: Optional[str]) -> List[Any]:
+        """關聯載入選項；load 與 strategy 皆未指定時不加選項（沿用關聯預設或嚴格模式）"""
+        if load is None and strategy is None:
+            return []
+        try:
+            return load_options(self.model_class, load, strategy or self.default_load_strategy)
+        except ValueError as e:
+            raise RepositoryError(str(e)) from e
+    
     def list(self, filters: Optional[Dict[str, Any]] = None, 
-             limit: Optional[int] = None, offset: int = 0) -> List[T]:
+             limit: Optional[int] = None, offset: int = 0,
+             load: Optional[Sequence[str]] = None, strategy: Optional[str] = None) -> List[T]:
         """
         查詢資料列表
         
@@ -28,16 +114,14 @@ class BaseRepository(ABC, Generic[T]):
             filters: 篩選條件
             limit: 回傳筆數限制
             offset: 起始位置（用於分頁）
+            load: 一併載入的關聯（"a.b" 為巢狀）；只給 strategy 時套用到所有關聯
+            strategy: 載入策略 selectin / joined / raise / select，預設 default_load_strategy
         
         Returns:
             資料列表
         """
-        query = self.session.query(self.model_class)
-        
-        if filters:
-            for column, value in filters.items():
-                if hasattr(self.model_class, column) and value is not None:
-                    query = query.filter(getattr(self.model_class, column) == value)
+        query = self._apply_filters(self.session.query(self.model_class), filters)
+        query = query.options(*self._load_options(load, strategy))
         
         query = query.offset(offset)
         
@@ -46,29 +130,348 @@ class BaseRepository(ABC, Generic[T]):
         
         return query.all()
     
-    def get_by_pk(self, pk: Any) -> Optional[T]:
+    # ---------- Keyset 分頁 ----------
+    def _order_spec(self, order_by: Optional[Sequence[str]]) -> List[Tuple[str, bool]]:
+        """
+        排序規格 [(欄位, 是否遞減)]；欄位名稱前加 "-" 表示遞減
+        一律補上主鍵欄位，確保排序唯一、游標位置明確
+        """
+        spec: List[Tuple[str, bool]] = []
+        for name in order_by or ():
+            desc = name.startswith("-")
+            column = name.lstrip("-")
+            if not hasattr(self.model_class, column):
+                raise RepositoryError(f"{self.table_name} 無排序欄位：{column}")
+            spec.append((column, desc))
+        used = {c for c, _ in spec}
+        for col in inspect(self.model_class).primary_key:
+            if col.key not in used:
+                spec.append((col.key, False))
+        return spec
+
+    def cursor_for(self, obj: Any, order_by: Optional[Sequence[str]] = None, backward: bool = False) -> str:
+        """
+        以某筆資料為邊界建立游標：backward=False 取其後各筆，True 取其前各筆
+        （例如以 page() 取得的頁面接續 keyset 翻頁）
+        """
+        return self._encode_cursor(self._order_spec(order_by), obj, backward)
+    
+    def _encode_cursor(self, spec: List[Tuple[str, bool]], obj: Any, backward: bool) -> str:
+        payload = {
+            "o": [("-" if desc else "") + col for col, desc in spec],
+            "k": [_encode_value(getattr(obj, col)) for col, _ in spec],
+            "b": backward,
+        }
+        raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii")
+
+    def _decode_cursor(self, cursor: str, spec: List[Tuple[str, bool]]) -> Tuple[List[Any], bool]:
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            order, keys, backward = payload["o"], payload["k"], bool(payload["b"])
+        except (ValueError, KeyError, TypeError) as e:
+            raise RepositoryError(f"無效的分頁游標：{e}") from e
+        if order != [("-" if desc else "") + col for col, desc in spec] or len(keys) != len(spec):
+            raise RepositoryError("分頁游標與排序條件不一致")
+        return [_decode_value(k) for k in keys], backward
+
+    def _seek_condition(self, spec: List[Tuple[str, bool]], keys: List[Any], backward: bool):
+        """位於游標之後（backward 時為之前）的條件；排序方向一致時使用 row value 比較以利索引"""
+        cols = [self._column(c) for c, _ in spec]
+        # 實際比較方向：遞增且往後 → 大於
+        greater = [desc == backward for _, desc in spec]
+        if all(greater) or not any(greater):
+            left, right = tuple_(*cols), tuple_(*keys)
+            return left > right if greater[0] else left < right
+        clauses = []
+        for i, col in enumerate(cols):
+            prefix = [cols[j] == keys[j] for j in range(i)]
+            cmp = col > keys[i] if greater[i] else col < keys[i]
+            clauses.append(and_(*prefix, cmp))
+        return or_(*clauses)
+
+    def list_after(self, cursor: Optional[str] = None, order_by: Optional[Sequence[str]] = None,
+                   limit: int = 50, filters: Optional[Dict[str, Any]] = None,
+                   columns: Optional[Sequence[str]] = None) -> KeysetPage[T]:
+        """
+        Keyset（seek）分頁：以上一頁最後一筆的排序鍵定位，不使用 OFFSET，
+        無論翻到第幾頁都只讀取 limit 筆
+        
+        Args:
+            cursor: 前一次結果的 next_cursor / prev_cursor；None 表示第一頁
+            order_by: 排序欄位，"-欄位" 為遞減；會自動補上主鍵。排序欄位不可為 NULL
+            limit: 每頁筆數
+            filters: 篩選條件（同 list）
+            columns: 只取這些欄位（同 select_rows，回傳 named tuple）；None 回傳 ORM 物件
+        
+        Returns:
+            KeysetPage（items、next_cursor、prev_cursor）
+        """
+        spec = self._order_spec(order_by)
+        keys, backward = self._decode_cursor(cursor, spec) if cursor else ([], False)
+        
+        stmt, record = self._select_for(columns, spec)
+        query = self._apply_filters(stmt, filters)
+        if cursor:
+            query = query.filter(self._seek_condition(spec, keys, backward))
+        # 往前翻頁時反向排序取 limit 筆，再反轉回正常順序
+        ordering = []
+        for col, desc in spec:
+            attr = self._column(col)
+            ordering.append(attr.desc() if desc != backward else attr.asc())
+        # 多取一筆判斷是否還有資料
+        rows = self._fetch(query.order_by(*ordering).limit(limit + 1), record)
+        more = len(rows) > limit
+        rows = rows[:limit]
+        if backward:
+            rows.reverse()
+        
+        page: KeysetPage[T] = KeysetPage(items=rows)
+        if rows:
+            has_next = more if not backward else True
+            has_prev = more if backward else cursor is not None
+            if has_next:
+                page.next_cursor = self._encode_cursor(spec, rows[-1], backward=False)
+            if has_prev:
+                page.prev_cursor = self._encode_cursor(spec, rows[0], backward=True)
+        return page
+    
+    def cursor_at(self, offset: int, order_by: Optional[Sequence[str]] = None,
+                  filters: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """
+        跳頁用：回傳可讓 list_after() 從第 offset 筆開始的游標
+        只查詢排序鍵欄位（可走覆蓋索引），不載入前面各筆的完整資料
+        """
+        if offset <= 0:
+            return None
+        spec = self._order_spec(order_by)
+        cols = [self._column(c) for c, _ in spec]
+        query = self._apply_filters(self.session.query(*cols), filters)
+        query = query.order_by(*(c.desc() if desc else c.asc() for c, (_, desc) in zip(cols, spec)))
+        row = query.offset(offset - 1).limit(1).first()
+        if row is None:
+            return None
+        return self._encode_cursor(spec, row, backward=False)
+    
+    def _filter_signature(self, filters: Optional[Dict[str, Any]]) -> Tuple[str, Tuple]:
+        items = tuple(sorted(
+            (k, repr(v)) for k, v in (filters or {}).items()
+            if hasattr(self.model_class, k) and v is not None
+        ))
+        return self.table_name, items
+    
+    def _cache_total(self, key: Tuple[str, Tuple], version: int, total: int):
+        with _total_cache_lock:
+            _total_cache.pop(key, None)
+            _total_cache[key] = (version, total)
+            while len(_total_cache) > _TOTAL_CACHE_MAX:
+                _total_cache.pop(next(iter(_total_cache)))
+    
+    def _cached_total(self, key: Tuple[str, Tuple], version: int) -> Optional[int]:
+        hit = _total_cache.get(key)
+        if hit is not None and hit[0] == version:
+            return hit[1]
+        return None
+    
+    def cached_count(self, filters: Optional[Dict[str, Any]] = None) -> int:
+        """同 count()，但同一篩選條件在資料表未變更前只查詢一次"""
+        key, version = self._filter_signature(filters), table_version(self.table_name)
+        total = self._cached_total(key, version)
+        if total is None:
+            total = self.count(filters)
+            self._cache_total(key, version, total)
+        return total
+    
+    def page(self, filters: Optional[Dict[str, Any]] = None, limit: int = 50, offset: int = 0,
+             order_by: Optional[Sequence[str]] = None, use_cache: bool = True,
+             columns: Optional[Sequence[str]] = None) -> Tuple[List[T], int]:
+        """
+        單一查詢取得一頁資料與總筆數（COUNT(*) OVER ()），不必再另外 count()
+        
+        Args:
+            filters: 篩選條件（同 list）
+            limit: 每頁筆數
+            offset: 起始位置
+            order_by: 排序欄位（同 list_after，會自動補上主鍵）
+            use_cache: 總筆數依篩選條件快取，資料表變更前不再計算
+            columns: 只取這些欄位（同 select_rows，回傳 named tuple）；None 回傳 ORM 物件
+        
+        Returns:
+            (資料列表, 總筆數)
+        """
+        spec = self._order_spec(order_by)
+        ordering = [self._column(c).desc() if desc else self._column(c).asc() for c, desc in spec]
+        key, version = self._filter_signature(filters), table_version(self.table_name)
+        total = self._cached_total(key, version) if use_cache else None
+        
+        if total is not None:
+            stmt, record = self._select_for(columns, spec)
+            query = self._apply_filters(stmt, filters)
+            return self._fetch(query.order_by(*ordering).offset(offset).limit(limit), record), total
+        
+        stmt, record = self._select_for(columns, spec, func.count().over().label("_total"))
+        query = self._apply_filters(stmt, filters)
+        result = self.session.execute(query.order_by(*ordering).offset(offset).limit(limit)).all()
+        if result:
+            if record is None:
+                rows = [r[0] for r in result]
+            else:
+                rows = [record._make(r[:-1]) for r in result]
+            total = int(result[0][-1])
+        else:
+            # 超出範圍時視窗函數沒有列可回傳，改以 count() 取得
+            rows, total = [], self.count(filters)
+        if use_cache:
+            self._cache_total(key, version, total)
+        return rows, total
+    
+    # ---------- 唯讀投影查詢 ----------
+    def _select_for(self, columns: Optional[Sequence[str]], spec: List[Tuple[str, bool]], *extra):
+        """
+        columns 為 None 時查詢 ORM 物件；否則以 Core 只查詢指定欄位（自動補上排序鍵，游標才能定位）
+        回傳 (select 語句, named tuple 型別或 None)
+        """
+        if columns is None:
+            return select(self.model_class, *extra), None
+        names = list(columns) + [c for c, _ in spec if c not in columns]
+        return select(*self._projection(names), *extra), _record_type(self.table_name, tuple(names))
+    
+    def _projection(self, names: Sequence[str]) -> List[Any]:
+        """欄位名稱轉為 select 的欄位（資料表欄位或 derived_columns）"""
+        table = self.model_class.__table__
+        unknown = [n for n in names if n not in table.c and n not in self.derived_columns]
+        if unknown:
+            raise RepositoryError(f"{self.table_name} 無欄位：{unknown}")
+        return [table.c[n] if n in table.c else self.derived_columns[n]().label(n) for n in names]
+    
+    def _fetch(self, stmt, record) -> List[Any]:
+        result = self.session.execute(stmt)
+        if record is None:
+            return list(result.scalars().all())
+        return [record._make(r) for r in result]
+    
+    def select_rows(self, columns: Sequence[str], filters: Optional[Dict[str, Any]] = None,
+                    order_by: Optional[Sequence[str]] = None, limit: Optional[int] = None,
+                    offset: int = 0, as_tuples: bool = False) -> List[Any]:
+        """
+        唯讀投影查詢：以 SQLAlchemy Core 只讀取指定欄位，不建立 ORM 物件、不進 identity map
+        適合列表畫面等只需顯示欄位值的情境
+        
+        Args:
+            columns: 欄位名稱（可含 derived_columns）
+            filters: 篩選條件（同 list）
+            order_by: 排序欄位（"-欄位" 為遞減，會自動補上主鍵）；None 不排序
+            limit: 回傳筆數限制
+            offset: 起始位置
+            as_tuples: True 回傳一般 tuple；預設回傳可用屬性存取的 named tuple
+        
+        Returns:
+            資料列列表
+        """
+        table = self.model_class.__table__
+        stmt = self._apply_filters(select(*self._projection(columns)), filters)
+        if order_by:
+            stmt = stmt.order_by(*(
+                table.c[c].desc() if desc else table.c[c].asc() for c, desc in self._order_spec(order_by)
+            ))
+        if offset:
+            stmt = stmt.offset(offset)
+        if limit:
+            stmt = stmt.limit(limit)
+        result = self.session.execute(stmt)
+        if as_tuples:
+            return [tuple(r) for r in result]
+        record = _record_type(self.table_name, tuple(columns))
+        return [record._make(r) for r in result]
+    
+    # ---------- 全文檢索 ----------
+    def search_text(self, query_text: str, columns: Optional[Sequence[str]] = None,
+                    filters: Optional[Dict[str, Any]] = None, limit: Optional[int] = 100,
+                    with_rank: bool = False) -> List[Any]:
+        """
+        全文檢索（依相關度排序）
+        關鍵字以空白分隔、全部須符合；有 FTS5 索引時以 MATCH + bm25 排序，
+        不足 3 個字元的關鍵字（trigram 無法索引）或無全文索引時改以 LIKE 比對
+        
+        Args:
+            query_text: 關鍵字
+            columns: 限定比對的欄位（預設為全文索引的所有欄位）
+            filters: 等值篩選條件（同 list）
+            limit: 回傳筆數限制
+            with_rank: True 回傳 (物件, 分數) ；分數越小越相關，LIKE 比對時為 0
+        
+        Returns:
+            資料列表
+        """
+        spec = FULLTEXT_INDEXES.get(self.table_name)
+        if spec is None:
+            raise RepositoryError(f"{self.table_name} 未定義全文索引")
+        columns = list(columns or spec.columns)
+        unknown = [c for c in columns if c not in spec.columns]
+        if unknown:
+            raise RepositoryError(f"{spec.name} 無欄位：{unknown}")
+        terms = list(dict.fromkeys((query_text or "").split()))
+        if not terms:
+            return []
+        
+        table = self.model_class.__table__
+        indexed = [t for t in terms if len(t) >= MIN_TERM_LENGTH]
+        if indexed and has_fulltext(self.session.connection(), self.table_name):
+            fts = sa_table(spec.name, sa_column("rowid"), sa_column("rank"))
+            phrases = " ".join('"' + t.replace('"', '""') + '"' for t in indexed)
+            match = "{" + " ".join(columns) + "} : (" + phrases + ")"
+            stmt = (select(self.model_class, fts.c.rank)
+                    .join(fts, fts.c.rowid == literal_column(f'"{table.name}".rowid'))
+                    .where(literal_column(spec.name).op("MATCH")(match))
+                    .order_by(fts.c.rank))
+            rest = [t for t in terms if t not in indexed]
+        else:
+            stmt = select(self.model_class, literal(0.0))
+            rest = terms
+        for term in rest:
+            pattern = "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            stmt = stmt.where(or_(*(table.c[c].like(pattern, escape="\\") for c in columns)))
+        stmt = self._apply_filters(stmt, filters)
+        stmt = stmt.order_by(*(table.c[c] for c, _ in self._order_spec(None)))
+        if limit:
+            stmt = stmt.limit(limit)
+        rows = self.session.execute(stmt).all()
+        if with_rank:
+            return [(obj, rank) for obj, rank in rows]
+        return [obj for obj, _ in rows]
+    
+    def get_by_pk(self, pk: Any, load: Optional[Sequence[str]] = None,
+                  strategy: Optional[str] = None) -> Optional[T]:
         """
         依主鍵查詢單筆資料
         
         Args:
             pk: 主鍵值
+            load: 一併載入的關聯（同 list）
+            strategy: 載入策略（同 list）
         
         Returns:
             資料物件或 None
         """
+        options = self._load_options(load, strategy)
+        if options:
+            return self.session.get(self.model_class, pk, options=options)
         return self.session.query(self.model_class).get(pk)
     
-    def get(self, **kwargs) -> Optional[T]:
+    def get(self, load: Optional[Sequence[str]] = None, strategy: Optional[str] = None,
+            **kwargs) -> Optional[T]:
         """
         依條件查詢單筆資料
         
         Args:
+            load: 一併載入的關聯（同 list）
+            strategy: 載入策略（同 list）
             **kwargs: 查詢條件
         
         Returns:
             資料物件或 None
         """
-        query = self.session.query(self.model_class)
+        query = self.session.query(self.model_class).options(*self._load_options(load, strategy))
         for key, value in kwargs.items():
             if hasattr(self.model_class, key):
                 query = query.filter(getattr(self.model_class, key) == value)
@@ -84,12 +487,7 @@ class BaseRepository(ABC, Generic[T]):
         Returns:
             資料筆數
         """
-        query = self.session.query(self.model_class)
-        
-        if filters:
-            for column, value in filters.items():
-                if hasattr(self.model_class, column) and value is not None:
-                    query = query.filter(getattr(self.model_class, column) == value)
+        query = self._apply_filters(self.session.query(self.model_class), filters)
         
         return query.count()
     
@@ -166,6 +564,94 @@ class BaseRepository(ABC, Generic[T]):
             self.session.flush()
             return new_obj
     
+    def _dialect_insert(self):
+        """取得支援 ON CONFLICT 的 insert()（SQLite / PostgreSQL）"""
+        dialect = self.session.get_bind().dialect.name
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        elif dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            raise RepositoryError(f"upsert_many 不支援資料庫：{dialect}")
+        return insert
+    
+    def upsert_many(self, rows: Sequence[Dict[str, Any]],
+                    conflict_columns: Optional[Sequence[str]] = None,
+                    batch_size: int = 1000) -> Dict[str, int]:
+        """
+        批次新增或更新：每批先 INSERT ... ON CONFLICT DO NOTHING RETURNING 取得新增的鍵，
+        其餘列再以 ON CONFLICT DO UPDATE 更新（SQLAlchemy Core executemany），不載入 ORM 物件
+        
+        Args:
+            rows: 資料列（欄位名稱 → 值）；只更新有提供的欄位
+            conflict_columns: 判斷衝突的唯一鍵欄位，預設為主鍵（例如 CertifyItem 的 (Dept, Certify_ID)）
+            batch_size: 每批筆數
+        
+        Returns:
+            {"inserted": 新增筆數, "updated": 更新筆數}
+        """
+        if not rows:
+            return {"inserted": 0, "updated": 0}
+        table = self.model_class.__table__
+        keys = list(conflict_columns or [c.key for c in inspect(self.model_class).primary_key])
+        unknown = [c for c in keys if c not in table.c]
+        if unknown:
+            raise RepositoryError(f"{self.table_name} 無衝突鍵欄位：{unknown}")
+        insert = self._dialect_insert()
+        
+        # 先送出 session 中尚未寫入的 ORM 異動，避免與 Core 語句順序錯亂
+        self.session.flush()
+        key_columns = [table.c[k] for k in keys]
+        inserted = updated = 0
+        touched = set()
+        # 欄位組合相同的連續列共用一個語句；保持原順序，同一鍵後者覆蓋前者
+        start = 0
+        while start < len(rows):
+            columns = list(rows[start].keys())
+            end = start + 1
+            while end < len(rows) and end - start < batch_size and list(rows[end].keys()) == columns:
+                end += 1
+            bad = [c for c in columns if c not in table.c]
+            if bad:
+                raise RepositoryError(f"{self.table_name} 無欄位：{bad}")
+            batch = [dict(r) for r in rows[start:end]]
+            # 先新增：衝突的列略過，RETURNING 回傳實際新增的鍵
+            stmt = insert(table).on_conflict_do_nothing(index_elements=keys).returning(*key_columns)
+            created = {tuple(r) for r in self.session.execute(stmt, batch)}
+            inserted += len(created)
+            # 其餘（已存在或同批次重複）的列再以 ON CONFLICT DO UPDATE 套用提供的欄位
+            rest = []
+            for r in batch:
+                ident = tuple(r.get(k) for k in keys)
+                touched.add(ident)
+                if ident in created:
+                    created.discard(ident)
+                elif None not in ident:
+                    rest.append(r)
+            stmt = insert(table)
+            updates = {c: stmt.excluded[c] for c in columns if c not in keys}
+            if rest and updates:
+                stmt = stmt.on_conflict_do_update(index_elements=keys, set_=updates)
+                result = self.session.execute(stmt, rest)
+                updated += result.rowcount if result.rowcount is not None and result.rowcount >= 0 else len(rest)
+            start = end
+        mark_changed(self.session, self.table_name)
+        self._expire_keys(keys, touched)
+        return {"inserted": inserted, "updated": updated}
+    
+    def _expire_keys(self, keys: Sequence[str], idents: set):
+        """只讓 identity map 中受影響鍵值的物件於下次存取時重新載入"""
+        primary_key = [c.key for c in inspect(self.model_class).primary_key]
+        if list(keys) == primary_key:
+            for ident in idents:
+                obj = self.session.identity_map.get(self.session.identity_key(self.model_class, ident))
+                if obj is not None:
+                    self.session.expire(obj)
+            return
+        for obj in list(self.session.identity_map.values()):
+            if isinstance(obj, self.model_class) and tuple(obj.__dict__.get(k) for k in keys) in idents:
+                self.session.expire(obj)
+    
     def delete(self, pk: Any) -> bool:
         """
         刪除資料
@@ -183,6 +669,84 @@ class BaseRepository(ABC, Generic[T]):
             return True
         return False
     
+    # ---------- 集合式更新/刪除 ----------
+    def _where_conditions(self, filters: Dict[str, Any]) -> List[Any]:
+        """
+        批次語句的條件：值為 list/tuple/set 時為 IN，None 為 IS NULL
+        與 list() 不同，不存在的欄位直接報錯，且必須有條件（避免誤改整張表）
+        """
+        if not filters:
+            raise RepositoryError(f"{self.table_name} 批次更新/刪除需指定篩選條件")
+        table = self.model_class.__table__
+        unknown = [c for c in filters if c not in table.c]
+        if unknown:
+            raise RepositoryError(f"{self.table_name} 無欄位：{unknown}")
+        conditions = []
+        for name, value in filters.items():
+            attr = getattr(self.model_class, name)
+            if value is None:
+                conditions.append(attr.is_(None))
+            elif isinstance(value, (list, tuple, set, frozenset)):
+                conditions.append(attr.in_(list(value)))
+            else:
+                conditions.append(attr == value)
+        return conditions
+    
+    def update_where(self, filters: Dict[str, Any], values: Dict[str, Any]) -> int:
+        """
+        以單一 UPDATE 語句更新所有符合條件的資料
+        session 中已載入的物件同步為新值（資料庫端計算的欄位標記過期，下次存取重新讀取）
+        
+        Args:
+            filters: 等值條件（list/tuple/set 為 IN，None 為 IS NULL）
+            values: 要更新的欄位與值
+        
+        Returns:
+            更新筆數
+        """
+        conditions = self._where_conditions(filters)
+        table = self.model_class.__table__
+        unknown = [c for c in values if c not in table.c]
+        if unknown or not values:
+            raise RepositoryError(f"{self.table_name} 更新欄位無效：{unknown or values}")
+        # 先套用欄位型別的轉換（例如 IsoDate），identity map 中同步的值才會與資料庫一致
+        dialect = self.session.get_bind().dialect
+        bound = {}
+        for name, value in values.items():
+            col_type = table.c[name].type
+            bound[name] = col_type.process_bind_param(value, dialect) if isinstance(col_type, TypeDecorator) else value
+        
+        self.session.flush()
+        stmt = (sa_update(self.model_class).where(*conditions).values(**bound)
+                .execution_options(synchronize_session="fetch"))
+        count = self.session.execute(stmt).rowcount
+        if count:
+            mark_changed(self.session, self.table_name)
+            server_side = [c.key for c in table.columns if c.server_onupdate is not None]
+            if server_side:
+                for obj in list(self.session.identity_map.values()):
+                    if isinstance(obj, self.model_class):
+                        self.session.expire(obj, server_side)
+        return count
+    
+    def delete_where(self, filters: Dict[str, Any]) -> int:
+        """
+        以單一 DELETE 語句刪除所有符合條件的資料，session 中對應的物件一併移除
+        
+        Args:
+            filters: 等值條件（list/tuple/set 為 IN，None 為 IS NULL）
+        
+        Returns:
+            刪除筆數
+        """
+        conditions = self._where_conditions(filters)
+        self.session.flush()
+        stmt = sa_delete(self.model_class).where(*conditions).execution_options(synchronize_session="fetch")
+        count = self.session.execute(stmt).rowcount
+        if count:
+            mark_changed(self.session, self.table_name)
+        return count
+    
     def list_distinct(self, column: str) -> List[Any]:
         """
         查詢某欄位的不重複值
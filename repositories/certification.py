@@ -1,10 +1,11 @@
 """
 證照相關 Repository
 """
+from datetime import date, timedelta
 from typing import List, Optional, Dict, Any
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from domain.models import Certify, CertifyType, CertifyItem, TrainingRecord, CertifyRecord, CertifyToolMap
+from sqlalchemy import and_, func, select
+from domain.models import Basic, Certify, CertifyType, CertifyItem, TrainingRecord, CertifyRecord, CertifyToolMap
 from .base import BaseRepositorySQLAlchemy
 
 class CertifyRepository(BaseRepositorySQLAlchemy[Certify]):
@@ -36,6 +37,10 @@ class CertifyItemRepository(BaseRepositorySQLAlchemy[CertifyItem]):
         """依類型查詢證照項目"""
         return self.list(filters={"Certify_Type": certify_type})
     
+    def search(self, keyword: str, dept_code: Optional[str] = None, limit: int = 100) -> List[CertifyItem]:
+        """依證照代碼、名稱、備註全文檢索（依相關度排序）"""
+        return self.search_text(keyword, filters={"Dept": dept_code}, limit=limit)
+    
     def delete(self, pk: tuple) -> bool:
         """
         刪除證照項目（支援複合主鍵）
@@ -46,11 +51,20 @@ class CertifyItemRepository(BaseRepositorySQLAlchemy[CertifyItem]):
         Returns:
             是否成功刪除
         """
-        obj = self.get_by_pk(pk)
-        if obj:
-            self.session.delete(obj)
-            return True
-        return False
+        dept, certify_id = pk
+        return self.delete_where({"Dept": dept, "Certify_ID": certify_id}) > 0
+    
+    def retire(self, certify_id: str) -> int:
+        """停用證照項目（所有部門），回傳筆數"""
+        return self.update_where({"Certify_ID": certify_id, "Active": True}, {"Active": False})
+    
+    def valid_days(self, certify_id: str) -> Optional[int]:
+        """
+        證照效期（天），與到期日觸發器相同：同一 Certify_ID 在多個部門時取最短效期，
+        全部為 0 或 NULL（或查無項目）時回傳 None，表示不會到期
+        """
+        stmt = select(func.min(func.nullif(CertifyItem.Valid_Days, 0))).where(CertifyItem.Certify_ID == certify_id)
+        return self.session.execute(stmt).scalar()
 
 class TrainingRecordRepository(BaseRepositorySQLAlchemy[TrainingRecord]):
     """
@@ -58,6 +72,15 @@ class TrainingRecordRepository(BaseRepositorySQLAlchemy[TrainingRecord]):
     處理員工證照記錄
     """
     model_class = TrainingRecord
+    # 列表顯示用的關聯名稱（相關子查詢：BASIC 走主鍵、CERTIFY_ITEMS 走 ix_certify_items_certify_id，
+    # 只對回傳的列計算；同一證照 ID 在多個部門時取名稱最小者，結果固定）
+    derived_columns = {
+        "C_Name": lambda: (select(Basic.C_Name).where(Basic.EMP_ID == TrainingRecord.EMP_ID)
+                           .scalar_subquery()),
+        "Certify_Name": lambda: (select(func.min(CertifyItem.Certify_Name))
+                                 .where(CertifyItem.Certify_ID == TrainingRecord.Certify_ID)
+                                 .scalar_subquery()),
+    }
     
     def __init__(self, session: Session):
         super().__init__(session)
@@ -83,20 +106,49 @@ class TrainingRecordRepository(BaseRepositorySQLAlchemy[TrainingRecord]):
         """依證照項目查詢記錄"""
         return self.list(filters={"Certify_ID": certify_id})
     
-    def get_expiring_records(self, days: int = 30) -> List[TrainingRecord]:
+    def deactivate_by_employee(self, emp_id: str) -> int:
+        """停用員工的所有有效證照記錄，回傳筆數"""
+        return self.update_where({"EMP_ID": emp_id, "Active": True}, {"Active": False})
+    
+    def search_remark(self, keyword: str, emp_id: Optional[str] = None, limit: int = 100) -> List[TrainingRecord]:
+        """依備註全文檢索（依相關度排序）"""
+        return self.search_text(keyword, filters={"EMP_ID": emp_id}, limit=limit)
+    
+    def _expiring_query(self, days: int, today: Optional[date], include_expired: bool):
+        """有效記錄依到期日範圍查詢（走 ix_training_record_active_expiry 部分索引）"""
+        today = today or date.today()
+        query = self.session.query(TrainingRecord).filter(
+            TrainingRecord.Active == True,
+            TrainingRecord.Expiry_Date <= today + timedelta(days=days),
+        )
+        if not include_expired:
+            query = query.filter(TrainingRecord.Expiry_Date > today)
+        return query
+    
+    def get_expiring_records(self, days: int = 30, include_expired: bool = False,
+                             today: Optional[date] = None, limit: Optional[int] = None) -> List[TrainingRecord]:
         """
         取得即將到期的證照記錄
         
         Args:
             days: 未來 N 天內到期
+            include_expired: 是否包含已過期的有效記錄
+            today: 基準日（預設今天）
+            limit: 回傳筆數限制
         
         Returns:
-            即將到期的證照記錄列表
+            即將到期的證照記錄列表（依到期日排序）
         """
-        # Note: 這需要實作日期計算
-        # 因為 Certify_date 是字串格式，需要特別處理
-        # 這裡先回傳空列表，實作時需要根據日期格式處理
-        return []
+        query = self._expiring_query(days, today, include_expired).order_by(
+            TrainingRecord.Expiry_Date, TrainingRecord.Certify_No
+        )
+        if limit:
+            query = query.limit(limit)
+        return query.all()
+    
+    def count_expiring(self, days: int = 30, include_expired: bool = False, today: Optional[date] = None) -> int:
+        """計算即將到期的證照記錄數"""
+        return self._expiring_query(days, today, include_expired).count()
     
     def count_by_employee(self, emp_id: str) -> int:
         """計算員工的證照數量"""
@@ -167,24 +219,32 @@ class CertificationService:
     def get_certification_details(self, certify_id: str) -> Dict[str, Any]:
         """
         取得證照項目的詳細資訊
+        證照項目、記錄（含員工）、工具以關聯預先載入，查詢次數固定（4 次），與記錄筆數無關
         
         Args:
             certify_id: 證照項目 ID
         
         Returns:
-            包含證照項目、記錄、工具的字典
+            包含證照項目（各部門）、記錄、工具的字典
         """
-        # 取得證照項目
-        certify_item = self.certify_item_repo.get_by_pk(certify_id)
-        
-        # 取得相關記錄
-        records = self.training_record_repo.get_by_certify_item(certify_id)
-        
-        # 取得相關工具
-        tool_maps = self.certify_tool_map_repo.get_by_certify(certify_id)
+        items = self.certify_item_repo.list(
+            filters={"Certify_ID": certify_id},
+            load=["training_records.employee", "tool_maps"], strategy="selectin"
+        )
+        if items:
+            # 同一 Certify_ID 的各部門項目共用記錄與工具
+            certify_item = items[0]
+            records, tool_maps = certify_item.training_records, certify_item.tool_maps
+        else:
+            # 項目已刪除時仍列出殘留的記錄與工具
+            certify_item = None
+            records = self.training_record_repo.list(filters={"Certify_ID": certify_id}, load=["employee"],
+                                                     strategy="joined")
+            tool_maps = self.certify_tool_map_repo.get_by_certify(certify_id)
         
         return {
             "certify_item": certify_item,
+            "certify_items": items,
             "records": records,
             "tool_maps": tool_maps,
             "statistics": {
@@ -17,25 +17,24 @@ class BasicRepository(BaseRepositorySQLAlchemy[Basic]):
     
     def search_by_name(self, name: str, only_active: bool = True, limit: int = 100) -> List[Basic]:
         """
-        依姓名模糊搜尋
+        依姓名搜尋（有全文索引時依相關度排序）
         
         Args:
-            name: 姓名關鍵字
+            name: 姓名關鍵字（空白分隔多個關鍵字時須全部符合）
             only_active: 是否只搜尋在職員工
             limit: 回傳筆數限制
         
         Returns:
             員工列表
         """
-        query = self.session.query(Basic)
-        
-        if only_active:
-            query = query.filter(Basic.Active == True)
-        
-        if name:
-            query = query.filter(Basic.C_Name.like(f"%{name}%"))
-        
-        return query.limit(limit).all()
+        filters = {"Active": True} if only_active else None
+        if not name or not name.strip():
+            return self.list(filters=filters, limit=limit)
+        return self.search_text(name, columns=["C_Name"], filters=filters, limit=limit)
+    
+    def search(self, keyword: str, only_active: bool = True, limit: int = 100) -> List[Basic]:
+        """依員工編號、姓名、備註全文檢索（依相關度排序）"""
+        return self.search_text(keyword, filters={"Active": True} if only_active else None, limit=limit)
     
     def get_by_dept(self, dept_code: str, only_active: bool = True) -> List[Basic]:
         """
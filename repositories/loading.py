@@ -0,0 +1,78 @@
+"""
+關聯載入策略
+Repository 查詢可指定要預先載入的關聯與策略，避免逐筆存取關聯造成 N+1 查詢：
+    selectin：另以一次 IN 查詢載入（一對多建議使用）
+    joined：以 LEFT OUTER JOIN 一併取得（多對一建議使用）
+    raise：不載入，存取時拋出例外
+    select：存取時才查詢（SQLAlchemy 預設的延遲載入）
+
+嚴格模式（測試時開啟，或設定環境變數 HRMS_STRICT_LOADING=1）：
+所有 ORM 查詢未指定策略的關聯一律 raise，意外的延遲載入會直接失敗
+"""
+import os
+from typing import Any, List, Optional, Sequence
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, joinedload, lazyload, raiseload, selectinload
+
+LOAD_STRATEGIES = {
+    "selectin": selectinload,
+    "joined": joinedload,
+    "raise": raiseload,
+    "select": lazyload,
+}
+
+_strict = os.getenv("HRMS_STRICT_LOADING", "").lower() in ("1", "true", "yes")
+
+
+def set_strict_loading(enabled: bool = True) -> None:
+    """開啟/關閉嚴格模式（行程全域）"""
+    global _strict
+    _strict = enabled
+
+
+def strict_loading_enabled() -> bool:
+    return _strict
+
+
+def load_options(model_class: type, load: Optional[Sequence[str]] = None,
+                 strategy: str = "selectin") -> List[Any]:
+    """
+    產生載入選項
+
+    Args:
+        model_class: 查詢的模型
+        load: 關聯名稱；可用 "a.b" 指定巢狀關聯（各層使用同一策略）。None 表示所有關聯
+        strategy: selectin / joined / raise / select
+
+    Raises:
+        ValueError: 未知的策略或關聯
+    """
+    loader = LOAD_STRATEGIES.get(strategy)
+    if loader is None:
+        raise ValueError(f"未知的載入策略：{strategy}（可用：{', '.join(LOAD_STRATEGIES)}）")
+    if load is None:
+        return [loader("*")]
+    options = []
+    for path in load:
+        mapper, option = inspect(model_class), None
+        for name in path.split("."):
+            rel = mapper.relationships.get(name)
+            if rel is None:
+                raise ValueError(f"{mapper.class_.__name__} 無關聯：{name}")
+            attr = getattr(mapper.class_, name)
+            # 巢狀關聯：在上一層選項上串接同名方法（例如 selectinload(a).selectinload(b)）
+            option = loader(attr) if option is None else getattr(option, loader.__name__)(attr)
+            mapper = rel.mapper
+        options.append(option)
+    return options
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _raise_unspecified(state):
+    # 嚴格模式：頂層 ORM 查詢的其餘關聯改為 raise（明確指定的載入選項優先）
+    if not _strict or not state.is_select or state.is_column_load or state.is_relationship_load:
+        return
+    if not any(d.get("entity") is not None and d.get("type") is d.get("entity")
+               for d in state.statement.column_descriptions):
+        return
+    state.statement = state.statement.options(raiseload("*"))
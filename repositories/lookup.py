@@ -6,6 +6,7 @@ from typing import List, Optional
 from sqlalchemy.orm import Session
 from domain.models import Section, Area, Job, VacType, Shift, Shop
 from .base import BaseRepositorySQLAlchemy
+from .lookup_cache import LookupCache, lookup_cache
 
 class SectionRepository(BaseRepositorySQLAlchemy[Section]):
     """部門 Repository"""
@@ -76,12 +77,12 @@ class ShopRepository(BaseRepositorySQLAlchemy[Shop]):
 class LookupService:
     """
     對照表服務
-    提供下拉選單資料，並支援快取
+    提供下拉選單資料；資料來自行程共用的 lookup_cache，資料表未變更前不會重複查詢
     """
     
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, cache: Optional[LookupCache] = None):
         self.session = session
-        self._cache = {}
+        self.cache = cache if cache is not None else lookup_cache
         
         # 初始化 Repository
         self.section_repo = SectionRepository(session)
@@ -94,99 +95,79 @@ class LookupService:
     # === 部門相關 ===
     def list_dept_codes(self) -> List[str]:
         """取得所有部門代碼"""
-        cache_key = "dept_codes"
-        if cache_key not in self._cache:
-            sections = self.section_repo.get_active_sections()
-            self._cache[cache_key] = [s.Dept_Code for s in sections if s.Dept_Code]
-        return self._cache[cache_key]
+        return self.cache.codes(self.session, "dept")
     
     def list_dept_names(self) -> List[str]:
         """取得所有部門名稱"""
-        cache_key = "dept_names"
-        if cache_key not in self._cache:
-            sections = self.section_repo.get_active_sections()
-            self._cache[cache_key] = [s.Dept_Name for s in sections if s.Dept_Name]
-        return self._cache[cache_key]
+        return self.cache.descriptions(self.session, "dept")
     
     def get_dept_name(self, dept_code: str) -> Optional[str]:
         """依部門代碼取得部門名稱"""
-        section = self.section_repo.get_by_pk(dept_code)
-        return section.Dept_Name if section else None
+        return self.cache.name(self.session, "dept", dept_code)
     
     # === 區域相關 ===
     def list_areas(self) -> List[str]:
         """取得所有區域代碼"""
-        cache_key = "areas"
-        if cache_key not in self._cache:
-            areas = self.area_repo.get_active_areas()
-            self._cache[cache_key] = [a.Area for a in areas if a.Area]
-        return self._cache[cache_key]
+        return self.cache.codes(self.session, "area")
     
     def list_area_descriptions(self) -> List[str]:
         """取得所有區域說明"""
-        cache_key = "area_descs"
-        if cache_key not in self._cache:
-            areas = self.area_repo.get_active_areas()
-            self._cache[cache_key] = [a.Area_Desc for a in areas if a.Area_Desc]
-        return self._cache[cache_key]
+        return self.cache.descriptions(self.session, "area")
+    
+    def get_area_desc(self, area: str) -> Optional[str]:
+        """依區域代碼取得說明"""
+        return self.cache.name(self.session, "area", area)
     
     # === 職務相關 ===
     def list_jobs(self) -> List[str]:
         """取得所有職務"""
-        cache_key = "jobs"
-        if cache_key not in self._cache:
-            jobs = self.job_repo.list()
-            self._cache[cache_key] = [j.L_Job for j in jobs if j.L_Job]
-        return self._cache[cache_key]
+        return self.cache.codes(self.session, "job")
     
     # === 假別相關 ===
     def list_vac_types(self) -> List[str]:
         """取得所有假別代碼"""
-        cache_key = "vac_types"
-        if cache_key not in self._cache:
-            vac_types = self.vac_type_repo.get_active_vac_types()
-            self._cache[cache_key] = [v.VAC_ID for v in vac_types if v.VAC_ID]
-        return self._cache[cache_key]
+        return self.cache.codes(self.session, "vac_type")
     
     def list_vac_type_descs(self) -> List[str]:
         """取得所有假別說明"""
-        cache_key = "vac_descs"
-        if cache_key not in self._cache:
-            vac_types = self.vac_type_repo.get_active_vac_types()
-            self._cache[cache_key] = [v.VAC_DESC for v in vac_types if v.VAC_DESC]
-        return self._cache[cache_key]
+        return self.cache.descriptions(self.session, "vac_type")
+    
+    def get_vac_type_desc(self, vac_id: str) -> Optional[str]:
+        """依假別代碼取得說明"""
+        return self.cache.name(self.session, "vac_type", vac_id)
     
     # === 班別相關 ===
     def list_shifts(self) -> List[str]:
         """取得所有班別代碼"""
-        cache_key = "shifts"
-        if cache_key not in self._cache:
-            shifts = self.shift_repo.get_active_shifts()
-            self._cache[cache_key] = [s.Shift for s in shifts if s.Shift]
-        return self._cache[cache_key]
+        return self.cache.codes(self.session, "shift")
     
     def list_shifts_by_section(self, dept_code: str) -> List[str]:
-        """依部門取得班別"""
+        """依部門取得班別（含停用）"""
         shifts = self.shift_repo.get_by_section(dept_code)
         return [s.Shift for s in shifts if s.Shift]
     
+    def list_active_shifts_by_section(self, dept_code: str) -> List[str]:
+        """依部門取得有效班別（不重複、排序）"""
+        return self.cache.codes_by_group(self.session, "shift", dept_code)
+    
     # === 工站相關 ===
     def list_shop_codes(self) -> List[str]:
         """取得所有工站代碼"""
-        cache_key = "shop_codes"
-        if cache_key not in self._cache:
-            shops = self.shop_repo.get_active_shops()
-            self._cache[cache_key] = [s.SHOP for s in shops if s.SHOP]
-        return self._cache[cache_key]
+        return self.cache.codes(self.session, "shop")
     
     def list_shop_descs(self) -> List[str]:
         """取得所有工站說明"""
-        cache_key = "shop_descs"
-        if cache_key not in self._cache:
-            shops = self.shop_repo.get_active_shops()
-            self._cache[cache_key] = [s.SHOP_DESC for s in shops if s.SHOP_DESC]
-        return self._cache[cache_key]
+        return self.cache.descriptions(self.session, "shop")
+    
+    def get_shop_desc(self, shop: str) -> Optional[str]:
+        """依工站代碼取得說明"""
+        return self.cache.name(self.session, "shop", shop)
+    
+    # === 證照類型 ===
+    def list_certify_types(self) -> List[str]:
+        """取得所有證照類型"""
+        return self.cache.codes(self.session, "certify_type")
     
     def clear_cache(self):
-        """清除快取"""
-        self._cache.clear()
+        """清除快取（行程共用；外部工具直接修改資料庫後使用）"""
+        self.cache.invalidate()
@@ -0,0 +1,175 @@
+"""
+行程共用的對照表快取
+部門、區域、職務、假別、班別、工站、證照類型的代碼清單與代碼 → 說明對照，
+以資料表版本號（repositories.versioning）判斷是否失效，失效後於下次取用時才重新查詢；
+穩定狀態下下拉選單與代碼轉名稱不需存取資料庫
+"""
+from __future__ import annotations
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from domain.models import Section, Area, Job, VacType, Shift, Shop, CertifyType
+from .versioning import table_version
+
+
+@dataclass(frozen=True)
+class LookupTable:
+    """對照表定義：代碼欄、說明欄、有效旗標欄、分組欄（例如班別所屬部門）"""
+    model: type
+    code: str
+    desc: Optional[str] = None
+    active: Optional[str] = None
+    group: Optional[str] = None
+
+    @property
+    def table_name(self) -> str:
+        return self.model.__tablename__
+
+
+@dataclass
+class LookupEntry:
+    """
+    一份對照表快照
+    codes/descs 僅含有效資料（下拉選單用）；names 含全部資料（已停用的代碼仍能顯示名稱）
+    """
+    version: int
+    codes: List[str]
+    descs: List[str]
+    names: Dict[str, str]
+    groups: Dict[str, List[str]] = field(default_factory=dict)
+    loaded_at: float = 0.0
+
+
+LOOKUP_TABLES: Dict[str, LookupTable] = {
+    "dept": LookupTable(Section, "Dept_Code", "Dept_Name"),
+    "area": LookupTable(Area, "Area", "Area_Desc", active="Active"),
+    "job": LookupTable(Job, "L_Job"),
+    "vac_type": LookupTable(VacType, "VAC_ID", "VAC_DESC", active="Active"),
+    "shift": LookupTable(Shift, "Shift", "Shift_Desc", active="Active", group="L_Section"),
+    "shop": LookupTable(Shop, "SHOP", "SHOP_DESC", active="Active"),
+    "certify_type": LookupTable(CertifyType, "Certify_Type"),
+}
+
+
+def _load(session: Session, spec: LookupTable, version: int) -> LookupEntry:
+    model = spec.model
+    columns = [getattr(model, spec.code)]
+    for name in (spec.desc, spec.active, spec.group):
+        columns.append(getattr(model, name) if name else None)
+    stmt = select(*[c for c in columns if c is not None]).order_by(columns[0])
+
+    codes: List[str] = []
+    descs: List[str] = []
+    names: Dict[str, str] = {}
+    groups: Dict[str, List[str]] = {}
+    seen = set()
+    for row in session.execute(stmt):
+        values = iter(row)
+        code = next(values)
+        desc = next(values) if spec.desc else None
+        active = next(values) if spec.active else True
+        group = next(values) if spec.group else None
+        if not code:
+            continue
+        if desc and code not in names:
+            names[code] = desc
+        if not active:
+            continue
+        # 班別代碼非主鍵，跨部門會重複
+        if code not in seen:
+            seen.add(code)
+            codes.append(code)
+            if desc:
+                descs.append(desc)
+        if group is not None and code not in groups.setdefault(group, []):
+            groups[group].append(code)
+    return LookupEntry(version, codes, descs, names, groups, time.monotonic())
+
+
+class LookupCache:
+    """
+    對照表快取（行程共用，執行緒安全）
+    回傳的清單與字典為共用快照，呼叫端請勿修改
+
+    使用範例：
+        with UnitOfWork(readonly=True) as uow:
+            codes = lookup_cache.codes(uow.session, "dept")
+            name = lookup_cache.name(uow.session, "dept", "A100")
+    """
+
+    def __init__(self, tables: Optional[Dict[str, LookupTable]] = None, max_age: float = 0.0):
+        """
+        Args:
+            tables: 對照表定義，預設 LOOKUP_TABLES
+            max_age: 快照保留秒數（其他行程的寫入無法偵測，以此為上限）；0 表示只依版本號失效
+        """
+        self.tables = dict(tables or LOOKUP_TABLES)
+        self.max_age = max_age
+        self._entries: Dict[str, LookupEntry] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _spec(self, kind: str) -> LookupTable:
+        spec = self.tables.get(kind)
+        if spec is None:
+            raise KeyError(f"未定義的對照表：{kind}")
+        return spec
+
+    def entry(self, session: Session, kind: str) -> LookupEntry:
+        """取得有效快照；版本已變更（或超過 max_age）時以 session 重新查詢"""
+        spec = self._spec(kind)
+        version = table_version(spec.table_name)
+        with self._lock:
+            entry = self._entries.get(kind)
+            if entry is not None and entry.version == version and not (
+                    self.max_age and time.monotonic() - entry.loaded_at > self.max_age):
+                self.hits += 1
+                return entry
+            self.misses += 1
+        # 查詢放在鎖外；版本號取自查詢前，期間若有寫入，下次取用時會再重新載入
+        entry = _load(session, spec, version)
+        with self._lock:
+            self._entries[kind] = entry
+        return entry
+
+    def codes(self, session: Session, kind: str) -> List[str]:
+        """有效代碼清單（依代碼排序）"""
+        return self.entry(session, kind).codes
+
+    def descriptions(self, session: Session, kind: str) -> List[str]:
+        """有效資料的說明清單（與 codes 同順序，略過空白說明）"""
+        return self.entry(session, kind).descs
+
+    def names(self, session: Session, kind: str) -> Dict[str, str]:
+        """代碼 → 說明（含已停用資料）"""
+        return self.entry(session, kind).names
+
+    def name(self, session: Session, kind: str, code: Optional[str]) -> Optional[str]:
+        """代碼轉說明；查無時回傳 None"""
+        if not code:
+            return None
+        return self.entry(session, kind).names.get(code)
+
+    def codes_by_group(self, session: Session, kind: str, group: str) -> List[str]:
+        """依分組欄取得有效代碼（例如某部門的班別）"""
+        return self.entry(session, kind).groups.get(group, [])
+
+    def invalidate(self, kind: Optional[str] = None):
+        """清除快照（None 表示全部）；外部工具直接修改資料庫後使用"""
+        with self._lock:
+            if kind is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(kind, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"tables": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+# 全域共用實例
+lookup_cache = LookupCache()
@@ -0,0 +1,124 @@
+"""
+熱門 Repository 查詢的執行計畫檢查
+實際呼叫各 Repository 方法、攔截送出的 SQL，再以 EXPLAIN QUERY PLAN 檢查是否整表掃描
+"""
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, List, Optional, Pattern, Tuple
+import re
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from domain.models import Basic, CertifyItem, CertifyRecord, CertifyToolMap, TrainingRecord
+from .certification import (
+    CertifyItemRepository, CertifyRecordRepository, CertifyToolMapRepository, TrainingRecordRepository
+)
+from .employee import BasicRepository
+
+# 所有 SCAN 步驟都視為掃描（SCAN x USING [COVERING] INDEX y 仍是逐筆走完整個索引）
+_SCAN = re.compile(r"^SCAN ")
+
+# 允許的 SCAN：常數列、系統目錄 sqlite_master、帶 MATCH 條件的 FTS5 虛擬表（VIRTUAL TABLE INDEX n:M…）
+# 刻意的依序掃描請以 check_hot_queries(allow=...) / find_scans(allow=...) 逐一列入
+SCAN_ALLOWLIST: Tuple[Pattern[str], ...] = (
+    re.compile(r"^SCAN CONSTANT ROW\b"),
+    re.compile(r"^SCAN sqlite_master\b"),
+    re.compile(r"^SCAN \S+ VIRTUAL TABLE INDEX \d+:\S"),
+)
+
+
+@dataclass
+class PlanResult:
+    """單一查詢的執行計畫"""
+    name: str
+    sql: str
+    plan: List[str] = field(default_factory=list)
+    scans: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.scans
+
+
+def _sample(session: Session, column) -> Any:
+    """取資料表中的一個實際值作為查詢參數（空表時用佔位值）"""
+    value = session.execute(select(column).where(column.is_not(None)).limit(1)).scalar()
+    return value if value is not None else "__none__"
+
+
+# (名稱, 取樣欄位, 呼叫方式)
+HOT_QUERIES: List[Tuple[str, Any, Callable[[Session, Any], Any]]] = [
+    ("BASIC 依部門", Basic.Dept_Code,
+     lambda s, v: BasicRepository(s).get_by_dept(v)),
+    ("BASIC 姓名全文檢索", Basic.C_Name,
+     lambda s, v: BasicRepository(s).search_by_name(v.strip())),
+    ("BASIC 部門是否有員工", Basic.Dept_Code,
+     lambda s, v: BasicRepository(s).has_department_employees(v)),
+    ("TRAINING_RECORD 依員工（有效）", TrainingRecord.EMP_ID,
+     lambda s, v: TrainingRecordRepository(s).get_by_employee(v)),
+    ("TRAINING_RECORD 員工證照數", TrainingRecord.EMP_ID,
+     lambda s, v: TrainingRecordRepository(s).count_by_employee(v)),
+    ("TRAINING_RECORD 即將到期", TrainingRecord.Expiry_Date,
+     lambda s, v: TrainingRecordRepository(s).get_expiring_records(30)),
+    ("TRAINING_RECORD 到期筆數", TrainingRecord.Expiry_Date,
+     lambda s, v: TrainingRecordRepository(s).count_expiring(30)),
+    ("TRAINING_RECORD 依證照項目", TrainingRecord.Certify_ID,
+     lambda s, v: TrainingRecordRepository(s).get_by_certify_item(v)),
+    ("CERTIFY_ITEMS 依證照代碼", CertifyItem.Certify_ID,
+     lambda s, v: CertifyItemRepository(s).get(Certify_ID=v)),
+    ("CERTIFY_RECORD 依員工", CertifyRecord.EMP_ID,
+     lambda s, v: CertifyRecordRepository(s).get_by_employee(v)),
+    ("CERTIFY_TOOL_MAP 依證照", CertifyToolMap.Certify_ID,
+     lambda s, v: CertifyToolMapRepository(s).get_by_certify(v)),
+    ("CERTIFY_TOOL_MAP 依工具", CertifyToolMap.TOOL_ID,
+     lambda s, v: CertifyToolMapRepository(s).get_by_tool(v)),
+]
+
+
+def explain(session: Session, sql: str, params: Any = ()) -> List[str]:
+    """回傳 EXPLAIN QUERY PLAN 的各步驟描述"""
+    conn = session.connection()
+    # EXPLAIN 不檢查 schema 版本，驅動快取的舊語句在建立/移除索引後仍會回報舊計畫；
+    # 以 schema_version 註解區分快取鍵
+    version = conn.exec_driver_sql("PRAGMA schema_version").scalar()
+    rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql} /* schema {version} */", params or ()).fetchall()
+    return [row[-1] for row in rows]
+
+
+def find_scans(plan: List[str], allow: Iterable[Pattern[str]] = ()) -> List[str]:
+    """挑出不在允許清單（SCAN_ALLOWLIST 與 allow）中的 SCAN 步驟"""
+    allowed = SCAN_ALLOWLIST + tuple(allow)
+    return [step for step in plan
+            if _SCAN.match(step) and not any(pattern.match(step) for pattern in allowed)]
+
+
+def check_hot_queries(session: Session,
+                      queries: Optional[List[Tuple[str, Any, Callable]]] = None,
+                      allow: Iterable[Pattern[str]] = ()) -> List[PlanResult]:
+    """
+    執行每個熱門查詢並檢查其 SQL 的執行計畫（只讀，不會修改資料）
+
+    Args:
+        allow: 額外允許的 SCAN 步驟（例如刻意的依序掃描）
+
+    Returns:
+        每個被送出的 SQL 一筆 PlanResult；scans 非空表示有整表掃描
+    """
+    captured: List[Tuple[str, Any]] = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    engine = session.get_bind()
+    results: List[PlanResult] = []
+    for name, column, call in queries or HOT_QUERIES:
+        value = _sample(session, column)
+        captured.clear()
+        event.listen(engine, "before_cursor_execute", _capture)
+        try:
+            call(session, value)
+        finally:
+            event.remove(engine, "before_cursor_execute", _capture)
+        for sql, params in list(captured):
+            plan = explain(session, sql, params)
+            results.append(PlanResult(name=name, sql=sql, plan=plan, scans=find_scans(plan, allow)))
+    return results
@@ -0,0 +1,52 @@
+"""
+全域搜尋
+同時檢索員工、證照項目與證照記錄備註，依全文檢索相關度合併排序
+"""
+from dataclasses import dataclass
+from typing import Any, List
+from sqlalchemy.orm import Session
+from .certification import CertifyItemRepository, TrainingRecordRepository
+from .employee import BasicRepository
+
+
+@dataclass
+class SearchHit:
+    """單筆搜尋結果"""
+    kind: str      # employee / certify_item / training_record
+    key: Any       # 主鍵
+    title: str
+    detail: str
+    rank: float    # bm25 分數，越小越相關；LIKE 比對時為 0
+
+
+def _text(value: Any) -> str:
+    return "" if value is None else str(value).strip()
+
+
+def global_search(session: Session, keyword: str, limit: int = 20,
+                  only_active: bool = True) -> List[SearchHit]:
+    """
+    全域搜尋
+
+    Args:
+        session: 資料庫 Session
+        keyword: 關鍵字（空白分隔多個關鍵字時須全部符合）
+        limit: 每一類最多回傳筆數
+        only_active: 是否只搜尋在職員工
+
+    Returns:
+        依相關度排序的搜尋結果
+    """
+    hits: List[SearchHit] = []
+    active = {"Active": True} if only_active else None
+    for emp, rank in BasicRepository(session).search_text(keyword, filters=active, limit=limit, with_rank=True):
+        hits.append(SearchHit("employee", emp.EMP_ID, f"{emp.EMP_ID} {_text(emp.C_Name)}",
+                              _text(emp.Meno), rank))
+    for item, rank in CertifyItemRepository(session).search_text(keyword, limit=limit, with_rank=True):
+        hits.append(SearchHit("certify_item", (item.Dept, item.Certify_ID),
+                              f"{item.Certify_ID} {_text(item.Certify_Name)}", _text(item.Remark), rank))
+    for rec, rank in TrainingRecordRepository(session).search_text(keyword, limit=limit, with_rank=True):
+        hits.append(SearchHit("training_record", rec.Certify_No, f"{rec.EMP_ID} {rec.Certify_ID}",
+                              _text(rec.Remark), rank))
+    hits.sort(key=lambda h: h.rank)
+    return hits
@@ -0,0 +1,71 @@
+"""
+資料表版本號（行程內）
+任何經由 Session flush 或 Repository 批次語句的寫入都會遞增該表版本，
+供快取（例如分頁總筆數、對照表）判斷是否失效；
+交易 commit 後再遞增一次，避免其他 Session 在 commit 前讀到舊資料並以新版本號快取
+"""
+import threading
+from typing import Dict, Iterable
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+_versions: Dict[str, int] = {}
+_global_version = 0
+_lock = threading.Lock()
+# session.info 中記錄本交易已變更的資料表
+_CHANGED_KEY = "hrms_changed_tables"
+
+
+def table_version(table_name: str) -> int:
+    """目前版本號；從未寫入過為 0"""
+    return _versions.get(table_name, 0)
+
+
+def data_version() -> int:
+    """任一資料表變更即遞增"""
+    return _global_version
+
+
+def bump_table_version(*table_names: str) -> None:
+    """標記資料表已變更"""
+    global _global_version
+    with _lock:
+        for name in table_names:
+            _versions[name] = _versions.get(name, 0) + 1
+        _global_version += 1
+
+
+def _tables_of(objs: Iterable) -> set:
+    names = set()
+    for obj in objs:
+        table = getattr(type(obj), "__tablename__", None)
+        if table:
+            names.add(table)
+    return names
+
+
+def mark_changed(session: Session, *table_names: str) -> None:
+    """標記 session 交易中已變更的資料表：立即遞增，commit 後再遞增一次"""
+    if not table_names:
+        return
+    bump_table_version(*table_names)
+    session.info.setdefault(_CHANGED_KEY, set()).update(table_names)
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_on_flush(session, flush_context):
+    # flush 後（commit 前）即遞增：rollback 只會多一次快取失效，不會用到過期的值
+    names = _tables_of(session.new) | _tables_of(session.dirty) | _tables_of(session.deleted)
+    mark_changed(session, *names)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_on_commit(session):
+    names = session.info.pop(_CHANGED_KEY, None)
+    if names:
+        bump_table_version(*names)
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_on_rollback(session):
+    session.info.pop(_CHANGED_KEY, None)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CSV 冷啟動載入基準測試：文字解析 vs 欄式 sidecar（Arrow IPC + memory-map）
+
+用途：
+- 將 data/ 中指定的 CSV 複製到暫存目錄（不動到原始資料）
+- 分別量測「每次都解析 CSV」與「由 sidecar 載入」的冷啟動時間（每輪使用新的快取）
+
+使用：
+  python scripts/bench_csv_sidecar.py --tables TRAINING_RECORD BASIC --repeat 20
+"""
+from __future__ import annotations
+import argparse
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from hrms.core.db.adapters.csv_adapter import CSVAdapter
+from hrms.core.db.adapters.csv_sidecar import HAS_ARROW
+from hrms.core.db.adapters.table_cache import TableCache
+
+
+def _cold_load_ms(data_dir: Path, table: str, sidecar: bool, repeat: int) -> list[float]:
+    times = []
+    for _ in range(repeat):
+        adapter = CSVAdapter(str(data_dir), cache=TableCache(), sidecar=sidecar)
+        t0 = time.perf_counter()
+        adapter._read_df(table)
+        times.append((time.perf_counter() - t0) * 1000)
+    return times
+
+
+def main():
+    ap = argparse.ArgumentParser(description="CSV sidecar 冷啟動基準測試")
+    ap.add_argument("--data", default=str(PROJECT_ROOT / "data"), help="CSV 目錄")
+    ap.add_argument("--tables", nargs="+", default=["TRAINING_RECORD", "BASIC"])
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    if not HAS_ARROW:
+        raise SystemExit("未安裝 pyarrow，無法測試 sidecar")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        work = Path(tmp)
+        for table in args.tables:
+            shutil.copy2(Path(args.data) / f"{table}.csv", work / f"{table}.csv")
+
+        print(f"{'table':<18}{'csv (ms)':>12}{'sidecar (ms)':>15}{'speedup':>10}")
+        for table in args.tables:
+            csv_ms = statistics.median(_cold_load_ms(work, table, False, args.repeat))
+            # 第一次載入建立 sidecar，不列入統計
+            _cold_load_ms(work, table, True, 1)
+            side_ms = statistics.median(_cold_load_ms(work, table, True, args.repeat))
+            print(f"{table:<18}{csv_ms:>12.2f}{side_ms:>15.2f}{csv_ms / side_ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CSV 資料表記憶體用量報告：raw（原樣載入） vs compact（去除補空白 + category）
+
+用途：
+- 逐表載入 data/ 中的 CSV，分別以兩種載入表示法量測 DataFrame 記憶體用量（含字串內容）
+- 另量測 compact 下等值篩選的速度差異（--filter 欄位=值）
+
+使用：
+  python scripts/csv_memory_report.py --tables TRAINING_RECORD BASIC
+  python scripts/csv_memory_report.py --tables TRAINING_RECORD --filter Active=True
+"""
+from __future__ import annotations
+import argparse
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from hrms.core.db.adapters.csv_adapter import CSVAdapter
+from hrms.core.db.adapters.csv_index import load_csv_schema
+from hrms.core.db.adapters.table_cache import TableCache
+
+
+def _adapter(data_dir: str, profile: str) -> CSVAdapter:
+    schema = load_csv_schema(str(PROJECT_ROOT / "config" / "csv_schema.yaml"))
+    # 不使用 sidecar，避免在資料目錄留下快取檔
+    return CSVAdapter(data_dir, cache=TableCache(), schema=schema, sidecar=False, load_profile=profile)
+
+
+def _filter_ms(adapter: CSVAdapter, table: str, column: str, value: str, repeat: int = 50) -> float:
+    df = adapter._read_df(table)
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        adapter._filter_df(table, df, {column: value})
+    return (time.perf_counter() - t0) * 1000 / repeat
+
+
+def main():
+    ap = argparse.ArgumentParser(description="CSV 載入表示法記憶體報告")
+    ap.add_argument("--data", default=str(PROJECT_ROOT / "data"), help="CSV 目錄")
+    ap.add_argument("--tables", nargs="+", default=["TRAINING_RECORD", "BASIC", "CERTIFY_TOOL_MAP"])
+    ap.add_argument("--filter", default=None, help="等值篩選基準，格式 欄位=值")
+    args = ap.parse_args()
+
+    raw, compact = _adapter(args.data, "raw"), _adapter(args.data, "compact")
+    print(f"{'table':<18}{'rows':>8}{'raw (KB)':>12}{'compact (KB)':>15}{'ratio':>8}")
+    for table in args.tables:
+        rows = len(raw._read_df(table))
+        before, after = raw.memory_usage(table), compact.memory_usage(table)
+        ratio = before / after if after else 0.0
+        print(f"{table:<18}{rows:>8}{before / 1024:>12.1f}{after / 1024:>15.1f}{ratio:>7.1f}x")
+
+    if args.filter:
+        column, _, value = args.filter.partition("=")
+        print(f"\n等值篩選 {column}={value}（每次 ms）")
+        for table in args.tables:
+            print(f"{table:<18}raw {_filter_ms(raw, table, column, value):>8.3f}"
+                  f"   compact {_filter_ms(compact, table, column, value):>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
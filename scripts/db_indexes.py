@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQLite 索引管理與執行計畫檢查
+
+用途：
+- create：補建模型中宣告的次要索引與 FTS5 全文索引（已存在者略過，可重複執行），完成後 ANALYZE
+- drop：移除模型中宣告的次要索引與全文索引（主鍵索引不受影響）
+- rebuild-fts：由原表重建全文索引內容（VACUUM 後或資料不一致時使用）
+- check：執行熱門 Repository 查詢，以 EXPLAIN QUERY PLAN 標示整表掃描；有掃描時結束碼為 1
+
+使用：
+  python scripts/db_indexes.py create
+  python scripts/db_indexes.py check --db sqlite:///./hrms.db
+"""
+from __future__ import annotations
+import argparse
+import os
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from sqlalchemy.orm import Session
+
+from hrms.core.db.engine import get_engine
+from domain.models import (
+    FULLTEXT_INDEXES, create_fulltext, create_indexes, declared_indexes, drop_fulltext, drop_indexes,
+    rebuild_fulltext
+)
+from repositories.query_plan import check_hot_queries
+
+
+def main():
+    ap = argparse.ArgumentParser(description="SQLite 索引管理與執行計畫檢查")
+    ap.add_argument("command", choices=["create", "drop", "check", "list", "rebuild-fts"])
+    ap.add_argument("--db", default=os.getenv("DB_URL", f"sqlite:///{PROJECT_ROOT / 'hrms.db'}"),
+                    help="資料庫 URL")
+    ap.add_argument("-v", "--verbose", action="store_true", help="check 時列出完整 SQL 與計畫")
+    args = ap.parse_args()
+
+    engine = get_engine(args.db)
+
+    if args.command == "list":
+        for ix in declared_indexes():
+            cols = ", ".join(c.name for c in ix.columns)
+            where = ix.dialect_options["sqlite"].get("where")
+            print(f"{ix.table.name:<18}{ix.name:<36}({cols})" + (f" WHERE {where}" if where is not None else ""))
+        for spec in FULLTEXT_INDEXES.values():
+            print(f"{spec.table:<18}{spec.name:<36}({', '.join(spec.columns)}) FTS5 trigram")
+    elif args.command == "create":
+        created = create_indexes(engine) + create_fulltext(engine)
+        print("已建立：" + (", ".join(created) if created else "（無，全部已存在）"))
+    elif args.command == "drop":
+        dropped = drop_indexes(engine) + drop_fulltext(engine)
+        print("已移除：" + (", ".join(dropped) if dropped else "（無）"))
+    elif args.command == "rebuild-fts":
+        rebuilt = rebuild_fulltext(engine)
+        print("已重建：" + (", ".join(rebuilt) if rebuilt else "（無全文索引）"))
+    else:
+        with Session(engine) as session:
+            results = check_hot_queries(session)
+        failed = 0
+        for r in results:
+            mark = "OK  " if r.ok else "SCAN"
+            print(f"[{mark}] {r.name}")
+            if not r.ok:
+                failed += 1
+                for step in r.scans:
+                    print(f"       {step}")
+            if args.verbose:
+                print(f"       {r.sql.strip()}")
+                for step in r.plan:
+                    print(f"         - {step}")
+        print(f"\n{len(results)} 個查詢，{failed} 個整表掃描")
+        sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日期欄位正規化與證照到期日遷移
+
+用途：
+- 補上模型新增的欄位（CERTIFY_ITEMS.Valid_Days、TRAINING_RECORD.Expiry_Date）
+- 將所有日期欄位（20110801、2011/08/01 ...）轉為 YYYY-MM-DD
+- 建立到期日觸發器、重算到期日並補建索引
+可重複執行；無法解析的日期保留原值並列出筆數
+
+使用：
+  python scripts/migrate_dates.py
+  python scripts/migrate_dates.py --db sqlite:///./hrms.db
+"""
+from __future__ import annotations
+import argparse
+import os
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from hrms.core.db.engine import get_engine
+from domain.models import migrate_dates
+
+
+def main():
+    ap = argparse.ArgumentParser(description="日期欄位正規化與證照到期日遷移")
+    ap.add_argument("--db", default=os.getenv("DB_URL", f"sqlite:///{PROJECT_ROOT / 'hrms.db'}"),
+                    help="資料庫 URL")
+    args = ap.parse_args()
+
+    result = migrate_dates(get_engine(args.db))
+    print("新增欄位：" + (", ".join(result["added_columns"]) or "（無）"))
+    for name, stats in result["columns"].items():
+        if stats["normalized"] or stats["unparsed"]:
+            print(f"  {name:<36}轉換 {stats['normalized']:>6} 筆，無法解析 {stats['unparsed']:>4} 筆")
+    print(f"重算到期日：{result.get('expiry_rows', 0)} 筆")
+    print("新建索引：" + (", ".join(result["indexes"]) or "（無）"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQLite 連線設定（PRAGMA）效能比較：SQLite 預設值 vs config/settings.yaml 的 sqlite 設定
+
+用途：
+- 將資料庫複製到暫存目錄（不修改原檔），分別以兩種設定建立引擎
+- 讀取：每次開新 Session 依主鍵查詢與取一頁列表（模擬 UnitOfWork 使用方式）
+- 寫入：每次開新 Session 更新一筆並 commit
+- 輸出各項延遲的平均、p50、p95（ms）
+
+使用：
+  python scripts/sqlite_profile_bench.py
+  python scripts/sqlite_profile_bench.py --db ./hrms.db -n 500
+"""
+from __future__ import annotations
+import argparse
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from hrms.core.config import SQLiteSettings, settings
+from hrms.core.db.engine import apply_sqlite_profile
+from repositories import TrainingRecordRepository
+
+# 全部留空 = 不下任何 PRAGMA（SQLite 預設：DELETE journal、synchronous FULL、2 MB 快取）
+DEFAULT_PROFILE = SQLiteSettings(journal_mode="", synchronous="", cache_size_kb=None,
+                                 mmap_size_mb=None, temp_store="", busy_timeout_ms=None)
+
+
+def _stats(samples):
+    ms = sorted(s * 1000 for s in samples)
+    return statistics.mean(ms), ms[len(ms) // 2], ms[int(len(ms) * 0.95) - 1]
+
+
+def _run(db_path: Path, profile: SQLiteSettings, n: int, seed: int):
+    engine = apply_sqlite_profile(create_engine(f"sqlite:///{db_path}"), profile)
+    factory = sessionmaker(bind=engine, autoflush=False)
+    with factory() as s:
+        ids = [r[0] for r in s.execute(text("SELECT Certify_No FROM TRAINING_RECORD"))]
+    rng = random.Random(seed)
+    results = {"get_by_pk": [], "page": [], "update+commit": []}
+    for i in range(n):
+        pk = rng.choice(ids)
+        t0 = time.perf_counter()
+        with factory() as s:
+            TrainingRecordRepository(s).get_by_pk(pk)
+        results["get_by_pk"].append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        with factory() as s:
+            TrainingRecordRepository(s).page(limit=50, offset=rng.randrange(0, len(ids)), use_cache=False)
+        results["page"].append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        with factory() as s:
+            TrainingRecordRepository(s).update(pk, {"updater": f"bench{i}"})
+            s.commit()
+        results["update+commit"].append(time.perf_counter() - t0)
+    engine.dispose()
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser(description="SQLite PRAGMA 設定效能比較")
+    ap.add_argument("--db", default=str(PROJECT_ROOT / "hrms.db"), help="來源 SQLite 檔（會先複製）")
+    ap.add_argument("-n", type=int, default=300, help="每項操作次數")
+    args = ap.parse_args()
+
+    profiles = [("SQLite 預設", DEFAULT_PROFILE), ("settings.yaml", settings.database.sqlite)]
+    with tempfile.TemporaryDirectory() as tmp:
+        rows = {}
+        for i, (name, profile) in enumerate(profiles):
+            db_path = Path(tmp) / f"bench{i}.db"
+            shutil.copyfile(args.db, db_path)
+            rows[name] = _run(db_path, profile, args.n, seed=1)
+
+    print(f"{'操作':<16}{'設定':<16}{'平均':>10}{'p50':>10}{'p95':>10}  (ms, n={args.n})")
+    for op in rows[profiles[0][0]]:
+        for name, _ in profiles:
+            mean, p50, p95 = _stats(rows[name][op])
+            print(f"{op:<16}{name:<16}{mean:>10.3f}{p50:>10.3f}{p95:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
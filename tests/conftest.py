@@ -0,0 +1,4 @@
+from repositories import set_strict_loading
+
+# 測試一律使用嚴格模式：未指定載入策略的關聯被存取時直接失敗（抓出意外的 N+1 延遲載入）
+set_strict_loading(True)
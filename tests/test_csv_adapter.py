@@ -0,0 +1,344 @@
+import os
+from hrms.core.db.adapters.csv_adapter import CSVAdapter
+from hrms.core.db.adapters.table_cache import TableCache
+from hrms.core.db.adapters.csv_index import TableSpec
+
+
+def _write(path, text):
+    path.write_text(text, encoding="utf-8")
+
+
+def _adapter(tmp_path, **kw):
+    _write(tmp_path / "BASIC.csv", "EMP_ID,C_Name,Active\n001,Amy,true\n002,Bob,false\n")
+    return CSVAdapter(str(tmp_path), cache=TableCache(), **kw)
+
+
+def test_table_cache_reuses_parsed_table(tmp_path):
+    a = _adapter(tmp_path)
+    assert len(a.list("BASIC")) == 2
+    assert a.get_by_pk("BASIC", "EMP_ID", "001")["C_Name"] == "Amy"
+    assert a.cache.stats()["misses"] == 1
+    assert a.cache.stats()["hits"] == 1
+
+
+def test_table_cache_invalidates_on_external_change(tmp_path):
+    a = _adapter(tmp_path)
+    a.list("BASIC")
+    p = tmp_path / "BASIC.csv"
+    st = p.stat()
+    _write(p, "EMP_ID,C_Name,Active\n001,Amy,true\n")
+    os.utime(p, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert len(a.list("BASIC")) == 1
+
+
+def test_table_cache_refreshed_by_own_writes(tmp_path):
+    a = _adapter(tmp_path)
+    a.list("BASIC")
+    a.upsert("BASIC", "EMP_ID", {"EMP_ID": "003", "C_Name": "Cat", "Active": "true"})
+    misses = a.cache.stats()["misses"]
+    assert a.get_by_pk("BASIC", "EMP_ID", "003")["C_Name"] == "Cat"
+    assert a.cache.stats()["misses"] == misses
+
+
+def test_table_cache_lru_eviction(tmp_path):
+    a = _adapter(tmp_path)
+    _write(tmp_path / "AREA.csv", "Area,Area_Desc\nEPI,epi\n")
+    a.list("BASIC")
+    one_table = a.cache.stats()["bytes"]
+    a.cache.configure(max_bytes=one_table + 1)
+    a.list("AREA")
+    assert a.cache.stats()["tables"] == 1
+
+
+def _indexed_adapter(tmp_path):
+    _write(tmp_path / "TRAINING_RECORD.csv",
+           "﻿Certify_No,EMP_ID,Certify_ID\n1,001,A\n2,002,A\n3,001,B\n")
+    schema = {"TRAINING_RECORD": TableSpec(primary_key="Certify_No", indexes=["EMP_ID"])}
+    return CSVAdapter(str(tmp_path), cache=TableCache(), schema=schema)
+
+
+def test_hash_index_lookups(tmp_path):
+    a = _indexed_adapter(tmp_path)
+    assert a.get_by_pk("TRAINING_RECORD", "Certify_No", "3")["Certify_ID"] == "B"
+    rows = a.list("TRAINING_RECORD", filters={"EMP_ID": "001", "Certify_ID": "B"})
+    assert [r["Certify_No"] for r in rows] == ["3"]
+    idx = a._indexes("TRAINING_RECORD", a._read_df("TRAINING_RECORD"))
+    assert idx.get("Certify_No").unique and idx.get("EMP_ID") is not None
+
+
+def test_hash_index_maintained_on_writes(tmp_path):
+    a = _indexed_adapter(tmp_path)
+    a.upsert("TRAINING_RECORD", "Certify_No", {"Certify_No": "2", "EMP_ID": "001"})
+    a.upsert("TRAINING_RECORD", "Certify_No", {"Certify_No": "4", "EMP_ID": "002", "Certify_ID": "C"})
+    a.delete("TRAINING_RECORD", "Certify_No", "1")
+    assert [r["Certify_No"] for r in a.list("TRAINING_RECORD", filters={"EMP_ID": "001"})] == ["2", "3"]
+    assert [r["Certify_No"] for r in a.list("TRAINING_RECORD", filters={"EMP_ID": "002"})] == ["4"]
+    # 重新載入後結果一致
+    fresh = CSVAdapter(str(tmp_path), cache=TableCache(), schema=a.schema)
+    assert fresh.list("TRAINING_RECORD", filters={"EMP_ID": "001"}) == a.list("TRAINING_RECORD", filters={"EMP_ID": "001"})
+    assert a.get_by_pk("TRAINING_RECORD", "Certify_No", "1") is None
+
+
+def test_index_copy_on_write_per_key(tmp_path):
+    from hrms.core.db.adapters.csv_index import HashIndex
+    import pandas as pd
+    old = HashIndex.build(pd.DataFrame({"k": [str(i) for i in range(1000)]}), "k", unique=True)
+    new = old.copy()
+    new.add(1000, "1000")
+    new.remove(5, "5")
+    # 未合併前共用同一個 _map，舊快照的索引不受影響
+    assert new._map is old._map and set(new._overlay) == {"1000", "5"}
+    assert old.lookup("5") == [5] and old.lookup("1000") == []
+    assert new.lookup("5") == [] and new.lookup("1000") == [1000] and len(new) == 1000
+    for i in range(200):
+        new.add(2000 + i, f"x{i}")
+    # 異動鍵超過門檻後合併為新的 _map
+    assert new._map is not old._map and len(new._overlay) < 200 and len(new) == 1200 and len(old) == 1000
+
+    a = _indexed_adapter(tmp_path)
+    base = a._read_df("TRAINING_RECORD")
+    base_idx = a._indexes("TRAINING_RECORD", base)
+    a.upsert("TRAINING_RECORD", "Certify_No", {"Certify_No": "9", "EMP_ID": "003"})
+    assert base_idx.get("EMP_ID").lookup("003") == [] and len(base) == 3
+
+
+def test_journal_mode_appends_and_compacts(tmp_path):
+    _write(tmp_path / "BASIC.csv", "EMP_ID,C_Name,Active\n001,Amy,true\n002,Bob,false\n")
+    a = CSVAdapter(str(tmp_path), cache=TableCache(), write_mode="journal")
+    before = (tmp_path / "BASIC.csv").read_bytes()
+    a.upsert("BASIC", "EMP_ID", {"EMP_ID": "001", "C_Name": "Ann"})
+    a.upsert("BASIC", "EMP_ID", {"EMP_ID": "003", "C_Name": "Cat", "Active": "true"})
+    assert a.delete("BASIC", "EMP_ID", "002")
+    # 主檔未被改寫，異動只在 journal
+    assert (tmp_path / "BASIC.csv").read_bytes() == before
+    assert (tmp_path / "BASIC.csv.journal").exists()
+    # 冷啟動（新快取）讀取時合併 journal
+    cold = CSVAdapter(str(tmp_path), cache=TableCache())
+    assert [(r["EMP_ID"], r["C_Name"]) for r in cold.list("BASIC")] == [("001", "Ann"), ("003", "Cat")]
+    assert a.compact("BASIC")
+    assert not (tmp_path / "BASIC.csv.journal").exists()
+    cold = CSVAdapter(str(tmp_path), cache=TableCache())
+    assert [(r["EMP_ID"], r["C_Name"]) for r in cold.list("BASIC")] == [("001", "Ann"), ("003", "Cat")]
+
+
+def test_upsert_many_and_delete_many(tmp_path):
+    for mode in ("rewrite", "journal"):
+        d = tmp_path / mode
+        d.mkdir()
+        _write(d / "BASIC.csv", "EMP_ID,C_Name,Active\n001,Amy,true\n002,Bob,false\n")
+        a = CSVAdapter(str(d), cache=TableCache(), write_mode=mode)
+        counts = a.upsert_many("BASIC", "EMP_ID", [
+            {"EMP_ID": "002", "Active": "true"},
+            {"EMP_ID": "003", "C_Name": "Cat"},
+            {"EMP_ID": "003", "Active": "false"},
+        ])
+        assert counts == {"inserted": 1, "updated": 1}
+        assert a.delete_many("BASIC", "EMP_ID", ["001", "999"]) == {"deleted": 1}
+        expected = [
+            {"EMP_ID": "002", "C_Name": "Bob", "Active": "true"},
+            {"EMP_ID": "003", "C_Name": "Cat", "Active": "false"},
+        ]
+        assert a.list("BASIC") == expected
+        assert CSVAdapter(str(d), cache=TableCache()).list("BASIC") == expected
+
+
+def test_unit_of_work_defers_and_groups_writes(tmp_path):
+    import pytest
+    from hrms.core.db.unit_of_work import UnitOfWork
+    _write(tmp_path / "BASIC.csv", "EMP_ID,C_Name\n001,Amy\n")
+    _write(tmp_path / "PERSON_INFO.csv", "EMP_ID,Sex\n001,F\n")
+    before = (tmp_path / "BASIC.csv").read_bytes()
+
+    with UnitOfWork(adapter=CSVAdapter(str(tmp_path), cache=TableCache())) as uow:
+        uow.adapter.upsert("BASIC", "EMP_ID", {"EMP_ID": "002", "C_Name": "Bob"})
+        uow.adapter.upsert("PERSON_INFO", "EMP_ID", {"EMP_ID": "002", "Sex": "M"})
+        # 交易內讀得到自己的異動，但檔案尚未改變
+        assert uow.adapter.get_by_pk("BASIC", "EMP_ID", "002")["C_Name"] == "Bob"
+        assert (tmp_path / "BASIC.csv").read_bytes() == before
+    fresh = CSVAdapter(str(tmp_path), cache=TableCache())
+    assert fresh.get_by_pk("BASIC", "EMP_ID", "002") is not None
+    assert fresh.get_by_pk("PERSON_INFO", "EMP_ID", "002")["Sex"] == "M"
+
+    with pytest.raises(ValueError):
+        with UnitOfWork(adapter=CSVAdapter(str(tmp_path), cache=TableCache())) as uow:
+            uow.adapter.delete("BASIC", "EMP_ID", "001")
+            raise ValueError("abort")
+    assert CSVAdapter(str(tmp_path), cache=TableCache()).get_by_pk("BASIC", "EMP_ID", "001") is not None
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_service_writes_append_journal_in_journal_mode(tmp_path, monkeypatch):
+    import pytest
+    from hrms.core.db.unit_of_work import UnitOfWork
+    from hrms.core.db.adapters.csv_adapter import CSVConflictError
+    from hrms.persons import service
+    _write(tmp_path / "BASIC.csv", "EMP_ID,C_Name,Active\n001,Amy,true\n002,Bob,false\n")
+    cache = TableCache()
+    monkeypatch.setattr(UnitOfWork, "from_settings", classmethod(
+        lambda cls: cls(adapter=CSVAdapter(str(tmp_path), cache=cache, write_mode="journal"))))
+    csv_path, journal = tmp_path / "BASIC.csv", tmp_path / "BASIC.csv.journal"
+    before = csv_path.read_bytes()
+
+    service.upsert_employee({"EMP_ID": "001", "C_Name": "Ann"})
+    size = journal.stat().st_size
+    service.upsert_employee({"EMP_ID": "003", "C_Name": "Cat", "Active": "true"})
+    # 服務層（交易中）的寫入也只追加 journal，主檔不改寫
+    assert csv_path.read_bytes() == before
+    assert journal.stat().st_size > size
+    assert service.get_employee("001")["C_Name"] == "Ann"
+    cold = CSVAdapter(str(tmp_path), cache=TableCache())
+    assert [r["EMP_ID"] for r in cold.list("BASIC")] == ["001", "002", "003"]
+
+    # 交易讀取後、提交前其他程序寫入 → 衝突
+    with pytest.raises(CSVConflictError):
+        with UnitOfWork.from_settings() as uow:
+            uow.adapter.get_by_pk("BASIC", "EMP_ID", "002")
+            CSVAdapter(str(tmp_path), cache=TableCache(), write_mode="journal").upsert(
+                "BASIC", "EMP_ID", {"EMP_ID": "002", "C_Name": "Ben"})
+            uow.adapter.upsert("BASIC", "EMP_ID", {"EMP_ID": "002", "Active": "true"})
+    assert CSVAdapter(str(tmp_path), cache=TableCache()).get_by_pk("BASIC", "EMP_ID", "002")["Active"] == "false"
+
+
+def test_iter_rows_streams_with_projection_and_limit(tmp_path):
+    rows = "".join(f"{i:03d},N{i},{'true' if i % 2 else 'false'}\n" for i in range(50))
+    _write(tmp_path / "BASIC.csv", "EMP_ID,C_Name,Active\n" + rows)
+    a = CSVAdapter(str(tmp_path), cache=TableCache())
+    got = list(a.iter_rows("BASIC", filters={"Active": "true"}, columns=["EMP_ID"], chunksize=7, limit=3))
+    assert got == [{"EMP_ID": "001"}, {"EMP_ID": "003"}, {"EMP_ID": "005"}]
+    # 串流讀取不進快取
+    assert a.cache.stats()["tables"] == 0
+    assert a.list("BASIC", filters={"Active": "true"}, limit=2) == [
+        {"EMP_ID": "001", "C_Name": "N1", "Active": "true"},
+        {"EMP_ID": "003", "C_Name": "N3", "Active": "true"},
+    ]
+    a.list("BASIC")
+    assert list(a.iter_rows("BASIC", columns=["C_Name"], limit=1)) == [{"C_Name": "N0"}]
+
+
+def test_filter_expressions(tmp_path):
+    from hrms.core.db.filters import eq, in_, between, startswith, contains, is_empty
+    _write(tmp_path / "BASIC.csv",
+           "EMP_ID,Dept_Code,On_Board_Date,C_Name\n"
+           "001,L1,2011-01-05,Amy\n002,L2,2012-03-01,Bob\n003,L3,2011-07-01,  \n004,L1,2013-01-01,Ann\n")
+    schema = {"BASIC": TableSpec(primary_key="EMP_ID", indexes=["Dept_Code"])}
+    a = CSVAdapter(str(tmp_path), cache=TableCache(), schema=schema)
+
+    def ids(expr):
+        return [r["EMP_ID"] for r in a.list("BASIC", filters=expr)]
+
+    assert ids(in_("Dept_Code", ["L1", "L3"]) & between("On_Board_Date", "2011-01-01", "2011-12-31")) == ["001", "003"]
+    assert ids(eq("Dept_Code", "L2") | startswith("C_Name", "An")) == ["002", "004"]
+    assert ids(contains("C_Name", "m", case=False)) == ["001"]
+    assert ids(is_empty("C_Name")) == ["003"]
+    # 串流路徑結果一致
+    fresh = CSVAdapter(str(tmp_path), cache=TableCache(), schema=schema)
+    expr = in_("Dept_Code", ["L1"]) & between("On_Board_Date", low="2012-01-01")
+    assert [r["EMP_ID"] for r in fresh.iter_rows("BASIC", filters=expr, columns=["EMP_ID"])] == ["004"]
+
+
+def test_employee_search_on_real_onboard_column(tmp_path):
+    from hrms.persons.repository import EmployeeRepositoryCSV
+    # 實際 BASIC.csv：到職日在 On_Board_date（YYYYMMDD 補空白），On_Board_Date 多為空白
+    _write(tmp_path / "BASIC.csv",
+           "EMP_ID,Dept_Code,On_Board_date,Active,On_Board_Date\n"
+           "001,L1    ,20110801  ,true,\n002,L1    ,2014/2/26 ,true,\n"
+           "003,L2    ,20110905  ,true,\n004,L1    ,,true,2011-12-01\n005,L1    ,,true,\n")
+    for compact in (False, True):
+        a = CSVAdapter(str(tmp_path), cache=TableCache(), load_profile="compact" if compact else "raw")
+        repo = EmployeeRepositoryCSV(a)
+        found = repo.search(onboard_from="2011-01-01", onboard_to="20111231")
+        assert [r["EMP_ID"] for r in found] == ["001", "003", "004"]
+        assert [r["EMP_ID"] for r in repo.search(onboard_from="2014-01-01")] == ["002"]
+
+
+def test_sidecar_cache_used_on_cold_start(tmp_path, monkeypatch):
+    import pytest
+    pytest.importorskip("pyarrow")
+    _write(tmp_path / "BASIC.csv", "EMP_ID,C_Name\n001,Amy\n002,Bob\n")
+    a = CSVAdapter(str(tmp_path), cache=TableCache())
+    expected = a.list("BASIC")
+    assert (tmp_path / ".cache" / "BASIC.csv.arrow").exists()
+    cold = CSVAdapter(str(tmp_path), cache=TableCache())
+    assert cold.sidecar.load(tmp_path / "BASIC.csv") is not None
+    assert cold.list("BASIC") == expected
+    # 同大小但內容不同：比對 SHA-1 後重建
+    _write(tmp_path / "BASIC.csv", "EMP_ID,C_Name\n001,Amy\n002,Bo2\n")
+    assert cold.sidecar.load(tmp_path / "BASIC.csv") is None
+    assert CSVAdapter(str(tmp_path), cache=TableCache()).list("BASIC")[1]["C_Name"] == "Bo2"
+    # 只 touch（內容相同）：仍可用，且更新記錄的 mtime，下次不必再計算 SHA-1
+    from hrms.core.db.adapters import csv_sidecar
+    p = tmp_path / "BASIC.csv"
+    st = p.stat()
+    os.utime(p, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert cold.sidecar.load(p) is not None
+    hashed = []
+    monkeypatch.setattr(csv_sidecar, "_sha1", lambda path: hashed.append(path) or "")
+    assert cold.sidecar.load(p)["C_Name"].tolist() == ["Amy", "Bo2"]
+    assert hashed == []
+
+
+def test_offset_index_point_lookup_and_append(tmp_path):
+    p = tmp_path / "BASIC.csv"
+    p.write_bytes('\ufeffEMP_ID,Meno\r\n001,"line1\r\nline2, ""q"""\r\n002,plain\r\n'.encode("utf-8"))
+    a = CSVAdapter(str(tmp_path), cache=TableCache())
+    assert a.get_by_pk("BASIC", "EMP_ID", "002") == {"EMP_ID": "002", "Meno": "plain"}
+    assert a.get_by_pk("BASIC", "EMP_ID", "001")["Meno"] == 'line1\r\nline2, "q"'
+    assert a.get_by_pk("BASIC", "EMP_ID", "999") is None
+    # 未載入整表，且索引已持久化
+    assert a.cache.stats()["misses"] == 0
+    assert (tmp_path / ".cache" / "BASIC.csv.EMP_ID.offsets.json").exists()
+    # 尾端追加：從上次掃描位置續建
+    with open(p, "ab") as f:
+        f.write(b"003,added\r\n")
+    assert a.get_by_pk("BASIC", "EMP_ID", "003")["Meno"] == "added"
+    assert a.get_by_pk("BASIC", "EMP_ID", "002")["Meno"] == "plain"
+    # 與整表載入的結果一致
+    assert a.list("BASIC") == [a.get_by_pk("BASIC", "EMP_ID", v) for v in ("001", "002", "003")]
+
+
+def test_compact_load_profile(tmp_path):
+    _write(tmp_path / "BASIC.csv", "EMP_ID,Dept_Code,Active\n001   ,L1    ,true\n002   ,L2    ,false\n")
+    schema = {"BASIC": TableSpec(primary_key="EMP_ID", categorical=["Dept_Code", "Active"])}
+
+    def adapter(**kw):
+        return CSVAdapter(str(tmp_path), cache=TableCache(), schema=schema, load_profile="compact", **kw)
+
+    # 冷啟動以位移索引讀取時同樣去除補空白
+    assert adapter().get_by_pk("BASIC", "EMP_ID", "002") == {"EMP_ID": "002", "Dept_Code": "L2", "Active": "false"}
+    a = adapter()
+    df = a._read_df("BASIC")
+    assert str(df["Dept_Code"].dtype) == "category"
+    assert df["EMP_ID"].tolist() == ["001", "002"]
+    assert [r["EMP_ID"] for r in a.list("BASIC", filters={"Dept_Code": "L2"})] == ["002"]
+    # 新類別值可直接寫入，寫回後仍為 category
+    a.upsert("BASIC", "EMP_ID", {"EMP_ID": "003", "Dept_Code": " L9 ", "Active": "true"})
+    a.upsert_many("BASIC", "EMP_ID", [{"EMP_ID": "001", "Dept_Code": "L8"}])
+    assert str(a._read_df("BASIC")["Dept_Code"].dtype) == "category"
+    # 單列寫入不還原整表：未寫入的 category 欄位沿用原本的型別與類別
+    a.upsert("BASIC", "EMP_ID", {"EMP_ID": "002", "Active": "true"})
+    assert str(a._read_df("BASIC")["Active"].dtype) == "category"
+    assert a.list_distinct("BASIC", "Dept_Code") == ["L2", "L8", "L9"]
+    assert adapter().list("BASIC") == a.list("BASIC")
+
+
+def test_lookup_lists_memoized_on_snapshot(tmp_path):
+    from hrms.lookups.service import lookup_options
+    _write(tmp_path / "L_SECTION.csv", "Dept_Code,Dept_Name\nD2,二課\nD1,一課\nD1,重複\n")
+    a = CSVAdapter(str(tmp_path), cache=TableCache())
+    assert a.list_distinct("L_Section", "Dept_Code") == ["D1", "D2"]
+    assert a.value_map("L_Section", "Dept_Code", "Dept_Name") == {"D2": "二課", "D1": "一課"}
+    misses = a.cache.stats()["misses"]
+    assert a.list_distinct("L_Section", "Dept_Code") == ["D1", "D2"]
+    assert a.cache.stats()["misses"] == misses
+    from hrms.core.db.adapters.table_cache import shared_table_cache
+    assert lookup_options(tmp_path / "L_SECTION.csv", "Dept_Code", ("Dept_Name",)) == [
+        ("D2 - 二課", "D2"), ("D1 - 一課", "D1")]
+    # 選項由共用快取的快照衍生，不另外讀檔
+    misses = shared_table_cache.stats()["misses"]
+    assert lookup_options(tmp_path / "L_SECTION.csv", "Dept_Code", ("Dept_Name",))[0] == ("D2 - 二課", "D2")
+    assert shared_table_cache.stats()["misses"] == misses
+    _write(tmp_path / "L_SECTION.csv", "Dept_Code,Dept_Name\nD3,三課\n")
+    os.utime(tmp_path / "L_SECTION.csv", ns=(1, 1))
+    assert a.list_distinct("L_Section", "Dept_Code") == ["D3"]
+    assert a.value_map("L_Section", "Dept_Code", "Dept_Name") == {"D3": "三課"}
+    assert lookup_options(tmp_path / "L_SECTION.csv", "Dept_Code") == [("D3", "D3")]
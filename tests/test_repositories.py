@@ -0,0 +1,646 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from domain.models import Base, TrainingRecord
+from repositories import TrainingRecordRepository, RepositoryError
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    s = sessionmaker(bind=engine)()
+    for i in range(1, 24):
+        s.add(TrainingRecord(Certify_No=i, EMP_ID=f"E{i % 3}", Certify_ID=f"C{i % 5}", Active=i % 2 == 0))
+    s.commit()
+    yield s
+    s.close()
+
+
+def _ids(page):
+    return [r.Certify_No for r in page.items]
+
+
+def test_list_after_pages_forward_and_back(session):
+    repo = TrainingRecordRepository(session)
+    p1 = repo.list_after(limit=10)
+    assert _ids(p1) == list(range(1, 11)) and p1.prev_cursor is None
+    p2 = repo.list_after(p1.next_cursor, limit=10)
+    p3 = repo.list_after(p2.next_cursor, limit=10)
+    assert _ids(p3) == [21, 22, 23] and p3.next_cursor is None
+    back = repo.list_after(p3.prev_cursor, limit=10)
+    assert _ids(back) == _ids(p2)
+    assert _ids(repo.list_after(back.prev_cursor, limit=10)) == _ids(p1)
+    # 跳頁：定位到第 11 筆
+    assert _ids(repo.list_after(repo.cursor_at(10), limit=10)) == _ids(p2)
+
+
+def test_list_after_mixed_order_and_filters(session):
+    repo = TrainingRecordRepository(session)
+    order = ["EMP_ID", "-Certify_No"]
+    expected = [r.Certify_No for r in sorted(repo.list(filters={"Active": True}),
+                                                 key=lambda r: (r.EMP_ID, -r.Certify_No))]
+    seen, cursor = [], None
+    while True:
+        page = repo.list_after(cursor, order_by=order, limit=4, filters={"Active": True})
+        seen += _ids(page)
+        if page.next_cursor is None:
+            break
+        cursor = page.next_cursor
+    assert seen == expected
+    with pytest.raises(RepositoryError):
+        repo.list_after(cursor, limit=4)
+
+
+def test_upsert_many_on_conflict_composite_key(session):
+    from domain.models import CertifyItem
+    from repositories import CertifyItemRepository
+    repo = CertifyItemRepository(session)
+    from sqlalchemy import event
+    repo.create(CertifyItem(Dept="L1", Certify_ID="A", Certify_Name="old", Active=True))
+    repo.create(CertifyItem(Dept="L9", Certify_ID="Z", Certify_Name="keep", Active=True))
+    loaded = repo.get_by_pk(("L1", "A"))
+    untouched = repo.get_by_pk(("L9", "Z"))
+    statements = []
+    event.listen(session.get_bind(), "before_cursor_execute", lambda *a: statements.append(a[2]))
+    result = repo.upsert_many([
+        {"Dept": "L1", "Certify_ID": "A", "Certify_Name": "new"},
+        {"Dept": "L2", "Certify_ID": "A", "Certify_Name": "other"},
+        {"Dept": "L1", "Certify_ID": "B", "Certify_Name": "b1"},
+        {"Dept": "L1", "Certify_ID": "B", "Certify_Name": "b2"},
+    ])
+    assert result == {"inserted": 2, "updated": 2}
+    # 不做整表 count(*)；只有受影響的物件過期
+    assert not any("count(" in sql.lower() for sql in statements)
+    assert "Certify_Name" in untouched.__dict__
+    # 既有物件已過期，重新讀取為新值；未提供的欄位保持不變
+    assert loaded.Certify_Name == "new" and loaded.Active is True
+    assert repo.get_by_pk(("L1", "B")).Certify_Name == "b2"
+    assert repo.count() == 4
+    with pytest.raises(RepositoryError):
+        repo.upsert_many([{"Dept": "L1", "Certify_ID": "A"}], conflict_columns=["Nope"])
+
+
+def test_page_returns_rows_and_cached_total(session):
+    repo = TrainingRecordRepository(session)
+    rows, total = repo.page(filters={"Active": True}, limit=5, offset=5)
+    assert total == 11 and [r.Certify_No for r in rows] == [12, 14, 16, 18, 20]
+    assert repo.page(filters={"Active": True}, limit=5, offset=50) == ([], 11)
+    # 寫入後總筆數快取失效
+    repo.create(TrainingRecord(Certify_No=100, EMP_ID="E1", Certify_ID="C1", Active=True))
+    assert repo.page(filters={"Active": True}, limit=5)[1] == 12
+    assert repo.cached_count(filters={"Active": True}) == 12
+    # 由 page() 的結果接續 keyset 翻頁
+    nxt = repo.list_after(repo.cursor_for(rows[-1]), limit=2, filters={"Active": True})
+    assert [r.Certify_No for r in nxt.items] == [22, 100]
+
+
+def test_select_rows_projection(session):
+    repo = TrainingRecordRepository(session)
+    rows = repo.select_rows(["Certify_No", "EMP_ID"], filters={"EMP_ID": "E1"}, order_by=["-Certify_No"], limit=3)
+    assert [(r.Certify_No, r.EMP_ID) for r in rows] == [(22, "E1"), (19, "E1"), (16, "E1")]
+    assert repo.select_rows(["Certify_No"], limit=2, order_by=["Certify_No"], as_tuples=True) == [(1,), (2,)]
+    # 投影查詢不會載入 ORM 物件
+    assert not any(isinstance(o, TrainingRecord) for o in session.identity_map.values())
+    page = repo.list_after(limit=2, columns=["EMP_ID"])
+    assert page.items[0]._fields == ("EMP_ID", "Certify_No")
+    assert [r.Certify_No for r in repo.list_after(page.next_cursor, limit=2, columns=["EMP_ID"]).items] == [3, 4]
+
+
+def test_declared_indexes_and_query_plan_check(session):
+    from domain.models import create_indexes, drop_indexes
+    from repositories.query_plan import check_hot_queries
+    engine = session.get_bind()
+    assert all(r.ok for r in check_hot_queries(session))
+    session.rollback()
+    dropped = drop_indexes(engine)
+    assert "ix_training_record_emp_active" in dropped and drop_indexes(engine) == []
+    scans = [r.name for r in check_hot_queries(session) if not r.ok]
+    assert "TRAINING_RECORD 依員工（有效）" in scans
+    session.rollback()
+    assert sorted(create_indexes(engine)) == sorted(dropped) and create_indexes(engine) == []
+
+
+def test_legacy_database_migrated_on_first_use(tmp_path, monkeypatch):
+    import sqlite3
+    from domain.models import CertifyItem, ensure_migrated
+    from hrms.core.db import unit_of_work_sqlite as uow_mod
+    from hrms.core.db.engine import get_engine
+    # 遷移前（baseline hrms.db）的結構：沒有 Valid_Days / Expiry_Date，日期為 YYYYMMDD
+    path = tmp_path / "legacy.db"
+    with sqlite3.connect(path) as conn:
+        conn.executescript(
+            'CREATE TABLE "CERTIFY_ITEMS" ("Dept" VARCHAR(50) NOT NULL, "Certify_ID" VARCHAR(50) NOT NULL, '
+            '"Certify_Type" VARCHAR(50), "Certify_Name" VARCHAR(500), "Certify_time" VARCHAR(20), '
+            '"Certify_Grade" VARCHAR(50), "Remark" TEXT, "Active" BOOLEAN NOT NULL, "Score" FLOAT, '
+            'PRIMARY KEY ("Dept", "Certify_ID"));'
+            'CREATE TABLE "TRAINING_RECORD" ("Certify_No" INTEGER NOT NULL, "EMP_ID" VARCHAR(50) NOT NULL, '
+            '"Certify_ID" VARCHAR(50) NOT NULL, "Certify_date" VARCHAR(20), "Certify_type" VARCHAR(50), '
+            'update_date VARCHAR(20), "Active" BOOLEAN NOT NULL, "Remark" TEXT, updater VARCHAR(50), '
+            '"Cer_type" VARCHAR(10), PRIMARY KEY ("Certify_No"));'
+            "INSERT INTO CERTIFY_ITEMS (Dept, Certify_ID, Active) VALUES ('L1', 'C1', 1);"
+            "INSERT INTO TRAINING_RECORD (Certify_No, EMP_ID, Certify_ID, Certify_date, Active) "
+            "VALUES (1, 'E1', 'C1', '20240101', 1);"
+        )
+    monkeypatch.setattr(uow_mod, "_ReadSessionFactory", sessionmaker(
+        bind=get_engine(f"sqlite:///{path}", readonly=True), class_=uow_mod.ReadOnlySession))
+    with uow_mod.UnitOfWork(readonly=True) as uow:
+        record = uow.session.get(TrainingRecord, 1)
+        assert record.Certify_date == "2024-01-01" and record.Expiry_Date == "2024-12-31"
+        assert uow.session.get(CertifyItem, ("L1", "C1")).Valid_Days == 365
+    # 已遷移：只檢查不重做
+    assert ensure_migrated(get_engine(f"sqlite:///{path}")) is False
+
+
+def test_certify_item_valid_days_matches_stored_expiry(session):
+    from datetime import date, timedelta
+    from domain.models import CertifyItem
+    from repositories import CertifyItemRepository
+    session.add_all([CertifyItem(Dept="L1", Certify_ID="V1", Active=True, Valid_Days=730),
+                     CertifyItem(Dept="L2", Certify_ID="V1", Active=True, Valid_Days=180),
+                     CertifyItem(Dept="L1", Certify_ID="V2", Active=True, Valid_Days=0),
+                     CertifyItem(Dept="L1", Certify_ID="V3", Active=True)])
+    session.add_all([TrainingRecord(Certify_No=100 + i, EMP_ID="E1", Certify_ID=c, Certify_date="2024-01-01",
+                                    Active=True) for i, c in enumerate(("V1", "V2", "V3"))])
+    session.commit()
+    items = CertifyItemRepository(session)
+    # 表單計算的到期日與觸發器存入的 Expiry_Date 相同
+    assert items.valid_days("V1") == 180
+    expected = (date(2024, 1, 1) + timedelta(days=180)).isoformat()
+    assert session.get(TrainingRecord, 100).Expiry_Date == expected
+    assert items.valid_days("V2") is None and session.get(TrainingRecord, 101).Expiry_Date is None
+    assert items.valid_days("V3") == 365 and items.valid_days("nope") is None
+
+
+def test_find_scans_flags_index_scans_unless_allowed():
+    import re
+    from repositories.query_plan import find_scans
+    plan = [
+        "SCAN BASIC USING INDEX ix_basic_active_emp",
+        "SCAN TRAINING_RECORD USING COVERING INDEX ix_training_record_emp_active",
+        "SEARCH BASIC USING INDEX ix_basic_dept_active (Dept_Code=?)",
+        "SCAN BASIC_FTS VIRTUAL TABLE INDEX 0:M3",
+        "SCAN CONSTANT ROW",
+    ]
+    assert find_scans(plan) == plan[:2]
+    assert find_scans(plan, allow=[re.compile(r"^SCAN BASIC USING INDEX ix_basic_active_emp$")]) == [plan[1]]
+
+
+def test_fulltext_search_synced_by_triggers(session):
+    from domain.models import Basic, CertifyItem
+    from repositories import BasicRepository, global_search
+    repo = BasicRepository(session)
+    session.add_all([
+        Basic(EMP_ID="A001", C_Name="陳志明", Meno="夜班組長", Active=True),
+        Basic(EMP_ID="A002", C_Name="陳志明宏", Active=False),
+        Basic(EMP_ID="A003", C_Name="林美玲", Meno="支援陳志明", Active=True),
+        CertifyItem(Dept="L1", Certify_ID="MFG-001", Certify_Name="MOCVD 操作", Active=True),
+    ])
+    session.commit()
+    assert [b.EMP_ID for b in repo.search_by_name("陳志明")] == ["A001"]
+    assert {b.EMP_ID for b in repo.search_by_name("陳志明", only_active=False)} == {"A001", "A002"}
+    # 不限欄位時備註也會命中；不足 3 字的關鍵字改以 LIKE 比對
+    assert [b.EMP_ID for b in repo.search("陳志明")] == ["A001", "A003"]
+    assert [b.EMP_ID for b in repo.search_by_name("美玲")] == ["A003"]
+    # 觸發器同步更新與刪除
+    repo.update("A001", {"C_Name": "王大同"})
+    session.delete(repo.get_by_pk("A003"))
+    session.commit()
+    assert repo.search("陳志明") == [] and [b.EMP_ID for b in repo.search_by_name("王大同")] == ["A001"]
+    hits = global_search(session, "mocvd")
+    assert [(h.kind, h.key) for h in hits] == [("certify_item", ("L1", "MFG-001"))] and hits[0].rank < 0
+
+
+def test_expiry_date_maintained_and_range_query(session):
+    from datetime import date
+    from sqlalchemy import text
+    from domain.models import CertifyItem, migrate_dates, normalize_date
+    assert [normalize_date(v) for v in ("20110801", "2011/8/1", " 2011-08-01 ", date(2011, 8, 1), "", "n/a")] == \
+        ["2011-08-01"] * 4 + [None, "n/a"]
+    repo = TrainingRecordRepository(session)
+    session.add_all([
+        CertifyItem(Dept="L1", Certify_ID="C1", Valid_Days=30),
+        CertifyItem(Dept="L2", Certify_ID="C1", Valid_Days=60),
+        CertifyItem(Dept="L1", Certify_ID="C2", Valid_Days=0),
+        TrainingRecord(Certify_No=100, EMP_ID="E1", Certify_ID="C1", Certify_date="20240101", Active=True),
+        TrainingRecord(Certify_No=101, EMP_ID="E1", Certify_ID="C2", Certify_date="2024/01/01", Active=True),
+    ])
+    session.commit()
+    rec = repo.get_by_pk(100)
+    # 寫入時轉為標準格式；到期日取最短效期
+    assert (rec.Certify_date, rec.Expiry_Date) == ("2024-01-01", "2024-01-31")
+    assert repo.get_by_pk(101).Expiry_Date is None
+    today = date(2024, 1, 20)
+    assert [r.Certify_No for r in repo.get_expiring_records(15, today=today)] == [100]
+    assert repo.count_expiring(5, today=today) == 0
+    # 修改效期或取得日期時觸發器重算
+    session.execute(text("UPDATE CERTIFY_ITEMS SET Valid_Days = 90 WHERE Dept = 'L1' AND Certify_ID = 'C1'"))
+    repo.update(100, {"Certify_date": "2024.02.01"})
+    session.commit()
+    assert repo.get_by_pk(100).Expiry_Date == "2024-04-01"
+    assert repo.count_expiring(5, include_expired=True, today=date(2024, 5, 1)) == 1
+    # 遷移：舊格式轉換（可重複執行）
+    session.execute(text("UPDATE TRAINING_RECORD SET update_date = '20240305' WHERE Certify_No = 100"))
+    session.commit()
+    result = migrate_dates(session.get_bind())
+    assert result["columns"]["TRAINING_RECORD.update_date"] == {"normalized": 1, "unparsed": 0}
+    assert migrate_dates(session.get_bind())["columns"]["TRAINING_RECORD.update_date"]["normalized"] == 0
+
+
+def test_engine_registry_applies_sqlite_profile(tmp_path):
+    from sqlalchemy import create_engine
+    from hrms.core.config import SQLiteSettings
+    from hrms.core.db.engine import PROJECT_ROOT, apply_sqlite_profile, get_engine, resolve_db_url
+    assert resolve_db_url("sqlite:///./x.db") == f"sqlite:///{PROJECT_ROOT / 'x.db'}"
+    url = f"sqlite:///{tmp_path / 'a.db'}"
+    engine = get_engine(url)
+    try:
+        assert get_engine(url) is engine
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+            assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == 5000
+    finally:
+        engine.dispose()
+    profile = SQLiteSettings(journal_mode="", synchronous="off", cache_size_kb=None,
+                             mmap_size_mb=None, temp_store="", busy_timeout_ms=None)
+    other = apply_sqlite_profile(create_engine(f"sqlite:///{tmp_path / 'b.db'}"), profile)
+    with other.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "delete"
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 0
+    other.dispose()
+
+
+def test_readonly_unit_of_work_and_read_session(tmp_path, monkeypatch):
+    from sqlalchemy.orm import sessionmaker
+    from hrms.core.db import unit_of_work_sqlite as uow_mod
+    from hrms.core.db.engine import get_engine
+    url = f"sqlite:///{tmp_path / 'r.db'}"
+    Base.metadata.create_all(get_engine(url))
+    write = sessionmaker(bind=get_engine(url))
+    monkeypatch.setattr(uow_mod, "_ReadSessionFactory", sessionmaker(
+        bind=get_engine(url, readonly=True), class_=uow_mod.ReadOnlySession,
+        autoflush=False, expire_on_commit=False))
+    with write() as s:
+        s.add(TrainingRecord(Certify_No=1, EMP_ID="E1", Certify_ID="C1", Active=True))
+        s.commit()
+    with uow_mod.UnitOfWork(readonly=True) as uow:
+        rec = TrainingRecordRepository(uow.session).get_by_pk(1)
+        rec.EMP_ID = "X"
+        with pytest.raises(uow_mod.ReadOnlyError):
+            uow.session.flush()
+    reader = uow_mod.ReadSession(tables=["TRAINING_RECORD"])
+    with reader as session:
+        first = TrainingRecordRepository(session).get_by_pk(1)
+        with reader as nested:
+            assert nested is session
+    # 結束讀取交易後物件仍可用，下次沿用 identity map
+    with reader as session:
+        assert first.EMP_ID == "E1" and TrainingRecordRepository(session).get_by_pk(1) is first
+    with write() as s:
+        TrainingRecordRepository(s).update(1, {"EMP_ID": "E2"})
+        s.commit()
+    with reader as session:
+        again = TrainingRecordRepository(session).get_by_pk(1)
+        assert again is not first and again.EMP_ID == "E2"
+    reader.close()
+
+
+def test_update_where_and_delete_where(session):
+    from domain.models import CertifyItem
+    from repositories import CertifyItemRepository
+    repo = TrainingRecordRepository(session)
+    loaded = repo.get_by_pk(2)  # E2, Active
+    assert repo.deactivate_by_employee("E2") == 4
+    assert loaded.Active is False and repo.count(filters={"EMP_ID": "E2", "Active": True}) == 0
+    # 型別轉換後同步到 identity map
+    assert repo.update_where({"Certify_No": [1, 2]}, {"update_date": "20240102"}) == 2
+    assert loaded.update_date == "2024-01-02"
+    assert repo.cached_count(filters={"EMP_ID": "E0"}) == 7
+    assert repo.delete_where({"EMP_ID": "E0", "Certify_ID": ("C0", "C3")}) == 3
+    assert repo.cached_count(filters={"EMP_ID": "E0"}) == 4
+    with pytest.raises(RepositoryError):
+        repo.delete_where({})
+    with pytest.raises(RepositoryError):
+        repo.update_where({"Nope": 1}, {"Active": False})
+    items = CertifyItemRepository(session)
+    session.add_all([CertifyItem(Dept=d, Certify_ID="X", Active=True) for d in ("L1", "L2")])
+    session.flush()
+    item = items.get_by_pk(("L1", "X"))
+    assert items.retire("X") == 2 and item.Active is False
+    assert items.delete(("L2", "X")) and items.get_by_pk(("L2", "X")) is None
+    assert items.delete(("L2", "X")) is False
+
+
+def test_lookup_cache_refreshes_on_table_writes(session):
+    from sqlalchemy import event
+    from domain.models import Area, Section, Shift
+    from repositories import LookupCache, LookupService
+    session.add_all([Section(Dept_Code="D2", Dept_Name="二課"), Section(Dept_Code="D1", Dept_Name="一課"),
+                     Area(Area="A1", Area_Desc="一廠"), Area(Area="A2", Area_Desc="舊廠", Active=False),
+                     Shift(識別碼="1", Shift="S1", L_Section="D1"), Shift(識別碼="2", Shift="S1", L_Section="D2"),
+                     Shift(識別碼="3", Shift="S2", L_Section="D2"),
+                     Shift(識別碼="4", Shift="S3", L_Section="D2", Active=False)])
+    session.commit()
+    statements = []
+    event.listen(session.get_bind(), "before_cursor_execute", lambda *a: statements.append(a[2]))
+    lookups = LookupService(session, cache=LookupCache())
+    assert lookups.list_dept_codes() == ["D1", "D2"]
+    assert lookups.list_areas() == ["A1"] and lookups.get_area_desc("A2") == "舊廠"
+    assert lookups.list_shifts() == ["S1", "S2"] and lookups.list_active_shifts_by_section("D2") == ["S1", "S2"]
+    queries = len(statements)
+    # 穩定狀態：不再查詢
+    assert lookups.get_dept_name("D1") == "一課" and lookups.list_dept_names() == ["一課", "二課"]
+    assert LookupService(session, cache=lookups.cache).list_dept_codes() == ["D1", "D2"]
+    assert len(statements) == queries
+    session.get(Section, "D1").Dept_Name = "製一課"
+    session.commit()
+    assert lookups.get_dept_name("D1") == "製一課"
+    assert lookups.list_areas() == ["A1"]
+    # 依部門的班別清單維持原本的語意：含停用
+    assert lookups.list_shifts_by_section("D2") == ["S1", "S2", "S3"]
+
+
+def test_page_with_derived_name_columns(session):
+    from sqlalchemy import event
+    from domain.models import Basic, CertifyItem
+    session.add_all([Basic(EMP_ID="E1", C_Name="王小明"),
+                     CertifyItem(Dept="L2", Certify_ID="C1", Certify_Name="乙"),
+                     CertifyItem(Dept="L1", Certify_ID="C1", Certify_Name="甲")])
+    session.commit()
+    repo = TrainingRecordRepository(session)
+    statements = []
+    event.listen(session.get_bind(), "before_cursor_execute", lambda *a: statements.append(a[2]))
+    rows, total = repo.page(limit=5, order_by=["Certify_No"], columns=["Certify_No", "C_Name", "Certify_Name"])
+    assert total == 23 and len(statements) == 1
+    assert [(r.Certify_No, r.C_Name, r.Certify_Name) for r in rows[:2]] == [(1, "王小明", "乙"), (2, None, None)]
+    page = repo.list_after(repo.cursor_for(rows[-1], ["Certify_No"]), order_by=["Certify_No"], limit=3,
+                           columns=["Certify_No", "C_Name"])
+    assert [(r.Certify_No, r.C_Name) for r in page.items] == [(6, None), (7, "王小明"), (8, None)]
+    with pytest.raises(RepositoryError):
+        repo.select_rows(["Nope"])
+
+
+def test_relationship_load_strategies(session):
+    from sqlalchemy import event
+    from sqlalchemy.exc import InvalidRequestError
+    from domain.models import Basic, CertifyItem, CertifyToolMap
+    from repositories import CertificationService
+    session.add_all([Basic(EMP_ID=f"E{i}", C_Name=f"N{i}") for i in range(3)]
+                    + [CertifyItem(Dept=d, Certify_ID="C1", Certify_Name="X") for d in ("L1", "L2")]
+                    + [CertifyToolMap(Certify_ID="C1", TOOL_ID=t) for t in ("T1", "T2")])
+    session.commit()
+    session.expunge_all()
+    repo = TrainingRecordRepository(session)
+    # 嚴格模式（tests/conftest.py）：未預先載入的關聯不可延遲載入
+    with pytest.raises(InvalidRequestError):
+        repo.get_by_pk(1).employee
+    session.expunge_all()
+    records = repo.list(filters={"Certify_ID": "C1"}, load=["employee", "certify_items"], strategy="joined")
+    assert [r.employee.C_Name for r in records] == ["N1", "N0", "N2", "N1", "N0"]
+    assert [i.Dept for i in records[0].certify_items] == ["L1", "L2"]
+    with pytest.raises(RepositoryError):
+        repo.list(load=["nope"])
+    with pytest.raises(RepositoryError):
+        repo.list(load=["employee"], strategy="eager")
+    
+    session.expunge_all()
+    statements = []
+    event.listen(session.get_bind(), "before_cursor_execute", lambda *a: statements.append(a[2]))
+    details = CertificationService(session).get_certification_details("C1")
+    assert len(statements) == 4
+    assert details["statistics"] == {"record_count": 5, "tool_count": 2}
+    assert [r.employee.C_Name for r in details["records"]][:2] == ["N1", "N0"]
+    assert len(details["certify_items"]) == 2
+
+
+def test_interruptible_query_cancelled_from_other_thread(session):
+    import threading
+    from sqlalchemy import text
+    from hrms.core.db.cancel import CancelToken, QueryCancelled, interruptible
+    slow = text("WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 100000000) "
+                "SELECT count(*) FROM n")
+    token = CancelToken()
+    threading.Timer(0.05, token.cancel).start()
+    with pytest.raises(QueryCancelled):
+        with interruptible(session, token):
+            session.execute(slow).scalar()
+    session.rollback()
+    # handler 已移除，同一連線的後續查詢不受影響
+    with interruptible(session, CancelToken()):
+        assert TrainingRecordRepository(session).count() == 23
+    with pytest.raises(QueryCancelled):
+        with interruptible(session, token):
+            pass
+
+
+# ---------- Qt（offscreen；未安裝 PySide6 時略過） ----------
+@pytest.fixture
+def qapp(monkeypatch):
+    monkeypatch.setenv("QT_QPA_PLATFORM", "offscreen")
+    QtCore = pytest.importorskip("PySide6.QtCore")
+    pytest.importorskip("PySide6.QtTest")
+    return QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+@pytest.fixture
+def file_sessions(tmp_path):
+    # 背景執行緒各自連線，需使用檔案資料庫
+    engine = create_engine(f"sqlite:///{tmp_path / 'qt.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as s:
+        s.add_all([TrainingRecord(Certify_No=i, EMP_ID=f"E{i % 3}", Certify_ID=f"C{i % 5}", Active=i % 2 == 0)
+                   for i in range(1, 24)])
+        s.commit()
+    yield factory
+    engine.dispose()
+
+
+def _wait_until(predicate, timeout_ms: int = 3000) -> bool:
+    from PySide6.QtTest import QTest
+    waited = 0
+    while not predicate() and waited < timeout_ms:
+        QTest.qWait(10)
+        waited += 10
+    return predicate()
+
+
+def _record_model(reader, **kw):
+    from hrms.ui.qt.table_model import RepositoryTableModel, TableColumn
+    columns = [TableColumn("Certify_No", "編號"), TableColumn("EMP_ID", "員工"),
+               TableColumn("Certify_type", "類別")]
+    return RepositoryTableModel(reader, TrainingRecordRepository, columns, order_by=["Certify_No"],
+                                block_size=10, **kw)
+
+
+def test_table_model_fetches_blocks_by_keyset_and_offset(session, qapp):
+    from contextlib import nullcontext
+    from sqlalchemy import event
+    from PySide6.QtCore import Qt
+    model = _record_model(nullcontext(session))
+    model.refresh()
+    # 排序欄位皆 NOT NULL：keyset 游標
+    assert model.rowCount() == 10 and model.canFetchMore()
+    assert model._use_keyset() and model._cursor is not None
+    model.fetchMore(model.index(-1, -1))
+    model.fetchMore(model.index(-1, -1))
+    assert model.rowCount() == 23 and not model.canFetchMore()
+    assert [model.row(i).Certify_No for i in range(23)] == list(range(1, 24))
+    assert model.data(model.index(0, 1)) == "E1" and model.data(model.index(0, 2)) == ""
+
+    statements = []
+    event.listen(session.get_bind(), "before_cursor_execute", lambda *a: statements.append(a[2]))
+    # 排序變更：重設游標並重新取第一段；可為 NULL 的欄位改以 OFFSET 取下一段
+    model.sort(2, Qt.DescendingOrder)
+    assert model.rowCount() == 10 and model._cursor is None and not model._use_keyset()
+    model.fetchMore(model.index(-1, -1))
+    assert model.rowCount() == 20 and "OFFSET" in statements[-1].upper()
+    model.fetchMore(model.index(-1, -1))
+    assert model.rowCount() == 23 and not model.canFetchMore()
+    assert sorted(model.row(i).Certify_No for i in range(23)) == list(range(1, 24))
+    # 相同排序不重查
+    queries = len(statements)
+    model.sort(2, Qt.DescendingOrder)
+    assert len(statements) == queries and model.rowCount() == 23
+    model.set_filters({"EMP_ID": "E1"})
+    assert model.rowCount() == 8 and not model.canFetchMore() and model.total_count() == 8
+
+
+def test_table_model_releases_blocks_far_from_view(session, qapp):
+    from contextlib import nullcontext
+    from sqlalchemy import event
+    from PySide6.QtCore import Qt
+    model = _record_model(nullcontext(session), max_blocks=2)
+    model.refresh()
+    while model.canFetchMore():
+        model.fetchMore(model.index(-1, -1))
+    # 列數不變，但記憶體中只保留最近使用的兩段
+    assert model.rowCount() == 23 and sorted(model._blocks) == [1, 2]
+    statements = []
+    event.listen(session.get_bind(), "before_cursor_execute", lambda *a: statements.append(a[2]))
+    # 捲回已釋放的段落：以該段起點的游標重新讀取
+    assert model.data(model.index(4, 0)) == "5" and len(statements) == 1
+    assert model.row(0).Certify_No == 1 and len(statements) == 1
+    assert sorted(model._blocks) == [0, 2]
+    assert model.row(15).Certify_No == 16 and sorted(model._blocks) == [0, 1]
+    # OFFSET 模式同樣可重新讀取
+    model.sort(2, Qt.DescendingOrder)
+    while model.canFetchMore():
+        model.fetchMore(model.index(-1, -1))
+    before = [model.row(i).Certify_No for i in range(23)]
+    assert sorted(before) == list(range(1, 24)) and len(model._blocks) == 2
+
+
+def test_table_model_background_blocks_and_total(file_sessions, qapp):
+    from contextlib import nullcontext
+    from PySide6.QtCore import QThreadPool
+    from hrms.ui.qt.async_loader import AsyncLoader
+    pool = QThreadPool()
+    loader = AsyncLoader(pool=pool, session_factory=file_sessions)
+    model = _record_model(nullcontext(None), loader=loader)
+    totals = []
+    model.totalChanged.connect(totals.append)
+    model.refresh()
+    # 查詢送出後立即返回，結果到達才插入列
+    assert model.rowCount() == 0 and not model.canFetchMore()
+    assert _wait_until(lambda: model.rowCount() == 10 and totals)
+    assert totals == [23] and model.total == 23 and model.canFetchMore()
+    model.fetchMore(model.index(-1, -1))
+    assert _wait_until(lambda: model.rowCount() == 20)
+    model.set_filters({"Active": True})
+    assert _wait_until(lambda: model.rowCount() == 10 and len(totals) == 2)
+    assert totals[-1] == 11
+    loader.shutdown()
+    pool.waitForDone()
+
+
+def test_async_loader_debounce_and_stale_results(file_sessions, qapp):
+    from PySide6.QtCore import QThreadPool
+    from PySide6.QtTest import QTest
+    from hrms.ui.qt.async_loader import AsyncLoader
+    pool = QThreadPool()
+    loader = AsyncLoader(pool=pool, session_factory=file_sessions)
+    ran, results = [], []
+
+    def query(tag):
+        return lambda session: ran.append(tag) or tag
+
+    # 防彈跳期間再次送出會重新計時，只執行最後一次
+    loader.submit("list", query("a"), results.append, delay_ms=100)
+    QTest.qWait(60)
+    loader.submit("list", query("b"), results.append, delay_ms=100)
+    QTest.qWait(60)
+    assert ran == [] and loader.is_busy("list")
+    assert _wait_until(lambda: results == ["b"])
+    assert ran == ["b"] and not loader.is_busy()
+
+    # 舊世代的結果一律丟棄
+    loader.submit("list", query("c"), results.append, delay_ms=100)
+    stale = loader._generation["list"]
+    loader.submit("list", query("d"), results.append, delay_ms=100)
+    loader._on_done("list", stale, "c")
+    assert results == ["b"] and loader.is_busy("list")
+    assert _wait_until(lambda: results == ["b", "d"])
+    loader.shutdown()
+    pool.waitForDone()
+
+
+def test_async_loader_cancel_and_shutdown_suppress_callbacks(file_sessions, qapp):
+    import threading
+    from PySide6.QtCore import QThreadPool
+    from PySide6.QtTest import QTest
+    from hrms.ui.qt.async_loader import AsyncLoader
+    pool = QThreadPool()
+    loader = AsyncLoader(pool=pool, session_factory=file_sessions)
+    busy, results = [], []
+    loader.busyChanged.connect(busy.append)
+    release = threading.Event()
+
+    def blocking(session):
+        release.wait(2)
+        return "late"
+
+    loader.submit("list", blocking, results.append)
+    assert loader.is_busy("list") and busy == [True]
+    loader.cancel("list")
+    assert not loader.is_busy() and busy == [True, False]
+    release.set()
+    pool.waitForDone()
+    QTest.qWait(50)
+    assert results == []
+
+    release.clear()
+    loader.submit("list", blocking, results.append)
+    loader.shutdown()
+    release.set()
+    pool.waitForDone()
+    QTest.qWait(50)
+    # 關閉後不再接受新查詢
+    loader.submit("list", lambda session: "after", results.append)
+    QTest.qWait(50)
+    assert results == [] and not loader.is_busy()
+
+
+def test_async_loader_routes_errors(file_sessions, qapp):
+    from PySide6.QtCore import QThreadPool
+    from hrms.ui.qt.async_loader import AsyncLoader
+    pool = QThreadPool()
+    loader = AsyncLoader(pool=pool, session_factory=file_sessions)
+    failed, errors, results = [], [], []
+    loader.failed.connect(lambda key, message: failed.append((key, message)))
+
+    def broken(session):
+        raise ValueError("boom")
+
+    # 有 on_error 時只呼叫 on_error
+    loader.submit("list", broken, results.append, errors.append)
+    assert _wait_until(lambda: errors == ["boom"])
+    # 未指定 on_error 時發出 failed
+    loader.submit("count", broken, results.append)
+    assert _wait_until(lambda: failed == [("count", "boom")])
+    assert errors == ["boom"] and results == []
+    # 查詢可使用傳入的 Session
+    loader.submit("count", lambda session: TrainingRecordRepository(session).count(), results.append)
+    assert _wait_until(lambda: results == [23])
+    loader.shutdown()
+    pool.waitForDone()